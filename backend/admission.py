@@ -0,0 +1,274 @@
+import asyncio
+import ipaddress
+import math
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request
+
+from metrics import registry
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call is over its rate limit or the wait queue is full; answer 429."""
+
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def refund(self):
+        """Give back a token taken for a call that never ran."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+    def wait_time(self) -> float:
+        """Seconds until the next token is available."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Admission control for an expensive upstream (the LLM).
+
+    A per-client token bucket stops one caller from hogging the service, a
+    global bucket caps the overall call rate, and a concurrency limit with a
+    bounded wait queue keeps bursts from piling up: once the queue is full or
+    a caller has waited `queue_timeout`, the call is rejected right away
+    instead of hanging until the client gives up.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: float,
+        client_rate: float,
+        client_burst: float,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        max_clients: int = 10000,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_clients = max_clients
+        self.clients: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.in_flight = 0
+        self.waiting = 0
+        self._slots: Optional[asyncio.Semaphore] = None  # created on the serving loop
+        self.admitted = registry.counter(f"{name}.admitted")
+        self.client_limited = registry.counter(f"{name}.rejected_client_rate")
+        self.rate_limited = registry.counter(f"{name}.rejected_rate")
+        self.queue_full = registry.counter(f"{name}.rejected_queue")
+        self.queue_wait = registry.summary(f"{name}.queue_wait_ms")
+        registry.gauge(f"{name}.in_flight", lambda: self.in_flight)
+        registry.gauge(f"{name}.waiting", lambda: self.waiting)
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str) -> "AdmissionController":
+        return cls(
+            name,
+            rate=float(os.getenv(f"{prefix}_RATE", "10")),
+            burst=float(os.getenv(f"{prefix}_BURST", "20")),
+            client_rate=float(os.getenv(f"{prefix}_CLIENT_RATE", "0.5")),
+            client_burst=float(os.getenv(f"{prefix}_CLIENT_BURST", "5")),
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", "16")),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", "64")),
+            queue_timeout=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", "10")),
+        )
+
+    def check_client(self, client_id: Optional[str]):
+        """Charge one request to the caller's own bucket."""
+        if not client_id:
+            return
+        bucket = self.clients.get(client_id)
+        if bucket is None:
+            bucket = self.clients[client_id] = TokenBucket(self.client_rate, self.client_burst)
+            if len(self.clients) > self.max_clients:
+                self.clients.popitem(last=False)
+        else:
+            self.clients.move_to_end(client_id)
+        if not bucket.take():
+            self.client_limited.inc()
+            raise AdmissionRejected("client rate limit", bucket.wait_time())
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one upstream call slot: concurrency with a bounded queue, and the
+        global rate. A full queue is checked first, and a call that times out
+        in the queue gets its token back, so a rejected call costs no rate.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.queue_full.inc()
+            raise AdmissionRejected("queue full", self.queue_timeout)
+        if not self.bucket.take():
+            self.rate_limited.inc()
+            raise AdmissionRejected("rate limit", self.bucket.wait_time())
+        if self._slots.locked():
+            self.waiting += 1
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.bucket.refund()
+                self.queue_full.inc()
+                raise AdmissionRejected("queue timeout", self.queue_timeout)
+            finally:
+                self.waiting -= 1
+            self.queue_wait.observe((time.perf_counter() - started) * 1000)
+        else:
+            await self._slots.acquire()
+        self.admitted.inc()
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+
+class LoginRateLimiter:
+    """
+    Sheds password guessing before it costs a bcrypt round: a token bucket per
+    client address and one per account name, both checked before the hash.
+    """
+
+    def __init__(self, name: str, ip_rate: float, ip_burst: float, account_rate: float, account_burst: float, max_keys: int = 10000):
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.account_rate = account_rate
+        self.account_burst = account_burst
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.ip_limited = registry.counter(f"{name}.rejected_ip")
+        self.account_limited = registry.counter(f"{name}.rejected_account")
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str) -> "LoginRateLimiter":
+        return cls(
+            name,
+            ip_rate=float(os.getenv(f"{prefix}_IP_RATE", "1")),
+            ip_burst=float(os.getenv(f"{prefix}_IP_BURST", "10")),
+            account_rate=float(os.getenv(f"{prefix}_ACCOUNT_RATE", "0.1")),
+            account_burst=float(os.getenv(f"{prefix}_ACCOUNT_BURST", "5")),
+        )
+
+    def _take(self, key: str, rate: float, burst: float) -> Optional[float]:
+        """None if a token was taken, else seconds until the next one."""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(rate, burst)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return None if bucket.take() else bucket.wait_time()
+
+    def check(self, ip: str, account: Optional[str] = None):
+        wait = self._take(f"ip:{ip}", self.ip_rate, self.ip_burst)
+        if wait is not None:
+            self.ip_limited.inc()
+            raise AdmissionRejected("too many attempts from this address", wait)
+        if account:
+            wait = self._take(f"account:{account.strip().lower()}", self.account_rate, self.account_burst)
+            if wait is not None:
+                self.account_limited.inc()
+                raise AdmissionRejected("too many attempts for this account", wait)
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call for `key` is running,
+    later callers await the same result instead of starting their own.
+    """
+
+    def __init__(self, name: str):
+        self.calls: Dict[str, "asyncio.Task[Any]"] = {}
+        self.leaders = registry.counter(f"{name}.calls")
+        self.coalesced = registry.counter(f"{name}.coalesced")
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.calls.get(key)
+        if task is None:
+            self.leaders.inc()
+            task = asyncio.ensure_future(fn())
+            self.calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced.inc()
+        # Shielded so one caller disconnecting doesn't cancel the others' answer
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: "asyncio.Task[Any]"):
+        self.calls.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+
+# Peers (addresses or CIDR ranges) whose X-Real-IP / X-Forwarded-For headers are believed
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(entry.strip(), strict=False)
+    for entry in os.getenv("TRUSTED_PROXIES", "").split(",")
+    if entry.strip()
+]
+
+
+def _trusted(host: Optional[str]) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except (TypeError, ValueError):
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_id(request: Request) -> str:
+    """
+    Caller address. Forwarding headers are only honoured when the peer is a
+    trusted proxy (nginx); anyone else could set them to dodge rate limits.
+    """
+    peer = request.client.host if request.client else None
+    if not _trusted(peer):
+        return peer or "unknown"
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip.strip()
+    # Rightmost hop that isn't one of our proxies
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _trusted(hop):
+            return hop
+    return peer
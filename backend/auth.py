@@ -4,8 +4,13 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from database import SessionLocal
+from dependencies import get_async_db
+from password_hasher import PasswordHasher
+from principal_cache import Principal, principal_cache
 import models
 import os
 
@@ -14,7 +19,12 @@ SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey123")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 # 1 day
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes below BCRYPT_ROUNDS are re-hashed at the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS, bcrypt__min_rounds=BCRYPT_ROUNDS)
+# For async handlers; the sync helpers below are for scripts
+password_hasher = PasswordHasher(pwd_context)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def verify_password(plain_password, hashed_password):
@@ -40,7 +50,13 @@ def get_db():
     finally:
         db.close()
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    The signed-in user as a Principal (read-only snapshot). Tokens carry the
+    user id in "uid", so repeat requests are served from principal_cache
+    without touching the database; tokens issued before that fall back to a
+    lookup by email.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -53,10 +69,24 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if user is None:
+    user_id = payload.get("uid")
+    if not isinstance(user_id, int):
+        user = await db.scalar(select(models.User).where(models.User.email == email))
+        if user is None:
+            raise credentials_exception
+        return Principal.from_user(user)
+
+    version = await principal_cache.version(user_id)
+    principal = principal_cache.get(user_id, version)
+    if principal is None:
+        user = await db.get(models.User, user_id)
+        if user is None:
+            raise credentials_exception
+        principal = Principal.from_user(user)
+        principal_cache.put(version, principal)
+    if principal.email != email:
         raise credentials_exception
-    return user
+    return principal
 
 async def get_current_admin(current_user: models.User = Depends(get_current_user)):
     if current_user.role != "admin":
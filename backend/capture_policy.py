@@ -0,0 +1,48 @@
+import time
+from typing import NamedTuple
+
+
+class CaptureProfile(NamedTuple):
+    name: str
+    fps: float
+    max_width: int
+
+
+# Ordered from cheapest to most detailed
+PROFILES = [
+    CaptureProfile("stable", 0.5, 320),
+    CaptureProfile("normal", 1.0, 480),
+    CaptureProfile("alert", 2.0, 640),
+]
+DEFAULT_PROFILE = PROFILES[1]
+
+STABLE_AFTER = 20.0 # Seconds without risk events before dropping to "stable"
+ALERT_HOLD = 10.0 # Seconds to stay on "alert" after the last risk event
+
+
+class AdaptiveSampler:
+    """
+    Picks the frame rate and resolution a session's client should send.
+    Sessions with recent risk events get more detail; a quiet session
+    drifts down to the cheapest profile; when the vision workers fall
+    behind every session steps down one level.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def load(self) -> float:
+        """Queued frames relative to what the workers take in one round."""
+        capacity = max(1, self.pipeline.workers * self.pipeline.batch_size)
+        return self.pipeline.pending() / capacity
+
+    def choose(self, started_at: float, last_status: str, last_risk_at: float) -> CaptureProfile:
+        now = time.monotonic()
+        level = 1
+        if last_status != "normal" or (last_risk_at and now - last_risk_at < ALERT_HOLD):
+            level = 2
+        elif now - max(started_at, last_risk_at) >= STABLE_AFTER:
+            level = 0
+        if self.load() > 1.0:
+            level = max(0, level - 1)
+        return PROFILES[level]
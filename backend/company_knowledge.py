@@ -1,5 +1,5 @@
-# Mock Company Knowledge Base
-# This simulates a vector database or document store
+# Company Knowledge Base
+# retrieval.py chunks and indexes it; only the passages that match a question go into the prompt
 
 COMPANY_INFO = """
 【公司简介】
@@ -55,3 +55,13 @@ SYSTEM_PERSONA = """
 【公司知识库】：
 {company_info}
 """
+
+JOB_PERSONA = """
+你是 TechFuture Inc. 的职位助手，正在回答求职者关于【{title}】这个职位的问题。
+1. 只根据下面的【职位资料】回答，语气亲切、简洁。
+2. 资料里的内部信息（如面试考察重点）可以用来帮助理解，但不要原文透露给求职者。
+3. 资料里没有的内容，诚实地说明需要向招聘负责人确认，不要编造。
+
+【职位资料】：
+{passages}
+"""
@@ -1,29 +1,57 @@
 import asyncio
 import json
 import logging
+import os
 import time
-from typing import Dict
+from typing import AsyncIterator, Dict, Optional, Tuple
 from fastapi import WebSocket
+from metrics import registry
 from observer import ObserverAgent
-from services import CozeService, TTSService, STTService
+from reply_stream import ReplyStream
+from services import CozeService, STTService, get_tts
+from voice_activity import StreamingTranscriber
+from ws_protocol import (
+    HEADER, KIND_AUDIO, KIND_CONTROL, KIND_VIDEO, PROTOCOL_BINARY, PROTOCOL_JSON,
+    ProtocolError, decode_frame, encode_frame, negotiate,
+)
 
 logger = logging.getLogger("controller")
 
+# Compressed (webm) answers can't be segmented server-side; cap them instead
+MAX_TURN_AUDIO_BYTES = int(os.getenv("MAX_TURN_AUDIO_BYTES", str(4 * 1024 * 1024)))
+
+turn_latency = registry.summary("interview.turn_latency_ms")
+time_to_first_audio = registry.summary("interview.time_to_first_audio_ms")
+barge_ins = registry.counter("interview.barge_ins")
+
 class InterviewController:
     def __init__(self):
         self.connections: Dict[str, WebSocket] = {}
         self.states: Dict[str, str] = {}  # IDLE, LISTENING, PROCESSING, SPEAKING
-        self.observer = ObserverAgent()
+        self.observer = ObserverAgent(on_capture_change=self._announce_capture)
         self.coze = CozeService()
-        self.tts = TTSService()
+        self.tts = get_tts()
         self.stt = STTService()
         self.audio_buffers: Dict[str, bytearray] = {}
+        self.protocols: Dict[str, str] = {}  # PROTOCOL_JSON unless the client sent HELLO
+        self.send_seq: Dict[str, int] = {}
+        self.last_video_seq: Dict[str, int] = {}
+        # Sessions streaming PCM16 get server-side VAD; others use audio_buffers
+        self.transcribers: Dict[str, StreamingTranscriber] = {}
+        self.turn_tasks: Dict[str, asyncio.Task] = {}
+        self.speech_ended_at: Dict[str, float] = {}
+        # Clients that can play MP3 chunks as they arrive get TTS output unbuffered
+        self.audio_streaming: Dict[str, bool] = {}
+        self.reply_started_at: Dict[str, float] = {}
 
     async def connect(self, session_id: str, websocket: WebSocket):
         self.connections[session_id] = websocket
         self.states[session_id] = "IDLE"
         self.audio_buffers[session_id] = bytearray()
+        self.protocols[session_id] = PROTOCOL_JSON
+        self.send_seq[session_id] = 0
         logger.info(f"Session {session_id} connected")
+        await self.send_capture_config(session_id, self.observer.open(session_id))
 
     def disconnect(self, session_id: str):
         if session_id in self.connections:
@@ -32,23 +60,138 @@ class InterviewController:
             del self.states[session_id]
         if session_id in self.audio_buffers:
             del self.audio_buffers[session_id]
+        self.protocols.pop(session_id, None)
+        self.send_seq.pop(session_id, None)
+        self.last_video_seq.pop(session_id, None)
+        transcriber = self.transcribers.pop(session_id, None)
+        if transcriber:
+            transcriber.cancel()
+        task = self.turn_tasks.pop(session_id, None)
+        if task and not task.done():
+            task.cancel()
+        self.speech_ended_at.pop(session_id, None)
+        self.audio_streaming.pop(session_id, None)
+        self.reply_started_at.pop(session_id, None)
+        self.observer.release(session_id)
 
     async def handle_event(self, session_id: str, data: dict):
         event_type = data.get("type")
         
-        if event_type == "START_INTERVIEW":
-            await self.start_interview(session_id, data.get("payload"))
+        if event_type == "HELLO":
+            protocol = negotiate(data.get("protocols"))
+            self.protocols[session_id] = protocol
+            # Raw chunks need framing so the client can tell replies apart
+            self.audio_streaming[session_id] = bool(data.get("stream_audio")) and protocol == PROTOCOL_BINARY
+            if data.get("audio"):
+                self._configure_audio(session_id, data["audio"])
+            await self.send_json(session_id, {"type": "HELLO_ACK", "protocol": protocol})
+        elif event_type == "AUDIO_FORMAT":
+            # Sent once the client knows how it can capture the microphone
+            self._configure_audio(session_id, data)
+        elif event_type == "START_INTERVIEW":
+            if session_id not in self.turn_tasks:
+                self._run_turn(session_id, self.start_interview(session_id, data.get("payload") or {}))
         elif event_type == "USER_FINISHED_SPEAKING":
-            await self.process_user_response(session_id)
+            self.end_turn(session_id, time.monotonic())
+        elif event_type == "BARGE_IN":
+            await self.barge_in(session_id)
         elif event_type == "VIDEO_FRAME":
-            # Pass to Observer Agent (async)
-            asyncio.create_task(self.observer.analyze_frame(session_id, data.get("payload")))
+            # Hand off to the Observer's worker pool; never blocks the loop
+            payload = data.get("payload")
+            if payload:
+                self.observer.submit_frame(session_id, payload)
+
+    async def handle_binary(self, session_id: str, data: bytes):
+        if self.protocols.get(session_id) != PROTOCOL_BINARY:
+            # Legacy protocol: binary messages are bare audio chunks
+            await self.handle_audio_stream(session_id, data)
+            return
+
+        try:
+            frame = decode_frame(data)
+        except ProtocolError as e:
+            logger.warning(f"Session {session_id} sent a bad frame: {e}")
+            return
+
+        if frame.kind == KIND_AUDIO:
+            await self.handle_audio_stream(session_id, frame.payload)
+        elif frame.kind == KIND_VIDEO:
+            # Frames can overtake each other on reconnect; stale ones are useless
+            if frame.seq <= self.last_video_seq.get(session_id, -1):
+                return
+            self.last_video_seq[session_id] = frame.seq
+            # The worker decodes straight from the message buffer at this offset
+            self.observer.submit_frame(session_id, (frame.data, HEADER.size))
+        elif frame.kind == KIND_CONTROL:
+            await self.handle_event(session_id, frame.control())
+
+    def _configure_audio(self, session_id: str, audio: dict):
+        # Raw PCM lets the server find pauses itself; anything else is opaque
+        previous = self.transcribers.pop(session_id, None)
+        if previous:
+            previous.cancel()
+        if audio.get("format") == "pcm16":
+            sample_rate = int(audio.get("sample_rate") or 16000)
+            self.transcribers[session_id] = StreamingTranscriber(self.stt, sample_rate=sample_rate)
 
     async def handle_audio_stream(self, session_id: str, audio_chunk: bytes):
-        if self.states.get(session_id) == "LISTENING":
-            self.audio_buffers[session_id].extend(audio_chunk)
-            # Optional: Implement VAD here to auto-detect silence
-            # if vad.is_silence(audio_chunk): ...
+        state = self.states.get(session_id)
+        transcriber = self.transcribers.get(session_id)
+        if state == "SPEAKING" and transcriber:
+            # Keep listening while the interviewer talks; speech means barge-in,
+            # and the audio already fed starts the candidate's next turn
+            transcriber.feed(audio_chunk)
+            if transcriber.vad.in_speech:
+                await self.barge_in(session_id)
+            return
+        if state != "LISTENING" or session_id in self.turn_tasks:
+            return
+        if transcriber:
+            if transcriber.feed(audio_chunk):
+                self.end_turn(session_id, transcriber.last_voice_at)
+            return
+
+        buffer = self.audio_buffers[session_id]
+        buffer.extend(audio_chunk)
+        if len(buffer) >= MAX_TURN_AUDIO_BYTES:
+            logger.warning(f"Session {session_id} answer reached {len(buffer)} bytes, ending turn")
+            self.end_turn(session_id, time.monotonic())
+
+    def end_turn(self, session_id: str, speech_ended_at: Optional[float] = None):
+        """Start answering in the background so the socket keeps being read."""
+        task = self.turn_tasks.get(session_id)
+        if task and not task.done():
+            return
+        if self.states.get(session_id) != "LISTENING":
+            return
+        self.speech_ended_at[session_id] = speech_ended_at or time.monotonic()
+        self._run_turn(session_id, self.process_user_response(session_id))
+
+    def _run_turn(self, session_id: str, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        task.add_done_callback(lambda t: self._turn_done(session_id, t))
+        self.turn_tasks[session_id] = task
+
+    async def barge_in(self, session_id: str):
+        """The candidate talked over the interviewer: stop generating and speaking."""
+        task = self.turn_tasks.get(session_id)
+        if self.states.get(session_id) != "SPEAKING" or task is None:
+            return
+        del self.turn_tasks[session_id]
+        task.cancel()
+        barge_ins.inc()
+        self.speech_ended_at.pop(session_id, None)
+        self.reply_started_at.pop(session_id, None)
+        self.states[session_id] = "LISTENING"
+        await self.send_json(session_id, {"type": "AUDIO_CANCEL"})
+
+    def _turn_done(self, session_id: str, task: asyncio.Task):
+        if self.turn_tasks.get(session_id) is task:
+            del self.turn_tasks[session_id]
+        if not task.cancelled() and task.exception():
+            logger.error(f"Turn failed for {session_id}: {task.exception()}")
+            if session_id in self.states:
+                self.states[session_id] = "LISTENING"
 
     async def start_interview(self, session_id: str, candidate_info: dict):
         self.states[session_id] = "PROCESSING"
@@ -56,14 +199,8 @@ class InterviewController:
         # 1. Generate Context (Profiler Agent - Mocked)
         logger.info(f"Generating profile for {candidate_info.get('name')}")
         
-        # 2. Wake up Coze Agent
-        intro_text = await self.coze.chat(session_id, "START_INTERVIEW", candidate_info)
-        
-        # 3. TTS
-        audio_content = await self.tts.synthesize(intro_text)
-        
-        # 4. Send Audio + Text to Client
-        await self.send_response(session_id, intro_text, audio_content)
+        # 2. Wake up Coze Agent and speak the intro as it streams in
+        await self.speak(session_id, self.coze.chat_stream(session_id, "START_INTERVIEW", candidate_info))
         self.states[session_id] = "LISTENING"
 
     async def process_user_response(self, session_id: str):
@@ -75,10 +212,14 @@ class InterviewController:
         # 1. Notify Client to show "Thinking" state
         await self.send_json(session_id, {"type": "STATE_CHANGE", "state": "THINKING"})
         
-        # 2. STT (Convert audio buffer to text)
-        audio_data = self.audio_buffers[session_id]
-        user_text = await self.stt.transcribe(audio_data)
-        self.audio_buffers[session_id] = bytearray() # Clear buffer
+        # 2. STT (most segments are already transcribed when VAD is on)
+        transcriber = self.transcribers.get(session_id)
+        if transcriber:
+            user_text = await transcriber.finish()
+        else:
+            audio_data = bytes(self.audio_buffers[session_id])
+            self.audio_buffers[session_id] = bytearray() # Clear buffer
+            user_text = await self.stt.transcribe(audio_data)
         
         logger.info(f"User said: {user_text}")
         
@@ -92,28 +233,9 @@ class InterviewController:
             "history": [] # Maintain history if needed, or Coze does it
         }
         
-        ai_response = await self.coze.chat(session_id, user_text, coze_payload)
-        
-        # 5. Parse AI Response (JSON)
-        # Assuming Coze returns JSON string like {"reply": "...", "action": "..."}
-        try:
-            # For robustness, handle if it's just text
-            if isinstance(ai_response, str) and ai_response.strip().startswith("{"):
-                response_data = json.loads(ai_response)
-                reply_text = response_data.get("reply", "Error parsing response")
-                action = response_data.get("action", "NEXT_QUESTION")
-            else:
-                reply_text = ai_response
-                action = "NEXT_QUESTION"
-        except:
-            reply_text = ai_response
-            action = "NEXT_QUESTION"
-            
-        # 6. TTS
-        audio_content = await self.tts.synthesize(reply_text)
-        
-        # 7. Send back
-        await self.send_response(session_id, reply_text, audio_content)
+        # 5. Stream the reply: each sentence goes to TTS as soon as it is complete
+        # and its audio to the client as it is produced
+        _, action = await self.speak(session_id, self.coze.chat_stream(session_id, user_text, coze_payload))
         
         if action == "END_INTERVIEW":
             self.states[session_id] = "FINISHED"
@@ -121,17 +243,88 @@ class InterviewController:
         else:
             self.states[session_id] = "LISTENING"
 
-    async def send_response(self, session_id: str, text: str, audio: bytes):
+    async def speak(self, session_id: str, deltas: AsyncIterator[str]) -> Tuple[str, str]:
+        """
+        Pipeline LLM -> TTS -> socket. The LLM stream is read in its own task
+        and cut into sentences; sentences are synthesized in order while the
+        next ones are still being generated. Cancelling the caller (barge-in)
+        stops both. Returns the full reply text and the agent's action.
+        """
+        self.states[session_id] = "SPEAKING"
+        self.reply_started_at[session_id] = time.monotonic()
+        reply = ReplyStream()
+        sentences: asyncio.Queue = asyncio.Queue()
+        result = {"action": "NEXT_QUESTION"}
+
+        async def generate():
+            try:
+                async for delta in deltas:
+                    for sentence in reply.feed(delta):
+                        sentences.put_nowait(sentence)
+                tail, result["action"] = reply.close()
+                for sentence in tail:
+                    sentences.put_nowait(sentence)
+                await self.send_json(session_id, {"type": "AI_RESPONSE", "text": reply.text})
+            finally:
+                sentences.put_nowait(None)
+
+        generator = asyncio.get_running_loop().create_task(generate())
+        try:
+            while True:
+                sentence = await sentences.get()
+                if sentence is None:
+                    break
+                await self._speak_sentence(session_id, sentence)
+            await generator  # surface LLM errors
+        finally:
+            generator.cancel()
+        await self.send_json(session_id, {"type": "AUDIO_END"})
+        return reply.text, result["action"]
+
+    async def _speak_sentence(self, session_id: str, sentence: str):
+        if self.audio_streaming.get(session_id):
+            async for chunk in self.tts.stream(sentence):
+                await self._send_audio(session_id, chunk)
+        else:
+            # One playable clip per sentence for clients that can't append MP3 chunks
+            await self._send_audio(session_id, await self.tts.synthesize(sentence))
+
+    async def _send_audio(self, session_id: str, audio: bytes):
         ws = self.connections.get(session_id)
-        if ws:
-            # Send text metadata first
-            await ws.send_json({
-                "type": "AI_RESPONSE",
-                "text": text
-            })
-            # Send audio binary
-            if audio:
-                await ws.send_bytes(audio)
+        if not ws or not audio:
+            return
+        await ws.send_bytes(self._frame_outgoing(session_id, KIND_AUDIO, audio))
+        now = time.monotonic()
+        started_at = self.reply_started_at.pop(session_id, None)
+        if started_at is not None:
+            time_to_first_audio.observe((now - started_at) * 1000)
+        ended_at = self.speech_ended_at.pop(session_id, None)
+        if ended_at is not None:
+            turn_latency.observe((now - ended_at) * 1000)
+
+    def _frame_outgoing(self, session_id: str, kind: int, payload: bytes) -> bytes:
+        if self.protocols.get(session_id) != PROTOCOL_BINARY:
+            return payload
+        seq = self.send_seq.get(session_id, 0)
+        self.send_seq[session_id] = seq + 1
+        return encode_frame(kind, seq, payload)
+
+    async def send_capture_config(self, session_id: str, profile):
+        # Tells the client how often and how large to send VIDEO_FRAMEs
+        await self.send_json(session_id, {
+            "type": "CAPTURE_CONFIG",
+            "profile": profile.name,
+            "fps": profile.fps,
+            "max_width": profile.max_width
+        })
+
+    def _announce_capture(self, session_id: str, profile):
+        async def announce():
+            try:
+                await self.send_capture_config(session_id, profile)
+            except Exception as e:
+                logger.debug(f"Could not send capture config to {session_id}: {e}")
+        asyncio.get_running_loop().create_task(announce())
 
     async def send_json(self, session_id: str, data: dict):
         ws = self.connections.get(session_id)
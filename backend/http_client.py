@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from metrics import registry
+
+logger = logging.getLogger("http_client")
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+# Defaults per upstream; each can be overridden with <NAME>_BASE_URL,
+# <NAME>_MAX_CONCURRENCY and <NAME>_TIMEOUT
+PROVIDER_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "deepseek": {"base_url": "https://api.deepseek.com", "max_concurrency": 16, "timeout": 60},
+    "claude": {"base_url": "https://api.anthropic.com", "max_concurrency": 8, "timeout": 60},
+    "coze": {"base_url": "https://api.coze.cn", "max_concurrency": 32, "timeout": 60},
+    "stt": {"base_url": "https://api.groq.com/openai/v1", "max_concurrency": 16, "timeout": 30},
+    "tts": {"base_url": "https://api.openai.com/v1", "max_concurrency": 16, "timeout": 30},
+}
+
+
+class UpstreamError(Exception):
+    """The upstream could not be reached or kept failing after retries."""
+
+    def __init__(self, provider: str, detail: str):
+        super().__init__(f"{provider}: {detail}")
+        self.provider = provider
+
+
+class CircuitOpen(UpstreamError):
+    """Calls are short-circuited because the upstream failed repeatedly."""
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `reset_after` seconds; then lets one trial call through (half-open) and
+    closes again if it succeeds.
+    """
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_running or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self._trial_running = False
+
+    def release(self):
+        """The call was abandoned (e.g. cancelled) before it told us anything."""
+        self._trial_running = False
+
+
+class ProviderClient:
+    """
+    One upstream API on top of the shared connection pool: base URL, default
+    headers, a concurrency cap, timeouts, retries with full-jitter backoff
+    and a circuit breaker.
+    """
+
+    def __init__(
+        self,
+        pool: "HttpClientPool",
+        name: str,
+        base_url: str,
+        max_concurrency: int = 16,
+        timeout: float = 30,
+        retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.pool = pool
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.headers: Dict[str, str] = {}
+        self.max_concurrency = max_concurrency
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.in_flight = 0
+        self._slots: Optional[asyncio.Semaphore] = None  # created on the serving loop
+        self.requests = registry.counter(f"http.{name}.requests")
+        self.retried = registry.counter(f"http.{name}.retries")
+        self.failed = registry.counter(f"http.{name}.failures")
+        self.rejected = registry.counter(f"http.{name}.circuit_rejections")
+        registry.gauge(f"http.{name}.in_flight", lambda: self.in_flight)
+        registry.gauge(f"http.{name}.circuit", lambda: self.breaker.state)
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        # Full jitter keeps retries from many sessions from arriving in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _record_failure(self):
+        was_closed = self.breaker.opened_at is None
+        self.breaker.record_failure()
+        if was_closed and self.breaker.opened_at is not None:
+            logger.warning(f"{self.name}: circuit opened after {self.breaker.failures} failures")
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streaming request. Connection errors and retryable statuses are
+        retried before the body is handed out; once the caller starts reading,
+        errors propagate. Non-2xx responses that can't be retried are returned
+        as-is for the caller to inspect.
+        """
+        if not self.breaker.allow():
+            self.rejected.inc()
+            raise CircuitOpen(self.name, "circuit open")
+        url = path if path.startswith("http") else self.base_url + path
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        client = self.pool.client()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        settled = False
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                attempt = 0
+                while True:
+                    self.requests.inc()
+                    request = client.build_request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+                    try:
+                        response = await client.send(request, stream=True)
+                    except httpx.TransportError as e:
+                        self.failed.inc()
+                        if attempt >= self.retries:
+                            settled = True
+                            self._record_failure()
+                            raise UpstreamError(self.name, f"{type(e).__name__}: {e}") from e
+                        await asyncio.sleep(self._backoff(attempt))
+                        attempt += 1
+                        self.retried.inc()
+                        continue
+
+                    if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                        self.failed.inc()
+                        delay = self._backoff(attempt, response)
+                        await response.aread()  # drained, the connection goes back to the pool
+                        await response.aclose()
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                        self.retried.inc()
+                        continue
+
+                    settled = True
+                    if response.status_code >= 500:
+                        self.failed.inc()
+                        self._record_failure()
+                    else:
+                        self.breaker.record_success()
+                    try:
+                        yield response
+                    finally:
+                        await response.aclose()
+                    return
+            finally:
+                self.in_flight -= 1
+                if not settled:
+                    self.breaker.release()
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        async with self.stream(method, path, **kwargs) as response:
+            await response.aread()
+            return response
+
+    async def post_json(self, path: str, payload: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """POST JSON and return the decoded body; raises UpstreamError on non-2xx."""
+        response = await self.request("POST", path, json=payload, **kwargs)
+        if response.status_code >= 400:
+            raise UpstreamError(self.name, f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+
+class HttpClientPool:
+    """
+    A single httpx.AsyncClient (keep-alive pool, HTTP/2 when `h2` is
+    installed) shared by every outbound integration, plus one ProviderClient
+    per upstream. TLS handshakes are paid once per connection, not per call.
+    """
+
+    def __init__(self, max_connections: Optional[int] = None, max_keepalive: Optional[int] = None):
+        self.max_connections = max_connections or int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.max_keepalive = max_keepalive or int(os.getenv("HTTP_MAX_KEEPALIVE", "50"))
+        self.http2 = _http2_available() and os.getenv("HTTP2", "1") != "0"
+        self.providers: Dict[str, ProviderClient] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=60,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    def provider(self, name: str, **overrides) -> ProviderClient:
+        """The client for one upstream: defaults, then <NAME>_* env, then explicit overrides."""
+        if name not in self.providers:
+            prefix = name.upper()
+            config: Dict[str, Any] = {"base_url": "", "retries": int(os.getenv("HTTP_RETRIES", "2"))}
+            config.update(PROVIDER_DEFAULTS.get(name, {}))
+            for key, cast in (("base_url", str), ("max_concurrency", int), ("timeout", float)):
+                value = os.getenv(f"{prefix}_{key.upper()}")
+                if value:
+                    config[key] = cast(value)
+            config.update(overrides)
+            self.providers[name] = ProviderClient(self, name, **config)
+        return self.providers[name]
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_pool: Optional[HttpClientPool] = None
+
+
+def get_http() -> HttpClientPool:
+    global _pool
+    if _pool is None:
+        _pool = HttpClientPool()
+    return _pool
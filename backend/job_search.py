@@ -0,0 +1,216 @@
+import base64
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, and_, func, literal, or_, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+import models
+
+logger = logging.getLogger("job_search")
+
+FACETS = ("department", "location", "type")
+# Fields of the list view; description/requirements/knowledge bases stay out
+LIST_FIELDS = ("id", "title", "department", "location", "type", "salary_range")
+# The list shows a short excerpt of the description, cut in SQL
+SUMMARY_CHARS = 120
+# bm25() column weights: a title hit counts more than one in the body
+FTS_WEIGHTS = "10.0, 2.0, 1.0"
+
+_fts_enabled = False
+
+FTS_SCHEMA = [
+    # External-content table: the text lives in jobs, FTS5 only keeps the index.
+    # trigram tokenizes CJK without word segmentation and also accelerates LIKE.
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, description, requirements,
+        content='jobs', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, description, requirements)
+        VALUES (new.id, new.title, new.description, new.requirements);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, requirements)
+        VALUES ('delete', old.id, old.title, old.description, old.requirements);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, description, requirements ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description, requirements)
+        VALUES ('delete', old.id, old.title, old.description, old.requirements);
+        INSERT INTO jobs_fts(rowid, title, description, requirements)
+        VALUES (new.id, new.title, new.description, new.requirements);
+    END
+    """,
+]
+
+# Filter columns are indexed in models.Job; tables created before that get them here
+FILTER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_jobs_department ON jobs (department)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_location ON jobs (location)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_type ON jobs (type)",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_is_active ON jobs (is_active)",
+]
+
+
+def create_search_index(conn: Connection):
+    """
+    Create the FTS index and its sync triggers (SQLite only), backfilling
+    existing jobs. Run by migration 0003; without trigram support (SQLite
+    older than 3.34) search keeps using LIKE matching.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    for statement in FILTER_INDEXES:
+        conn.execute(text(statement))
+    try:
+        existed = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'")).first() is not None
+        for statement in FTS_SCHEMA:
+            conn.execute(text(statement))
+    except Exception as e:
+        logger.warning(f"Job search: FTS5 trigram unavailable ({e}), using LIKE matching")
+        return
+    if not existed:
+        conn.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+
+
+def detect_search_index(engine: Engine):
+    """Use the FTS index if the migrations created it."""
+    global _fts_enabled
+    if engine.dialect.name != "sqlite":
+        logger.info("Job search: no FTS5 on this database, using LIKE matching")
+        return
+    with engine.connect() as conn:
+        _fts_enabled = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'")).first() is not None
+    if not _fts_enabled:
+        logger.info("Job search: no FTS index, using LIKE matching")
+
+
+def encode_cursor(data: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(data, dict) or not isinstance(data.get("id"), int):
+            raise ValueError(cursor)
+        return data
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _split_terms(q: str) -> Tuple[List[str], List[str]]:
+    """Terms of 3+ characters go to FTS; trigram can't match shorter ones, they use LIKE."""
+    long_terms, short_terms = [], []
+    for term in q.split():
+        (long_terms if _fts_enabled and len(term) >= 3 else short_terms).append(term)
+    return long_terms, short_terms
+
+
+def _fts_query(terms: List[str]) -> str:
+    # Each term as a quoted phrase, so FTS5 syntax characters are taken literally
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _like_filter(term: str):
+    pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return or_(
+        models.Job.title.like(pattern, escape="\\"),
+        models.Job.description.like(pattern, escape="\\"),
+        models.Job.requirements.like(pattern, escape="\\"),
+    )
+
+
+def search_jobs(
+    db: Session,
+    q: Optional[str] = None,
+    filters: Optional[Dict[str, Optional[str]]] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+) -> Dict[str, Any]:
+    """
+    One page of active jobs matching the text query and facet filters, plus
+    facet counts. Text matches are ordered by relevance, everything else by
+    newest first; `next_cursor` continues after the last item.
+    """
+    filters = {k: v for k, v in (filters or {}).items() if k in FACETS and v}
+    long_terms, short_terms = _split_terms(q or "")
+
+    rank = None
+    base = db.query(models.Job).filter(models.Job.is_active == 1)
+    if long_terms:
+        # LIMIT -1 keeps SQLite from flattening the subquery into the join,
+        # which would re-run the MATCH once per jobs row; this way it is
+        # evaluated once and materialized
+        fts = (
+            text(
+                f"SELECT rowid AS job_id, bm25(jobs_fts, {FTS_WEIGHTS}) AS rank "
+                "FROM jobs_fts WHERE jobs_fts MATCH :match LIMIT -1"
+            )
+            .bindparams(match=_fts_query(long_terms))
+            .columns(job_id=Integer, rank=Float)
+            .subquery("fts")
+        )
+        base = base.join(fts, fts.c.job_id == models.Job.id)
+        rank = fts.c.rank
+    for term in short_terms:
+        base = base.filter(_like_filter(term))
+
+    def filtered(skip: Optional[str] = None):
+        query = base
+        for field, value in filters.items():
+            if field != skip:
+                query = query.filter(getattr(models.Job, field) == value)
+        return query
+
+    # Each facet is counted with every filter except its own, so the UI can
+    # show how many results picking another value would give
+    facets: Dict[str, List[Dict[str, Any]]] = {}
+    for field in FACETS:
+        column = getattr(models.Job, field)
+        rows = (
+            filtered(skip=field)
+            .with_entities(column, func.count(models.Job.id))
+            .group_by(column)
+            .order_by(func.count(models.Job.id).desc(), column)
+            .all()
+        )
+        facets[field] = [{"value": value, "count": count} for value, count in rows if value]
+
+    page = filtered()
+    total = page.with_entities(func.count(models.Job.id)).scalar()
+    after = decode_cursor(cursor) if cursor else None
+    if rank is not None:
+        if after is not None:
+            after_rank = after.get("rank", 0.0)
+            page = page.filter(or_(rank > after_rank, and_(rank == after_rank, models.Job.id > after["id"])))
+        order = (rank, models.Job.id)
+    else:
+        if after is not None:
+            page = page.filter(models.Job.id < after["id"])
+        order = (models.Job.id.desc(),)
+
+    columns = [getattr(models.Job, f) for f in LIST_FIELDS]
+    summary = func.substr(models.Job.description, 1, SUMMARY_CHARS).label("summary")
+    rows = (
+        page.with_entities(*columns, summary, rank if rank is not None else literal(None))
+        .order_by(*order)
+        .limit(limit + 1)
+        .all()
+    )
+    items = [dict(zip(LIST_FIELDS + ("summary",), row[:-1])) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor({"id": last.id, "rank": last[-1]} if rank is not None else {"id": last.id})
+    return {"items": items, "facets": facets, "total": total, "next_cursor": next_cursor}
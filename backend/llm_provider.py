@@ -1,6 +1,24 @@
+import json
 import os
 from typing import Any, Dict, Optional
 
+from http_client import UpstreamError, get_http
+
+EXTRACT_PROMPT = (
+    "Extract the candidate's resume into JSON with keys: name, email, phone, "
+    "skills (list of strings), education (list of {school, degree, major, period}), "
+    "experience (list of {company, title, period, description}). "
+    "Reply with the JSON object only."
+)
+
+
+def _parse_json(text: str) -> Dict[str, Any]:
+    # Models sometimes wrap the object in prose or a code fence
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("LLM reply contains no JSON object")
+    return json.loads(text[start:end + 1])
+
 
 class LLMProvider:
     async def extract_resume(self, text: str) -> Dict[str, Any]:
@@ -10,17 +28,44 @@ class LLMProvider:
 class DeepSeekProvider(LLMProvider):
     def __init__(self, api_key: str):
         self.api_key = api_key
+        self.model = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
 
     async def extract_resume(self, text: str) -> Dict[str, Any]:
-        raise NotImplementedError
+        data = await get_http().provider("deepseek").post_json(
+            "/v1/chat/completions",
+            {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": EXTRACT_PROMPT},
+                    {"role": "user", "content": text},
+                ],
+                "response_format": {"type": "json_object"},
+            },
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        return _parse_json(data["choices"][0]["message"]["content"])
 
 
 class ClaudeProvider(LLMProvider):
     def __init__(self, api_key: str):
         self.api_key = api_key
+        self.model = os.getenv("CLAUDE_MODEL", "claude-3-5-haiku-latest")
 
     async def extract_resume(self, text: str) -> Dict[str, Any]:
-        raise NotImplementedError
+        data = await get_http().provider("claude").post_json(
+            "/v1/messages",
+            {
+                "model": self.model,
+                "max_tokens": 2048,
+                "system": EXTRACT_PROMPT,
+                "messages": [{"role": "user", "content": text}],
+            },
+            headers={"x-api-key": self.api_key, "anthropic-version": "2023-06-01"},
+        )
+        parts = [block.get("text", "") for block in data.get("content", []) if block.get("type") == "text"]
+        if not parts:
+            raise UpstreamError("claude", "empty response")
+        return _parse_json("".join(parts))
 
 
 def create_llm_provider() -> Optional[LLMProvider]:
@@ -35,4 +80,3 @@ def create_llm_provider() -> Optional[LLMProvider]:
     if provider == "claude":
         return ClaudeProvider(api_key=api_key)
     return None
-
@@ -6,11 +6,11 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
+import asyncio
 import logging
-import sqlite3
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from database import engine, SessionLocal, async_engine
 from dotenv import load_dotenv
 
 # Load env vars
@@ -26,48 +26,26 @@ if not SECRET_KEY or SECRET_KEY == "supersecretkey123":
         sys.exit("Error: SECRET_KEY must be set in production.")
 
 # Routers
-from routers import auth, jobs, applications, users, ai, notifications, interview
+from routers import auth, jobs, applications, users, ai, notifications, interview, metrics, files
 from routers import webhooks as webhooks_router
-
-# Create DB Tables
-Base.metadata.create_all(bind=engine)
-
-def _ensure_sqlite_schema():
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sql_app.db")
-    db_path = os.path.abspath(db_path)
-    if not os.path.exists(db_path):
-        return
-    conn = sqlite3.connect(db_path)
-    try:
-        cursor = conn.cursor()
-
-        def table_exists(name: str) -> bool:
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,))
-            return cursor.fetchone() is not None
-
-        def column_exists(table: str, column: str) -> bool:
-            cursor.execute(f"PRAGMA table_info({table})")
-            return any(row[1] == column for row in cursor.fetchall())
-
-        def add_column(table: str, column_def: str):
-            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column_def}")
-
-        if table_exists("users") and not column_exists("users", "profile_data"):
-            add_column("users", "profile_data TEXT")
-
-        if table_exists("applications") and not column_exists("applications", "structured_resume"):
-            add_column("applications", "structured_resume TEXT")
-
-        conn.commit()
-    finally:
-        conn.close()
-
-_ensure_sqlite_schema()
+from http_client import get_http
+from auth import password_hasher
+from tts_warmup import warm_fixed_prompts
+from retrieval import knowledge_index
+from job_search import detect_search_index
+from migrate import pending_migrations
+import models
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("server")
 
+# Schema changes are applied by `python migrate.py` before the app starts
+_pending = pending_migrations(engine)
+if _pending:
+    logger.warning(f"Database has pending migrations ({', '.join(_pending)}); run `python migrate.py`")
+detect_search_index(engine)
+
 app = FastAPI(title="AI Interviewer Backend")
 
 # Ensure upload dir
@@ -94,6 +72,30 @@ app.include_router(ai.router)
 app.include_router(notifications.router)
 app.include_router(interview.router)
 app.include_router(webhooks_router.router)
+app.include_router(metrics.router)
+app.include_router(files.router)
+
+@app.on_event("startup")
+async def warm_tts_cache():
+    # Greeting and fixed questions; runs in the background, misses just render live
+    asyncio.get_running_loop().create_task(warm_fixed_prompts())
+
+@app.on_event("startup")
+def build_knowledge_index():
+    # Company passages are indexed by DeepSeekService; jobs are added here and on create/edit
+    db = SessionLocal()
+    try:
+        knowledge_index.index_jobs(db.query(models.Job).filter(models.Job.is_active == 1).all())
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    applications.parse_engine.shutdown()
+    password_hasher.shutdown()
+    interview.controller.observer.shutdown()
+    await get_http().aclose()
+    await async_engine.dispose()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,85 @@
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict
+
+
+class Counter:
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+
+class Summary:
+    """Latency-style observations; reports count and percentiles of a recent window."""
+
+    def __init__(self, name: str, description: str = "", window: int = 1024):
+        self.name = name
+        self.description = description
+        self.count = 0
+        self.samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.samples.append(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            ordered = sorted(self.samples)
+            count = self.count
+        if not ordered:
+            return {"count": count}
+
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 2)
+
+        return {"count": count, "p50": pct(0.5), "p90": pct(0.9), "p99": pct(0.99), "max": round(ordered[-1], 2)}
+
+
+class MetricsRegistry:
+    """
+    Process-local counters, summaries and gauges, exposed through GET /admin/metrics.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, Counter] = {}
+        self.summaries: Dict[str, Summary] = {}
+        self.gauges: Dict[str, Callable[[], object]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        with self._lock:
+            if name not in self.counters:
+                self.counters[name] = Counter(name, description)
+            return self.counters[name]
+
+    def summary(self, name: str, description: str = "") -> Summary:
+        with self._lock:
+            if name not in self.summaries:
+                self.summaries[name] = Summary(name, description)
+            return self.summaries[name]
+
+    def gauge(self, name: str, read: Callable[[], object]):
+        """Register a callable sampled at snapshot time."""
+        self.gauges[name] = read
+
+    def snapshot(self) -> Dict[str, object]:
+        data: Dict[str, object] = {name: c.value for name, c in self.counters.items()}
+        for name, summary in self.summaries.items():
+            data[name] = summary.snapshot()
+        for name, read in self.gauges.items():
+            try:
+                data[name] = read()
+            except Exception:
+                data[name] = None
+        return data
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,106 @@
+"""
+Versioned schema migrations.
+
+Each migrations/NNNN_name.py has an upgrade(conn) function. Applied versions
+are recorded in schema_migrations, and every migration runs in its own
+transaction. Run once per deploy, before the app starts (the server itself
+only warns about pending migrations):
+
+    python migrate.py            # apply pending migrations
+    python migrate.py --status   # list applied and pending ones
+"""
+import argparse
+import importlib
+import logging
+import os
+import re
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger("migrate")
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String, primary_key=True),
+    Column("name", String),
+    Column("applied_at", DateTime),
+)
+
+
+def available_migrations() -> List[Tuple[str, str]]:
+    """(version, module name) of every migration file, in order."""
+    found = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _FILE_PATTERN.match(filename)
+        if match:
+            found.append((match.group(1), filename[:-3]))
+    return sorted(found)
+
+
+def applied_versions(engine: Engine) -> List[str]:
+    if not inspect(engine).has_table("schema_migrations"):
+        return []
+    with engine.connect() as conn:
+        return [row.version for row in conn.execute(select(schema_migrations.c.version))]
+
+
+def pending_migrations(engine: Engine) -> List[str]:
+    applied = set(applied_versions(engine))
+    return [module for version, module in available_migrations() if version not in applied]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Apply pending migrations in order; returns the ones applied."""
+    schema_migrations.create(bind=engine, checkfirst=True)
+    applied = set(applied_versions(engine))
+    done = []
+    for version, module_name in available_migrations():
+        if version in applied:
+            continue
+        module = importlib.import_module(f"migrations.{module_name}")
+        logger.info(f"Applying migration {module_name}")
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(version=version, name=module_name, applied_at=datetime.utcnow()))
+        done.append(module_name)
+    return done
+
+
+# Helpers for migrations. Databases created by `0001_baseline` already have
+# the current models' columns and indexes, so later changes must be no-ops
+# when they are already there.
+
+def add_column(conn: Connection, table: str, column_ddl: str):
+    """ALTER TABLE ADD COLUMN unless the table is missing or already has it."""
+    inspector = inspect(conn)
+    name = column_ddl.split()[0]
+    if inspector.has_table(table) and name not in {c["name"] for c in inspector.get_columns(table)}:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column_ddl}"))
+
+
+def create_index(conn: Connection, name: str, table: str, columns: Sequence[str]):
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.status:
+        applied = set(applied_versions(engine))
+        for version, module_name in available_migrations():
+            print(f"{'applied' if version in applied else 'pending':<8} {module_name}")
+    else:
+        done = run_migrations(engine)
+        print(f"Applied {len(done)} migration(s)" if done else "Database is up to date")
@@ -0,0 +1,13 @@
+"""
+Creates the tables a new database is missing, and adds the columns that
+SQLite files from before profiles and structured resumes lack.
+"""
+from database import Base
+from migrate import add_column
+import models  # noqa: F401  registers the tables on Base
+
+
+def upgrade(conn):
+    Base.metadata.create_all(bind=conn)
+    add_column(conn, "users", "profile_data JSON")
+    add_column(conn, "applications", "structured_resume JSON")
@@ -0,0 +1,19 @@
+"""
+Indexes for the per-request lookups: applications and notifications by
+user, interviews by application, and the admin application listing.
+"""
+from migrate import create_index
+
+INDEXES = [
+    ("ix_applications_user_id", "applications", ["user_id"]),
+    ("ix_applications_job_id_created_at", "applications", ["job_id", "created_at"]),
+    ("ix_applications_status_created_at", "applications", ["status", "created_at"]),
+    ("ix_applications_created_at", "applications", ["created_at"]),
+    ("ix_notifications_user_id_created_at", "notifications", ["user_id", "created_at"]),
+    ("ix_interviews_application_id", "interviews", ["application_id"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
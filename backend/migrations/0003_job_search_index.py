@@ -0,0 +1,6 @@
+"""Job filter indexes and the FTS5 search index with its sync triggers (SQLite)."""
+from job_search import create_search_index
+
+
+def upgrade(conn):
+    create_search_index(conn)
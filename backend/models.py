@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -34,25 +34,31 @@ class Job(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
-    department = Column(String)
-    location = Column(String)
-    type = Column(String, default="全职")
+    department = Column(String, index=True)
+    location = Column(String, index=True)
+    type = Column(String, default="全职", index=True)
     salary_range = Column(String)
     description = Column(Text)
     requirements = Column(Text)
     knowledge_base = Column(Text)
     public_knowledge = Column(Text, nullable=True)
-    is_active = Column(Integer, default=1)
+    is_active = Column(Integer, default=1, index=True)
 
     applications = relationship("Application", back_populates="job", cascade="all, delete-orphan")
 
 
 class Application(Base):
     __tablename__ = "applications"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Admin listing: filter by status or job, newest first (keyset on created_at, id)
+        Index("ix_applications_status_created_at", "status", "created_at"),
+        Index("ix_applications_job_id_created_at", "job_id", "created_at"),
+        Index("ix_applications_created_at", "created_at"),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     job_id = Column(Integer, ForeignKey("jobs.id"))
     status = Column(String, default="pending")
     github_link = Column(String, nullable=True)
@@ -70,7 +76,7 @@ class InterviewRecord(Base):
     __table_args__ = {"extend_existing": True}
 
     id = Column(Integer, primary_key=True, index=True)
-    application_id = Column(Integer, ForeignKey("applications.id"))
+    application_id = Column(Integer, ForeignKey("applications.id"), index=True)
     start_time = Column(DateTime)
     end_time = Column(DateTime, nullable=True)
     
@@ -88,7 +94,11 @@ class InterviewRecord(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # A user's notifications, newest first
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at"),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -99,3 +109,17 @@ class Notification(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     owner = relationship("User", back_populates="notifications")
+
+
+class ParsedResume(Base):
+    __tablename__ = "parsed_resumes"
+    __table_args__ = (
+        UniqueConstraint("content_hash", "parser_version", name="uq_parsed_resume_hash_version"),
+        {"extend_existing": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), index=True) # SHA-256 of the PDF bytes
+    parser_version = Column(String)
+    result = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
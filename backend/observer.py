@@ -1,83 +1,124 @@
 import logging
-import base64
-import cv2
-import numpy as np
-import mediapipe as mp
-import json
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from capture_policy import DEFAULT_PROFILE, AdaptiveSampler, CaptureProfile
+from metrics import registry
+from vision_pipeline import VisionPipeline
 
 logger = logging.getLogger("observer")
 
-class ObserverAgent:
+RISK_EVENT_HISTORY = 64 # Risk events kept per session (ring buffer)
+
+class SessionObserverState:
+    """Everything the observer tracks for one interview; dropped on disconnect."""
+    __slots__ = ("started_at", "frame_count", "last_status", "risk_count", "events",
+                 "last_risk_at", "last_sampled_at", "profile")
+
     def __init__(self):
-        self.risk_logs = []
-        self.mp_face_mesh = None
-        self.face_mesh = None
-        self.last_status = "normal"
+        self.started_at = time.monotonic()
         self.frame_count = 0
+        self.last_status = "normal"
+        self.risk_count = 0 # Total, including events rotated out of the ring
+        self.events: Deque[Tuple[float, int, str]] = deque(maxlen=RISK_EVENT_HISTORY)
+        self.last_risk_at = 0.0
+        self.last_sampled_at = 0.0
+        self.profile = DEFAULT_PROFILE
+
+    def record(self, event: str):
+        now = time.monotonic()
+        self.risk_count += 1
+        self.last_risk_at = now
+        self.events.append((round(now - self.started_at, 1), self.frame_count, event))
 
-    def _init_model(self):
-        if self.face_mesh is None:
-            logger.info("Initializing MediaPipe FaceMesh...")
-            self.mp_face_mesh = mp.solutions.face_mesh
-            self.face_mesh = self.mp_face_mesh.FaceMesh(
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
-
-    async def analyze_frame(self, session_id: str, frame_data: str):
+class ObserverAgent:
+    def __init__(self, on_capture_change: Optional[Callable[[str, CaptureProfile], None]] = None):
+        self.sessions: Dict[str, SessionObserverState] = {}
+        # Decoding and FaceMesh inference run in worker processes
+        self.pipeline = VisionPipeline(on_result=self._on_result)
+        self.sampler = AdaptiveSampler(self.pipeline)
+        # Called when a session's capture profile changes, to notify the client
+        self.on_capture_change = on_capture_change
+        registry.gauge("observer.sessions", lambda: len(self.sessions))
+        registry.gauge("vision.pending_frames", self.pipeline.pending)
+        registry.gauge("vision.frames_dropped", lambda: self.pipeline.frames_dropped)
+        registry.gauge("vision.frames_done", lambda: self.pipeline.frames_done)
+
+    def open(self, session_id: str) -> CaptureProfile:
+        """Start tracking a session; returns the capture profile to announce."""
+        state = self.sessions[session_id] = SessionObserverState()
+        return state.profile
+
+    def submit_frame(self, session_id: str, frame_data: Any):
         """
-        Analyze video frame (base64).
-        Detect faces, gaze, phone, etc.
+        Queue a video frame for analysis: a base64 data URL (JSON protocol)
+        or a (message bytes, payload offset) pair (binary protocol).
+        Returns immediately; results arrive via _on_result.
         """
-        self._init_model()
-        self.frame_count += 1
-        if self.frame_count % 5 != 0: # Process every 5th frame to save CPU
+        state = self.sessions.get(session_id)
+        if state is None:
+            state = self.sessions[session_id] = SessionObserverState()
+        state.frame_count += 1
+        self._update_profile(session_id, state)
+
+        # Clients that ignore CAPTURE_CONFIG may send faster than asked
+        now = time.monotonic()
+        if now - state.last_sampled_at < 0.8 / state.profile.fps:
             return
+        state.last_sampled_at = now
+        self.pipeline.submit(session_id, frame_data)
 
-        try:
-            # Decode base64
-            if "," in frame_data:
-                frame_data = frame_data.split(",")[1]
-            image_bytes = base64.b64decode(frame_data)
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if image is None:
-                return
-
-            # Convert to RGB
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            results = self.face_mesh.process(image_rgb)
-
-            risk_event = None
-            current_status = "normal"
-
-            if not results.multi_face_landmarks:
-                current_status = "no_face_detected"
-                risk_event = "NO_FACE"
-            else:
-                # Simple Gaze Check (heuristic based on iris position)
-                landmarks = results.multi_face_landmarks[0].landmark
-                # Left Iris: 468, Right Iris: 473
-                # We can check if they are too far left/right/up/down
-                # For MVP, let's just assume presence is enough, or implement simple check
-                pass
-
-            self.last_status = current_status
-            
-            if risk_event:
-                log_entry = {"time": self.frame_count, "event": risk_event}
-                self.risk_logs.append(log_entry)
-                logger.warning(f"Session {session_id} Risk: {risk_event}")
-
-        except Exception as e:
-            logger.error(f"Error in visual analysis: {e}")
+    def _update_profile(self, session_id: str, state: SessionObserverState):
+        profile = self.sampler.choose(state.started_at, state.last_status, state.last_risk_at)
+        if profile != state.profile:
+            state.profile = profile
+            if self.on_capture_change:
+                self.on_capture_change(session_id, profile)
+
+    def _on_result(self, session_id: str, result: Dict[str, Any]):
+        """
+        Detect faces, gaze, phone, etc. from a worker result.
+        """
+        state = self.sessions.get(session_id)
+        if state is None:
+            return # Session already ended
+        if "error" in result:
+            logger.debug(f"Session {session_id} frame skipped: {result['error']}")
+            return
+
+        risk_event = None
+        current_status = "normal"
+
+        if not result["face"]:
+            current_status = "no_face_detected"
+            risk_event = "NO_FACE"
+        # Gaze checks (iris landmarks 468/473) would be added to the worker result
+
+        state.last_status = current_status
+
+        if risk_event:
+            state.record(risk_event)
+            logger.warning(f"Session {session_id} Risk: {risk_event}")
+
+        self._update_profile(session_id, state)
+
+    def release(self, session_id: str):
+        self.sessions.pop(session_id, None)
+        self.pipeline.release(session_id)
 
     def get_latest_report(self, session_id: str):
+        state = self.sessions.get(session_id)
+        if state is None:
+            return {"status": "normal", "risk_count": 0, "last_log": None}
+        last_log = None
+        if state.events:
+            offset, frame, event = state.events[-1]
+            last_log = {"time": offset, "frame": frame, "event": event}
         return {
-            "status": self.last_status,
-            "risk_count": len(self.risk_logs),
-            "last_log": self.risk_logs[-1] if self.risk_logs else None
+            "status": state.last_status,
+            "risk_count": state.risk_count,
+            "last_log": last_log
         }
+
+    def shutdown(self):
+        self.pipeline.shutdown()
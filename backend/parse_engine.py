@@ -0,0 +1,221 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("parse_engine")
+
+
+class ParseEngineSaturated(Exception):
+    """Raised when the pending queue is full; callers should answer 429."""
+
+
+class ParseTimeout(Exception):
+    """Raised when a single parse job exceeds its time budget."""
+
+
+# Each worker process keeps its own parser instance (built on first use).
+_worker_parser = None
+
+
+def _worker_parse(source: Any) -> Dict[str, Any]:
+    global _worker_parser
+    if _worker_parser is None:
+        from resume_parser import ResumeParser
+        _worker_parser = ResumeParser()
+    if isinstance(source, (bytes, bytearray)):
+        # PDF bytes from the ingest pipeline; parse straight from memory
+        source = io.BytesIO(source)
+    return _worker_parser.parse_pdf(source)
+
+
+class ParseJob:
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = "queued"  # queued, done, failed
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"job_id": self.id, "status": self.status}
+        if self.status == "done":
+            data["result"] = self.result
+        elif self.status == "failed":
+            data["error"] = self.error
+        return data
+
+
+class ResumeParseEngine:
+    """
+    Bounded process pool for resume parsing.
+    Keeps pypdf decoding and regex extraction off the event loop, rejects work
+    when too many jobs are pending and recycles the pool when a job overruns.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: Optional[float] = None,
+        result_ttl: float = 600,
+    ):
+        self.max_workers = max_workers or int(os.getenv("RESUME_PARSE_WORKERS", "2"))
+        self.max_pending = max_pending or int(os.getenv("RESUME_PARSE_MAX_PENDING", "16"))
+        self.timeout = timeout or float(os.getenv("RESUME_PARSE_TIMEOUT", "20"))
+        self.result_ttl = result_ttl
+        self.jobs: Dict[str, ParseJob] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs uvicorn threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Stop handing out this pool; the next submit builds a fresh one."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _recycle_pool(self, pool: ProcessPoolExecutor):
+        """Kill a pool whose worker is stuck. Jobs it was running elsewhere get resubmitted by parse()."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        logger.warning("Parse job timed out, recycling worker pool")
+        # ProcessPoolExecutor has no public way to kill a busy worker
+        for proc in list(getattr(pool, "_processes", {}).values()):
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+        self._discard_pool(pool)
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ParseEngineSaturated()
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    async def parse(self, source: Any) -> Dict[str, Any]:
+        """Submit and await a parse job from async code."""
+        self._acquire()
+        try:
+            return await self._parse(source)
+        finally:
+            self._release()
+
+    async def _parse(self, source: Any) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        # A second attempt only happens when the pool broke under this job, usually
+        # because another job's timeout recycled it; the time budget is shared
+        for _ in range(2):
+            pool = self._get_pool()
+            try:
+                future = loop.run_in_executor(pool, _worker_parse, source)
+            except RuntimeError:
+                # Shut down (or broken) between _get_pool() and submit
+                self._discard_pool(pool)
+                continue
+            try:
+                return await asyncio.wait_for(future, timeout=max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                self._recycle_pool(pool)
+                raise ParseTimeout()
+            except BrokenProcessPool:
+                logger.warning("Parse worker pool broke under a job, resubmitting")
+                self._discard_pool(pool)
+        raise ParseTimeout()
+
+    def submit(self, source: Any, on_finish=None) -> ParseJob:
+        """
+        Start a background parse job and return it immediately.
+        Poll with get(job_id). on_finish(job) runs once the job settles.
+        """
+        self._purge_expired()
+        loop = asyncio.get_running_loop()
+        # Counted as pending from here, so a burst of submits can't overshoot max_pending
+        self._acquire()
+        job = ParseJob(uuid.uuid4().hex)
+        self.jobs[job.id] = job
+        job.task = loop.create_task(self._run(job, source, on_finish))
+        return job
+
+    async def _run(self, job: ParseJob, source: Any, on_finish):
+        try:
+            job.result = await self._parse(source)
+            job.status = "done"
+        except ParseTimeout:
+            job.status = "failed"
+            job.error = "Resume parsing timed out"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            self._release()
+            job.finished_at = time.time()
+            if on_finish:
+                try:
+                    on_finish(job)
+                except Exception as e:
+                    logger.error(f"Parse job cleanup failed: {e}")
+
+    def record_result(self, result: Dict[str, Any]) -> ParseJob:
+        """Register an already finished job, e.g. for a cache hit."""
+        self._purge_expired()
+        job = ParseJob(uuid.uuid4().hex)
+        job.status = "done"
+        job.result = result
+        job.finished_at = time.time()
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[ParseJob]:
+        self._purge_expired()
+        return self.jobs.get(job_id)
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "tracked_jobs": len(self.jobs),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
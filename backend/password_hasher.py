@@ -0,0 +1,75 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from metrics import registry
+
+
+class PasswordHasherSaturated(Exception):
+    """Raised when too many hashes are already queued; callers should answer 429."""
+
+
+class PasswordHasher:
+    """
+    bcrypt on its own small thread pool. bcrypt releases the GIL, so hashes
+    run in parallel up to `workers`, and a login burst queues here instead of
+    taking over the threadpool that sync endpoints share. Beyond
+    `max_pending` queued or running hashes, new ones are refused.
+    """
+
+    def __init__(self, context: CryptContext, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.context = context
+        self.workers = workers or int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+        self.max_pending = max_pending or int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = registry.counter("password_hash.rejected")
+        self.queue_wait = registry.summary("password_hash.queue_wait_ms")
+        self.duration = registry.summary("password_hash.duration_ms")
+        registry.gauge("password_hash.pending", lambda: self.pending)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            return self._pool
+
+    def _timed(self, submitted: float, fn, *args):
+        started = time.perf_counter()
+        self.queue_wait.observe((started - submitted) * 1000)
+        try:
+            return fn(*args)
+        finally:
+            self.duration.observe((time.perf_counter() - started) * 1000)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected.inc()
+                raise PasswordHasherSaturated()
+            self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), self._timed, time.perf_counter(), fn, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(matches, new_hash): new_hash is set when the stored hash is below the current cost."""
+        return await self._run(self.context.verify_and_update, password, hashed)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from metrics import registry
+from response_cache import create_backend
+
+# Upper bound on how long a change made elsewhere (another worker without a
+# shared backend, a script editing the users table) can go unnoticed
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+
+class Principal:
+    """
+    Detached snapshot of the authenticated user. Has the User fields the
+    handlers read (id, email, full_name, role, profile_data), but is not an
+    ORM object: load the row when it has to be modified.
+    """
+
+    __slots__ = ("id", "email", "full_name", "role", "profile_data")
+
+    def __init__(self, id: int, email: str, full_name: Optional[str], role: Optional[str], profile_data: Optional[Dict[str, Any]]):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.role = role
+        self.profile_data = profile_data
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(user.id, user.email, user.full_name, user.role, user.profile_data)
+
+
+class PrincipalCache:
+    """
+    Principals by user id. Each user has a version stamp (in the shared
+    response-cache backend when one is configured); invalidate() bumps it,
+    so a role, profile or password change drops the cached copy at once.
+    """
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES, backend=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.backend = backend or create_backend(prefix="principal:")
+        self._entries: "OrderedDict[int, Tuple[int, float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = registry.counter("principal_cache.hits")
+        self.misses = registry.counter("principal_cache.misses")
+        self.invalidations = registry.counter("principal_cache.invalidations")
+        registry.gauge("principal_cache.entries", lambda: len(self._entries))
+
+    async def version(self, user_id: int) -> int:
+        return await self.backend.version_async(f"user:{user_id}")
+
+    def get(self, user_id: int, version: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(user_id)
+                self.hits.inc()
+                return entry[2]
+        self.misses.inc()
+        return None
+
+    def put(self, version: int, principal: Principal):
+        """`version` must be read before the row was loaded, so a concurrent change is not masked."""
+        with self._lock:
+            self._entries[principal.id] = (version, time.monotonic(), principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def invalidate(self, user_id: int):
+        await self.backend.bump_async(f"user:{user_id}")
+        with self._lock:
+            self._entries.pop(user_id, None)
+        self.invalidations.inc()
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,156 @@
+import json
+import re
+from typing import List, Optional, Tuple
+
+# Hard stops always end a sentence; "." only when followed by whitespace so
+# "3.5" or "asyncio.run" stay intact
+HARD_STOPS = set("。！？!?；;\n")
+SOFT_STOPS = set("，,、：:")
+# Long sentences are cut at a soft stop so TTS can start earlier
+MAX_SENTENCE_CHARS = 60
+# Fragments shorter than this are merged into the next sentence
+MIN_SENTENCE_CHARS = 4
+
+REPLY_KEY_RE = re.compile(r'"reply"\s*:\s*"')
+SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class SentenceChunker:
+    """Splits streamed text into sentences for TTS as soon as each one is complete."""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self.buffer += text
+        sentences: List[str] = []
+        start = 0
+        for i, ch in enumerate(self.buffer):
+            if ch in HARD_STOPS:
+                end = i + 1
+            elif ch == "." and i + 1 < len(self.buffer) and self.buffer[i + 1].isspace():
+                end = i + 1
+            elif ch in SOFT_STOPS and i + 1 - start >= MAX_SENTENCE_CHARS:
+                end = i + 1
+            else:
+                continue
+            if len(self.buffer[start:end].strip()) >= MIN_SENTENCE_CHARS:
+                sentences.append(self.buffer[start:end].strip())
+                start = end
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of a complete text, cut exactly as a streamed reply would be."""
+    chunker = SentenceChunker()
+    return chunker.feed(text) + chunker.flush()
+
+
+class ReplyStream:
+    """
+    Incremental reader for the interviewer's streamed answer.
+
+    The agent either answers in plain text or with a JSON object like
+    {"reply": "...", "action": "NEXT_QUESTION"}. In the JSON case the
+    "reply" string is decoded as it arrives, so sentences can go to TTS
+    before the object is complete; the action is read once it is.
+    """
+
+    def __init__(self):
+        self.raw = ""
+        self.mode: Optional[str] = None  # "json" or "text"
+        self.parts: List[str] = []
+        self.chunker = SentenceChunker()
+        self._pos = 0
+        self._in_reply = False
+        self._reply_done = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts).strip()
+
+    def feed(self, delta: str) -> List[str]:
+        self.raw += delta
+        if self.mode is None:
+            head = self.raw.lstrip()
+            if not head:
+                return []
+            self.mode = "json" if head.startswith("{") else "text"
+            if self.mode == "text":
+                return self._emit(self.raw)
+            return self._emit(self._decode_reply())
+        if self.mode == "text":
+            return self._emit(delta)
+        return self._emit(self._decode_reply())
+
+    def close(self) -> Tuple[List[str], str]:
+        """Flush the last sentence and return it with the agent's action."""
+        action = "NEXT_QUESTION"
+        sentences: List[str] = []
+        if self.mode == "json":
+            try:
+                data = json.loads(self.raw)
+                action = data.get("action", action)
+                if not self.parts:
+                    sentences += self._emit(data.get("reply", "Error parsing response"))
+            except Exception:
+                if not self.parts:
+                    # Not the JSON we expected; speak it as-is
+                    sentences += self._emit(self.raw)
+        return sentences + self.chunker.flush(), action
+
+    def _emit(self, text: str) -> List[str]:
+        if not text:
+            return []
+        self.parts.append(text)
+        return self.chunker.feed(text)
+
+    def _decode_reply(self) -> str:
+        if self._reply_done:
+            return ""
+        if not self._in_reply:
+            match = REPLY_KEY_RE.search(self.raw)
+            if not match:
+                return ""
+            self._in_reply = True
+            self._pos = match.end()
+
+        out = []
+        raw, i = self.raw, self._pos
+        while i < len(raw):
+            ch = raw[i]
+            if ch == '"':
+                self._reply_done = True
+                i += 1
+                break
+            if ch != "\\":
+                out.append(ch)
+                i += 1
+                continue
+            if i + 1 >= len(raw):
+                break  # escape split across deltas; wait for more
+            code = raw[i + 1]
+            if code in SIMPLE_ESCAPES:
+                out.append(SIMPLE_ESCAPES[code])
+                i += 2
+                continue
+            if code != "u":
+                i += 2  # invalid escape, drop it
+                continue
+            length = 6
+            if raw[i + 2:i + 3].lower() == "d" and raw[i + 3:i + 4].lower() in "89ab":
+                length = 12  # UTF-16 surrogate pair
+            if i + length > len(raw):
+                break
+            try:
+                out.append(json.loads('"' + raw[i:i + length] + '"'))
+            except ValueError:
+                pass
+            i += length
+        self._pos = i
+        return "".join(out)
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from metrics import registry
+
+# Local copies expire after RESPONSE_CACHE_TTL even without an invalidation,
+# which bounds staleness after writes that bypass the API (seed scripts etc.)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+# How long nginx may serve its copy without asking; browsers always revalidate
+RESPONSE_CACHE_SHARED_MAX_AGE = int(os.getenv("RESPONSE_CACHE_SHARED_MAX_AGE", "15"))
+
+
+class MemoryBackend:
+    """Versions in this process only. Fine for a single worker."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    def bump(self, namespace: str) -> int:
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            return self._versions[namespace]
+
+    async def version_async(self, namespace: str) -> int:
+        return self.version(namespace)
+
+    async def bump_async(self, namespace: str) -> int:
+        return self.bump(namespace)
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        return None  # the local LRU in ResponseCache is the only copy
+
+    def set(self, key: str, etag: str, body: bytes, ttl: float):
+        pass
+
+
+class RedisBackend:
+    """
+    Versions and bodies in Redis, shared by every worker and replica: an
+    invalidation in one process is seen by all of them on their next request.
+    redis-py is imported lazily so single-process deployments don't need it.
+    The *_async methods use redis.asyncio, for callers on the event loop.
+    """
+
+    def __init__(self, url: str, prefix: str = "respcache:"):
+        import redis
+        import redis.asyncio
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        # Connects lazily, on the loop of the first request that uses it
+        self.async_client = redis.asyncio.Redis.from_url(url, socket_timeout=0.5)
+        self.prefix = prefix
+
+    def version(self, namespace: str) -> int:
+        return int(self.client.get(f"{self.prefix}v:{namespace}") or 0)
+
+    def bump(self, namespace: str) -> int:
+        return int(self.client.incr(f"{self.prefix}v:{namespace}"))
+
+    async def version_async(self, namespace: str) -> int:
+        return int(await self.async_client.get(f"{self.prefix}v:{namespace}") or 0)
+
+    async def bump_async(self, namespace: str) -> int:
+        return int(await self.async_client.incr(f"{self.prefix}v:{namespace}"))
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        etag, body = self.client.hmget(self.prefix + key, "etag", "body")
+        if etag is None or body is None:
+            return None
+        return etag.decode(), body
+
+    def set(self, key: str, etag: str, body: bytes, ttl: float):
+        pipe = self.client.pipeline()
+        pipe.hset(self.prefix + key, mapping={"etag": etag, "body": body})
+        pipe.expire(self.prefix + key, max(1, int(ttl)))
+        pipe.execute()
+
+
+def create_backend(prefix: str = "respcache:"):
+    backend = (os.getenv("RESPONSE_CACHE_BACKEND") or "memory").strip().lower()
+    if backend == "redis":
+        return RedisBackend(os.getenv("REDIS_URL", "redis://localhost:6379/0"), prefix=prefix)
+    return MemoryBackend()
+
+
+class ResponseCache:
+    """
+    Serialized JSON responses with strong ETags. Every entry belongs to the
+    namespace version it was built under; invalidate() bumps the version, so
+    all older entries stop matching at once and age out of the LRU.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend=None,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        shared_max_age: int = RESPONSE_CACHE_SHARED_MAX_AGE,
+    ):
+        self.name = name
+        self.backend = backend or create_backend()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared_max_age = shared_max_age
+        self._entries: "OrderedDict[str, Tuple[int, float, str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = registry.counter(f"response_cache.{name}.hits")
+        self.shared_hits = registry.counter(f"response_cache.{name}.shared_hits")
+        self.misses = registry.counter(f"response_cache.{name}.misses")
+        self.not_modified = registry.counter(f"response_cache.{name}.not_modified")
+        self.invalidations = registry.counter(f"response_cache.{name}.invalidations")
+        registry.gauge(f"response_cache.{name}.entries", lambda: len(self._entries))
+
+    def invalidate(self):
+        self.backend.bump(self.name)
+        self._clear()
+
+    async def invalidate_async(self):
+        """invalidate() for callers on the event loop."""
+        await self.backend.bump_async(self.name)
+        self._clear()
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.invalidations.inc()
+
+    def get_or_build(self, key: str, build: Callable[[], bytes]) -> Tuple[str, bytes]:
+        """(etag, body) for key, calling build() for the JSON body on a miss."""
+        version = self.backend.version(self.name)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits.inc()
+                return entry[2], entry[3]
+
+        shared_key = f"{self.name}:{version}:{key}"
+        shared = self.backend.get(shared_key)
+        if shared is not None:
+            self.shared_hits.inc()
+            etag, body = shared
+        else:
+            self.misses.inc()
+            body = build()
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            self.backend.set(shared_key, etag, body, self.ttl)
+        with self._lock:
+            self._entries[key] = (version, now, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag, body
+
+    def respond(self, request: Request, key: str, build: Callable[[], bytes]) -> Response:
+        """
+        200 with the cached body, or 304 when If-None-Match already names the
+        current ETag. Browsers revalidate every time (max-age=0) and get a
+        bodiless 304; nginx may reuse its copy for s-maxage seconds.
+        """
+        etag, body = self.get_or_build(key, build)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age=0, s-maxage={self.shared_max_age}",
+        }
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified.inc()
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison: nginx marks ETags weak when it gzips
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
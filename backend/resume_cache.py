@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import models
+from database import SessionLocal
+from metrics import registry
+from resume_parser import PARSER_VERSION
+
+
+class ResumeCache:
+    """
+    Parsed resume results keyed by PDF content hash and parser version.
+    Memory LRU in front of the parsed_resumes table.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = registry.counter("resume_cache.memory_hits")
+        self.db_hits = registry.counter("resume_cache.db_hits")
+        self.misses = registry.counter("resume_cache.misses")
+        registry.gauge("resume_cache.memory_entries", lambda: len(self._entries))
+
+    @staticmethod
+    def _key(content_hash: str) -> str:
+        return f"{PARSER_VERSION}:{content_hash}"
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        key = self._key(content_hash)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+        if result is not None:
+            self.memory_hits.inc()
+            return result
+
+        db = SessionLocal()
+        try:
+            row = db.query(models.ParsedResume.result).filter(
+                models.ParsedResume.content_hash == content_hash,
+                models.ParsedResume.parser_version == PARSER_VERSION,
+            ).first()
+        finally:
+            db.close()
+        if row is None:
+            self.misses.inc()
+            return None
+        self.db_hits.inc()
+        self._remember(key, row.result)
+        return row.result
+
+    def put(self, content_hash: str, result: Dict[str, Any]):
+        self._remember(self._key(content_hash), result)
+        db = SessionLocal()
+        try:
+            exists = db.query(models.ParsedResume.id).filter(
+                models.ParsedResume.content_hash == content_hash,
+                models.ParsedResume.parser_version == PARSER_VERSION,
+            ).first()
+            if exists is None:
+                db.add(models.ParsedResume(
+                    content_hash=content_hash,
+                    parser_version=PARSER_VERSION,
+                    result=result,
+                    created_at=datetime.utcnow(),
+                ))
+                db.commit()
+        except Exception:
+            # A concurrent upload of the same file won the insert
+            db.rollback()
+        finally:
+            db.close()
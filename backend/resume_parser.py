@@ -1,18 +1,42 @@
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Union
 
 from pypdf import PdfReader
 
 from llm_provider import create_llm_provider
+from skill_matcher import SkillMatcher, get_default_matcher
+
+# Bump whenever extraction rules change so cached results are not reused
+PARSER_VERSION = "2"
+
+EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
+PHONE_RE = re.compile(r"(?:\+?86[- ]?)?(1[3-9]\d{9})")
+DATE_RE = re.compile(r"(20\d{2}[./-](?:0?[1-9]|1[0-2])|20\d{2})\s*(?:[-~—–至]\s*)?(20\d{2}[./-](?:0?[1-9]|1[0-2])|20\d{2}|至今|Present)?")
+SPACES_RE = re.compile(r"[ \t]+")
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+EDUCATION_TRIGGERS = ("大学", "学院", "University", "College", "Bachelor", "Master", "PhD", "学士", "硕士", "博士", "研究生")
+MAX_EXPERIENCE_LINES = 200
+
+
+class ResumeLine:
+    """A non-empty, stripped line with the features every extractor needs."""
+    __slots__ = ("text", "has_date")
+
+    def __init__(self, text: str, has_date: bool):
+        self.text = text
+        self.has_date = has_date
 
 
 class ResumeParser:
-    def __init__(self):
+    def __init__(self, skill_matcher: Optional[SkillMatcher] = None):
         self.llm = create_llm_provider()
+        self.skill_matcher = skill_matcher or get_default_matcher()
 
-    def parse_pdf(self, file_path: str) -> Dict[str, Any]:
+    def parse_pdf(self, source: Union[str, BinaryIO]) -> Dict[str, Any]:
+        """Parse a PDF given a file path or a binary stream."""
         text_chunks: List[str] = []
-        reader = PdfReader(file_path)
+        reader = PdfReader(source)
         for page in reader.pages:
             page_text = page.extract_text() or ""
             if page_text:
@@ -22,6 +46,7 @@ class ResumeParser:
 
     def _extract_structured_data(self, text: str) -> Dict[str, Any]:
         normalized = self._normalize_text(text)
+        lines = self._tokenize_lines(normalized)
         result: Dict[str, Any] = {
             "basics": {},
             "skills": [],
@@ -42,11 +67,11 @@ class ResumeParser:
         if skills:
             result["skills"] = skills
 
-        education = self._extract_education(normalized)
+        education = self._extract_education(lines)
         if education:
             result["education"] = education
 
-        experience = self._extract_experience(normalized)
+        experience = self._extract_experience(lines)
         if experience:
             result["experience"] = experience
 
@@ -54,71 +79,40 @@ class ResumeParser:
 
     def _normalize_text(self, text: str) -> str:
         t = text.replace("\u00a0", " ")
-        t = re.sub(r"[ \t]+", " ", t)
-        t = re.sub(r"\n{3,}", "\n\n", t)
+        t = SPACES_RE.sub(" ", t)
+        t = BLANK_LINES_RE.sub("\n\n", t)
         return t.strip()
 
+    def _tokenize_lines(self, text: str) -> List[ResumeLine]:
+        """Split once and tag each line; shared by the line-based extractors."""
+        lines: List[ResumeLine] = []
+        for raw in text.split("\n"):
+            line = raw.strip()
+            if line:
+                lines.append(ResumeLine(line, DATE_RE.search(line) is not None))
+        return lines
+
     def _extract_email(self, text: str) -> Optional[str]:
-        m = re.search(r"[\w\.-]+@[\w\.-]+\.\w+", text)
+        m = EMAIL_RE.search(text)
         return m.group(0) if m else None
 
     def _extract_phone(self, text: str) -> Optional[str]:
-        m = re.search(r"(?:\+?86[- ]?)?(1[3-9]\d{9})", text)
+        m = PHONE_RE.search(text)
         return m.group(1) if m else None
 
     def _extract_skills(self, text: str) -> List[str]:
-        keywords = [
-            "Python",
-            "Java",
-            "Go",
-            "C++",
-            "SQL",
-            "React",
-            "Vue",
-            "Node.js",
-            "FastAPI",
-            "Django",
-            "Spring",
-            "Docker",
-            "Kubernetes",
-            "AWS",
-            "GCP",
-            "Azure",
-            "Redis",
-            "PostgreSQL",
-            "MySQL",
-            "MongoDB",
-            "LLM",
-            "RAG"
-        ]
-        found: List[str] = []
-        for kw in keywords:
-            pattern = r"\b" + re.escape(kw).replace("\\.", r"\.") + r"\b"
-            if re.search(pattern, text, re.IGNORECASE):
-                found.append(kw)
-        seen = set()
-        deduped = []
-        for s in found:
-            k = s.lower()
-            if k in seen:
-                continue
-            seen.add(k)
-            deduped.append(s)
-        return deduped
-
-    def _extract_education(self, text: str) -> List[Dict[str, Any]]:
-        lines = [l.strip() for l in text.split("\n") if l.strip()]
-        edu_lines = []
-        triggers = ["大学", "学院", "University", "College", "Bachelor", "Master", "PhD", "学士", "硕士", "博士", "研究生"]
+        return self.skill_matcher.find(text)
+
+    def _extract_education(self, lines: List[ResumeLine]) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
         for line in lines:
-            if len(line) > 80:
+            if len(line.text) > 80:
                 continue
-            if any(t in line for t in triggers):
-                edu_lines.append(line)
-        items: List[Dict[str, Any]] = []
-        for line in edu_lines[:6]:
-            degree = self._guess_degree(line)
-            items.append({"school": line, "degree": degree, "major": "", "startDate": "", "endDate": ""})
+            if any(t in line.text for t in EDUCATION_TRIGGERS):
+                degree = self._guess_degree(line.text)
+                items.append({"school": line.text, "degree": degree, "major": "", "startDate": "", "endDate": ""})
+                if len(items) >= 6:
+                    break
         return items
 
     def _guess_degree(self, line: str) -> str:
@@ -132,18 +126,17 @@ class ResumeParser:
             return "高中"
         return ""
 
-    def _extract_experience(self, text: str) -> List[Dict[str, Any]]:
-        lines = [l.strip() for l in text.split("\n") if l.strip()]
-        date_pat = r"(20\d{2}[./-](?:0?[1-9]|1[0-2])|20\d{2})\s*(?:[-~—–至]\s*)?(20\d{2}[./-](?:0?[1-9]|1[0-2])|20\d{2}|至今|Present)?"
+    def _extract_experience(self, lines: List[ResumeLine]) -> List[Dict[str, Any]]:
         items: List[Dict[str, Any]] = []
-        for i, line in enumerate(lines[:200]):
-            if re.search(date_pat, line):
-                company = line
+        window = lines[:MAX_EXPERIENCE_LINES]
+        for i, line in enumerate(window):
+            if line.has_date:
+                company = line.text
                 title = ""
                 if i + 1 < len(lines):
                     nxt = lines[i + 1]
-                    if len(nxt) <= 40 and not re.search(date_pat, nxt):
-                        title = nxt
+                    if len(nxt.text) <= 40 and not nxt.has_date:
+                        title = nxt.text
                 items.append({"company": company, "title": title, "startDate": "", "endDate": "", "description": ""})
             if len(items) >= 6:
                 break
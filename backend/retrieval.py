@@ -0,0 +1,321 @@
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter as TermCounts
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from metrics import registry
+from response_cache import create_backend
+from semantic_cache import HashedNgramEmbedder
+
+logger = logging.getLogger("retrieval")
+
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "4"))
+# Hybrid BM25 + hashed n-gram vectors; BM25 alone is usually enough
+RETRIEVAL_DENSE = os.getenv("RETRIEVAL_DENSE", "0") == "1"
+MAX_PASSAGE_CHARS = 240
+
+CJK_RE = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+SECTION_RE = re.compile(r"^【(.+?)】")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Chinese runs become character bigrams (a single character stays a
+    unigram); Latin words and numbers are kept whole, lower-cased.
+    """
+    text = text.lower()
+    tokens = WORD_RE.findall(CJK_RE.sub(" ", text))
+    for run in CJK_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def chunk_text(text: str, max_chars: int = MAX_PASSAGE_CHARS) -> List[str]:
+    """
+    Split a knowledge text into passages: blank lines and 【section】
+    headers start a new block, long blocks are cut at line boundaries, and
+    each passage keeps its section title so it reads on its own.
+    """
+    passages: List[str] = []
+    section = ""
+    current: List[str] = []
+
+    def flush():
+        body = "\n".join(current).strip()
+        if body:
+            passages.append(f"【{section}】{body}" if section and not body.startswith("【") else body)
+        current.clear()
+
+    for line in (text or "").splitlines():
+        line = line.strip()
+        header = SECTION_RE.match(line)
+        if not line or header:
+            flush()
+            if header:
+                section = header.group(1)
+                line = line[header.end():].strip()
+            if not line:
+                continue
+        if current and sum(len(part) + 1 for part in current) + len(line) > max_chars:
+            flush()
+        current.append(line)
+    flush()
+    return passages
+
+
+class Passage:
+    def __init__(self, passage_id: str, text: str, job_id: Optional[int] = None, internal: bool = False):
+        self.id = passage_id
+        self.text = text
+        self.job_id = job_id  # None for company-wide knowledge
+        self.internal = internal  # from Job.knowledge_base: for the AI, not to be quoted
+
+
+class BM25Index:
+    """
+    Inverted index with BM25 scoring. Documents can be added and removed one
+    at a time; collection statistics are kept up to date incrementally.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.total_length = 0
+
+    def add(self, doc_id: str, tokens: List[str]):
+        self.remove(doc_id)
+        counts = TermCounts(tokens)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.doc_terms[doc_id] = list(counts)
+        self.lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: str):
+        length = self.lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in self.doc_terms.pop(doc_id):
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+
+    def search(self, tokens: List[str], allowed=None) -> Dict[str, float]:
+        n = len(self.lengths)
+        if not n:
+            return {}
+        avg_length = self.total_length / n
+        scores: Dict[str, float] = {}
+        for term in set(tokens):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                if allowed is not None and not allowed(doc_id):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+
+class DenseIndex:
+    """Hashed n-gram vectors in one NumPy matrix, rebuilt lazily after changes."""
+
+    def __init__(self, embedder: Optional[HashedNgramEmbedder] = None):
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.vectors: Dict[str, np.ndarray] = {}
+        self._ids: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def add(self, doc_id: str, text: str):
+        self.vectors[doc_id] = self.embedder.embed(text)
+        self._matrix = None
+
+    def remove(self, doc_id: str):
+        if self.vectors.pop(doc_id, None) is not None:
+            self._matrix = None
+
+    def search(self, text: str, limit: int, allowed=None) -> Dict[str, float]:
+        if not self.vectors:
+            return {}
+        if self._matrix is None:
+            self._ids = list(self.vectors)
+            self._matrix = np.stack([self.vectors[i] for i in self._ids])
+        scores = self._matrix @ self.embedder.embed(text)
+        results: Dict[str, float] = {}
+        for i in np.argsort(-scores):
+            if scores[i] <= 0 or len(results) >= limit:
+                break
+            doc_id = self._ids[i]
+            if allowed is None or allowed(doc_id):
+                results[doc_id] = float(scores[i])
+        return results
+
+
+def _ranked(scores: Dict[str, float]) -> List[str]:
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class KnowledgeIndex:
+    """
+    Passages from COMPANY_INFO and every job's knowledge base, searchable by
+    question. Jobs are (re)indexed one at a time when they are created or
+    edited, so the cost of an update does not grow with the number of jobs.
+    Each job carries a version stamp (shared through Redis when the response
+    cache uses it); other workers re-index a job once its stamp moves.
+    """
+
+    def __init__(self, dense: bool = RETRIEVAL_DENSE):
+        self.passages: Dict[str, Passage] = {}
+        self.job_passages: Dict[int, List[str]] = {}
+        self.job_versions: Dict[int, int] = {}  # stamp each job was indexed at, inactive jobs included
+        self.versions = create_backend(prefix="knowledge:")
+        self.bm25 = BM25Index()
+        self.dense = DenseIndex() if dense else None
+        self._lock = threading.Lock()  # sync routers run in the threadpool
+        self.searches = registry.counter("retrieval.searches")
+        self.search_ms = registry.summary("retrieval.search_ms")
+        registry.gauge("retrieval.passages", lambda: len(self.passages))
+        registry.gauge("retrieval.jobs", lambda: len(self.job_passages))
+
+    def _add(self, passage: Passage):
+        self.passages[passage.id] = passage
+        self.bm25.add(passage.id, tokenize(passage.text))
+        if self.dense is not None:
+            self.dense.add(passage.id, passage.text)
+
+    def _remove(self, passage_id: str):
+        self.passages.pop(passage_id, None)
+        self.bm25.remove(passage_id)
+        if self.dense is not None:
+            self.dense.remove(passage_id)
+
+    def index_company(self, info: str):
+        with self._lock:
+            for passage_id in [p for p, passage in self.passages.items() if passage.job_id is None]:
+                self._remove(passage_id)
+            for i, text in enumerate(chunk_text(info)):
+                self._add(Passage(f"company:{i}", text))
+
+    def index_job(self, job, version: Optional[int] = None):
+        """
+        Replace the passages of one job (models.Job or anything with the same fields).
+        Without `version` the stamp is read synchronously: fine at startup, not on the loop.
+        """
+        if version is None:
+            version = self.versions.version(f"job:{job.id}")
+        with self._lock:
+            self._drop_job(job.id)
+            # Inactive jobs are recorded with no passages, so they count as indexed
+            self.job_versions[job.id] = version
+            if not job.is_active:
+                return
+            # Basic facts first, so "薪资" or "地点" questions find them
+            facts = (
+                f"【{job.title}】部门：{job.department}；地点：{job.location}；"
+                f"类型：{job.type}；薪资范围：{job.salary_range}"
+            )
+            texts = [(facts, False)]
+            for field, internal in ((job.requirements, False), (job.knowledge_base, True), (job.public_knowledge, False)):
+                texts.extend((f"【{job.title}】{chunk}", internal) for chunk in chunk_text(field or ""))
+            ids = []
+            for i, (text, internal) in enumerate(texts):
+                passage = Passage(f"job:{job.id}:{i}", text, job_id=job.id, internal=internal)
+                self._add(passage)
+                ids.append(passage.id)
+            self.job_passages[job.id] = ids
+
+    def remove_job(self, job_id: int):
+        with self._lock:
+            self._drop_job(job_id)
+
+    async def reindex_job(self, job):
+        """After a write to the job: bump its stamp for the other workers, then index it here."""
+        self.index_job(job, version=await self.versions.bump_async(f"job:{job.id}"))
+
+    async def refresh_job(self, job):
+        """Re-index a job this worker has not indexed at its latest stamp."""
+        version = await self.versions.version_async(f"job:{job.id}")
+        if self.job_versions.get(job.id) != version:
+            self.index_job(job, version=version)
+
+    def _drop_job(self, job_id: int):
+        self.job_versions.pop(job_id, None)
+        for passage_id in self.job_passages.pop(job_id, []):
+            self._remove(passage_id)
+
+    def search(
+        self,
+        question: str,
+        k: int = RETRIEVAL_TOP_K,
+        job_id: Optional[int] = None,
+        include_company: bool = True,
+        include_jobs: bool = False,
+    ) -> List[Passage]:
+        """
+        Top-k passages for a question: company passages, plus those of
+        `job_id` (or of every job when include_jobs is set).
+        """
+        started = time.perf_counter()
+
+        def allowed(passage_id: str) -> bool:
+            passage = self.passages.get(passage_id)
+            if passage is None:
+                return False
+            if passage.job_id is None:
+                return include_company
+            return include_jobs or passage.job_id == job_id
+
+        with self._lock:
+            ranked = _ranked(self.bm25.search(tokenize(question), allowed))
+            if self.dense is not None:
+                ranked = self._fuse([ranked, _ranked(self.dense.search(question, k * 4, allowed))])
+            results = [self.passages[p] for p in ranked[:k]]
+        self.searches.inc()
+        self.search_ms.observe((time.perf_counter() - started) * 1000)
+        return results
+
+    @staticmethod
+    def _fuse(rankings: Iterable[List[str]], c: int = 60) -> List[str]:
+        """Reciprocal rank fusion."""
+        scores: Dict[str, float] = {}
+        for ranking in rankings:
+            for rank, doc_id in enumerate(ranking):
+                scores[doc_id] = scores.get(doc_id, 0.0) + 1 / (c + rank + 1)
+        return _ranked(scores)
+
+    def index_jobs(self, jobs: Iterable) -> int:
+        count = 0
+        for job in jobs:
+            self.index_job(job)
+            count += 1
+        logger.info(f"Knowledge index: {len(self.passages)} passages, {count} jobs")
+        return count
+
+    def company_overview(self) -> List[Passage]:
+        """The opening company passage, for questions nothing else matches."""
+        first = self.passages.get("company:0")
+        return [first] if first is not None else []
+
+
+def format_passages(passages: List[Passage]) -> str:
+    return "\n\n".join(p.text for p in passages)
+
+
+knowledge_index = KnowledgeIndex()
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List
 import auth
+from admission import AdmissionRejected, client_id
 import models
-from dependencies import get_db
+from dependencies import get_async_db
+from http_client import UpstreamError
 from services import DeepSeekService
 
 router = APIRouter(tags=["ai"])
@@ -19,27 +22,37 @@ class CompanyChatRequest(BaseModel):
     history: List[dict] # [{"role": "user", "content": "..."}]
 
 @router.post("/ai/chat")
-async def chat_about_job(req: ChatRequest, current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
-    job = db.query(models.Job).filter(models.Job.id == req.job_id).first()
+async def chat_about_job(req: ChatRequest, current_user: models.User = Depends(auth.get_current_user), db: AsyncSession = Depends(get_async_db)):
+    job = await db.scalar(select(models.Job).where(models.Job.id == req.job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Mock RAG response
-    # In real world: Call Coze API with job.knowledge_base + req.message
-    response_text = f"基于职位【{job.title}】的知识库：关于您的问题“{req.message}”，我们的情况是..."
-    
-    # Simple keyword matching for demo
-    if "薪资" in req.message:
-        response_text = f"该职位的薪资范围是 {job.salary_range}。"
-    elif "加班" in req.message:
-        response_text = "我们提倡工作生活平衡，但也视项目紧急程度而定。"
-    
+
+    # Answered from the passages of the job's knowledge bases that match the question
+    try:
+        response_text = await deepseek_service.job_chat(job, req.message, client_id=f"user:{current_user.id}")
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail="AI assistant is busy, please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except UpstreamError:
+        raise HTTPException(status_code=503, detail="AI service is temporarily unavailable")
     return {"response": response_text}
 
 @router.post("/ai/company-chat")
-async def chat_with_company_ai(req: CompanyChatRequest):
+async def chat_with_company_ai(req: CompanyChatRequest, request: Request):
     """
     General Company AI Chatbot (DeepSeek RAG)
     """
-    response = await deepseek_service.chat(req.history)
+    try:
+        response = await deepseek_service.chat(req.history, client_id=client_id(request))
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail="AI assistant is busy, please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except UpstreamError:
+        raise HTTPException(status_code=503, detail="AI service is temporarily unavailable")
     return {"response": response}
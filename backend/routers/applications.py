@@ -1,23 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File, Form, Body
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import Optional
-import shutil
+from typing import Any, Dict, List, Optional
+import asyncio
 import os
 import json
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 import auth
 import models
-from dependencies import get_db
-from resume_parser import ResumeParser
+from dependencies import get_async_db
+from job_search import decode_cursor, encode_cursor
+from parse_engine import ResumeParseEngine, ParseEngineSaturated, ParseTimeout
+from resume_cache import ResumeCache
+from storage import get_storage
+from tts_warmup import screening_questions, warm_prompts
+from upload_ingest import IngestedUpload, InvalidUpload, ingest_pdf
 
 router = APIRouter(tags=["applications"])
 
 UPLOAD_DIR = "uploads"
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
+RESUME_PREFIX = "resumes"
 
-resume_parser = ResumeParser()
+parse_engine = ResumeParseEngine()
+resume_cache = ResumeCache()
+
+PARSER_BUSY = HTTPException(
+    status_code=429,
+    detail="Resume parser is busy, please retry shortly.",
+    headers={"Retry-After": "5"},
+)
 
 class ApplicationCreate(BaseModel):
     job_id: int
@@ -27,7 +42,35 @@ class ApplicationCreate(BaseModel):
 class ApplicationStatusUpdate(BaseModel):
     status: str
 
-def create_notification(db: Session, user_id: int, title: str, message: str, type: str = "info"):
+class ApplicationListItem(BaseModel):
+    id: int
+    name: Optional[str] = None
+    job: Optional[str] = None
+    job_id: int
+    status: Optional[str] = None
+    score: Optional[float] = None
+    appliedAt: str
+    skills: List[Any] = []
+    school: Optional[str] = None
+
+class ApplicationPage(BaseModel):
+    items: List[ApplicationListItem]
+    next_cursor: Optional[str] = None
+
+class ApplicationDetail(BaseModel):
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    job: Optional[str] = None
+    job_id: int
+    status: Optional[str] = None
+    score: Optional[float] = None
+    appliedAt: str
+    resume_path: Optional[str] = None
+    structured_resume: Optional[Dict[str, Any]] = None
+    github_link: Optional[str] = None
+
+async def create_notification(db: AsyncSession, user_id: int, title: str, message: str, type: str = "info"):
     notif = models.Notification(
         user_id=user_id,
         title=title,
@@ -36,17 +79,21 @@ def create_notification(db: Session, user_id: int, title: str, message: str, typ
         created_at=datetime.utcnow()
     )
     db.add(notif)
-    db.commit()
+    await db.commit()
+
+def _check_pdf_extension(resume: UploadFile, detail: str):
+    file_ext = resume.filename.split('.')[-1]
+    if file_ext.lower() != 'pdf':
+        raise HTTPException(status_code=400, detail=detail)
 
-def validate_pdf_header(file: UploadFile):
+def ingest_resume(resume: UploadFile) -> IngestedUpload:
     """
-    Reads the first 4 bytes of the file to check for %PDF magic bytes.
-    Resets the file cursor after checking.
+    Single streaming pass over the upload: magic bytes, size limit and hash.
     """
-    header = file.file.read(4)
-    file.file.seek(0) # Reset cursor
-    if header != b'%PDF':
-        raise HTTPException(status_code=400, detail="Invalid file format. The file is not a valid PDF.")
+    try:
+        return ingest_pdf(resume.file)
+    except InvalidUpload as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 @router.post("/resume/parse")
 async def parse_resume(resume: UploadFile = File(...)):
@@ -54,44 +101,68 @@ async def parse_resume(resume: UploadFile = File(...)):
     Standalone endpoint to parse a resume and return structured data for preview/editing.
     Does NOT save to DB.
     """
-    file_ext = resume.filename.split('.')[-1]
-    if file_ext.lower() != 'pdf':
-        raise HTTPException(status_code=400, detail="Only PDF files are supported for auto-parsing")
-    
-    # Security: Check Magic Bytes
-    validate_pdf_header(resume)
-    
-    # Save temp file
-    temp_filename = f"temp_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
-    temp_path = os.path.join(UPLOAD_DIR, temp_filename)
-    
+    _check_pdf_extension(resume, "Only PDF files are supported for auto-parsing")
+    upload = await run_in_threadpool(ingest_resume, resume)
+
     try:
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(resume.file, buffer)
-            
-        # Parse
-        structured_data = resume_parser.parse_pdf(temp_path)
+        structured_data = await run_in_threadpool(resume_cache.get, upload.content_hash)
+        if structured_data is None:
+            # Parse in the worker pool so the event loop keeps serving sockets
+            structured_data = await parse_engine.parse(upload.data)
+            await run_in_threadpool(resume_cache.put, upload.content_hash, structured_data)
         return structured_data
+    except ParseEngineSaturated:
+        raise PARSER_BUSY
+    except ParseTimeout:
+        raise HTTPException(status_code=422, detail="Resume parsing timed out. The PDF may be malformed.")
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        # Cleanup temp file
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+
+@router.post("/resume/parse/jobs", status_code=202)
+async def submit_parse_job(resume: UploadFile = File(...)):
+    """
+    Queue a resume for parsing and return a job id to poll.
+    """
+    _check_pdf_extension(resume, "Only PDF files are supported for auto-parsing")
+    upload = await run_in_threadpool(ingest_resume, resume)
+
+    cached = await run_in_threadpool(resume_cache.get, upload.content_hash)
+    if cached is not None:
+        return parse_engine.record_result(cached).to_dict()
+
+    def finish(job):
+        # Runs on the event loop; the parsed_resumes write goes to the threadpool
+        if job.status == "done":
+            asyncio.get_running_loop().run_in_executor(None, resume_cache.put, upload.content_hash, job.result)
+
+    try:
+        job = parse_engine.submit(upload.data, on_finish=finish)
+    except ParseEngineSaturated:
+        raise PARSER_BUSY
+    return job.to_dict()
+
+@router.get("/resume/parse/jobs/{job_id}")
+async def get_parse_job(job_id: str):
+    job = parse_engine.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Parse job not found")
+    return job.to_dict()
+
+def _resume_key(resume_path: str) -> str:
+    # Older rows stored a path under the local uploads directory
+    prefix = UPLOAD_DIR + "/"
+    return resume_path[len(prefix):] if resume_path.startswith(prefix) else resume_path
 
 @router.post("/applications")
-def submit_application(
+async def submit_application(
     job_id: int = Form(...),
     github_link: str = Form(None),
     resume: UploadFile = File(None),
     structured_resume_json: str = Form(None), # Receive JSON string from frontend
     current_user: models.User = Depends(auth.get_current_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 1. Save Resume File
     resume_path = None
@@ -105,27 +176,30 @@ def submit_application(
             pass # Ignore invalid JSON
     
     if resume:
-        file_ext = resume.filename.split('.')[-1]
-        
         # Validate extension
-        if file_ext.lower() != 'pdf':
-            raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
-            
-        # Security: Check Magic Bytes
-        validate_pdf_header(resume)
-
-        filename = f"user_{current_user.id}_job_{job_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(resume.file, buffer)
-        
-        resume_path = file_path
+        _check_pdf_extension(resume, "Only PDF files are accepted.")
+
+        upload = await run_in_threadpool(ingest_resume, resume)
+
+        # Stored by content hash, so re-uploads of the same PDF share one blob
+        storage = get_storage()
+        resume_path = upload.storage_key(RESUME_PREFIX)
+        if not await storage.exists(resume_path):
+            await storage.put(resume_path, upload.data, content_type="application/pdf")
         
         # 2. Auto-parse if NO manual data provided (Fallback)
-        if not structured_data and file_ext.lower() == 'pdf':
-            print(f"Parsing PDF (Fallback): {file_path}")
-            structured_data = resume_parser.parse_pdf(file_path)
+        if not structured_data:
+            structured_data = await run_in_threadpool(resume_cache.get, upload.content_hash)
+        if not structured_data:
+            print(f"Parsing PDF (Fallback): {resume_path}")
+            try:
+                structured_data = await parse_engine.parse(upload.data)
+                await run_in_threadpool(resume_cache.put, upload.content_hash, structured_data)
+            except ParseEngineSaturated:
+                raise PARSER_BUSY
+            except ParseTimeout:
+                # Keep the application; the stored PDF is still reviewable
+                print(f"Parsing timed out, storing application without structured data: {resume_path}")
 
     # 3. Create Application Record
     application = models.Application(
@@ -137,13 +211,11 @@ def submit_application(
         status="pending"
     )
     db.add(application)
-    db.commit()
-    db.refresh(application)
+    await db.commit()
 
     # 4. Trigger Notification
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
-    job_title = job.title if job else "Unknown Job"
-    create_notification(
+    job_title = await db.scalar(select(models.Job.title).where(models.Job.id == job_id)) or "Unknown Job"
+    await create_notification(
         db, 
         current_user.id, 
         "申请已提交", 
@@ -154,56 +226,173 @@ def submit_application(
     return application
 
 @router.get("/applications/me")
-def get_my_applications(current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
-    apps = db.query(models.Application).filter(models.Application.user_id == current_user.id).all()
-    return apps
-
-@router.get("/admin/applications")
-def get_all_applications(current_user: models.User = Depends(auth.get_current_admin), db: Session = Depends(get_db)):
-    # Join with User and Job to get names
-    results = db.query(
-        models.Application, 
-        models.User.full_name, 
-        models.Job.title
-    ).join(models.User, models.Application.user_id == models.User.id)\
-     .join(models.Job, models.Application.job_id == models.Job.id)\
-     .all()
-    
-    # Format response
-    apps_data = []
-    for app, user_name, job_title in results:
-        apps_data.append({
-            "id": app.id,
-            "name": user_name,
-            "job": job_title,
-            "status": app.status,
+async def get_my_applications(current_user: models.User = Depends(auth.get_current_user), db: AsyncSession = Depends(get_async_db)):
+    apps = await db.scalars(select(models.Application).where(models.Application.user_id == current_user.id))
+    return apps.all()
+
+def _page_filters(status: Optional[str], job_id: Optional[int], created_from: Optional[date], created_to: Optional[date]):
+    conditions = []
+    if status:
+        conditions.append(models.Application.status == status)
+    if job_id is not None:
+        conditions.append(models.Application.job_id == job_id)
+    if created_from:
+        conditions.append(models.Application.created_at >= datetime.combine(created_from, time.min))
+    if created_to:
+        # Inclusive: everything before the start of the next day
+        conditions.append(models.Application.created_at < datetime.combine(created_to + timedelta(days=1), time.min))
+    return conditions
+
+@router.get("/admin/applications", response_model=ApplicationPage)
+async def get_all_applications(
+    status: Optional[str] = None,
+    job_id: Optional[int] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    sort: str = Query("-created_at", pattern="^-?created_at$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: models.User = Depends(auth.get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    One page of applications, newest first unless sort=created_at. Filters
+    and order run on the (status|job_id, created_at) indexes; next_cursor
+    continues after the last item. Rows are slim: a few resume tags instead
+    of structured_resume, which GET /admin/applications/{id} returns.
+    """
+    resume = models.Application.structured_resume
+    query = (
+        select(
+            models.Application.id,
+            models.Application.job_id,
+            models.Application.status,
+            models.Application.created_at,
+            models.User.full_name,
+            models.Job.title,
+            resume["skills"].label("skills"),
+            resume[("education", 0, "school")].as_string().label("school"),
+        )
+        .join(models.User, models.Application.user_id == models.User.id)
+        .join(models.Job, models.Application.job_id == models.Job.id)
+        .where(*_page_filters(status, job_id, created_from, created_to))
+    )
+
+    descending = sort.startswith("-")
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+            after_created = datetime.fromisoformat(after["created_at"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        key = tuple_(models.Application.created_at, models.Application.id)
+        query = query.where(key < (after_created, after["id"]) if descending else key > (after_created, after["id"]))
+    if descending:
+        query = query.order_by(models.Application.created_at.desc(), models.Application.id.desc())
+    else:
+        query = query.order_by(models.Application.created_at, models.Application.id)
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    items = [
+        {
+            "id": row.id,
+            "name": row.full_name,
+            "job": row.title,
+            "job_id": row.job_id,
+            "status": row.status,
             "score": None, # Placeholder for AI score
-            "appliedAt": app.created_at.strftime("%Y-%m-%d"),
-            "resume_path": app.resume_path,
-            "structured_resume": app.structured_resume, # Include structured data
-            "github_link": app.github_link
-        })
-    return apps_data
+            "appliedAt": row.created_at.strftime("%Y-%m-%d"),
+            "skills": row.skills[:3] if isinstance(row.skills, list) else [],
+            "school": row.school,
+        }
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor({"id": last.id, "created_at": last.created_at.isoformat()})
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/admin/applications/{app_id}", response_model=ApplicationDetail)
+async def get_application_detail(
+    app_id: int,
+    current_user: models.User = Depends(auth.get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    row = (await db.execute(
+        select(models.Application, models.User.full_name, models.User.email, models.Job.title)
+        .join(models.User, models.Application.user_id == models.User.id)
+        .join(models.Job, models.Application.job_id == models.Job.id)
+        .where(models.Application.id == app_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Application not found")
+    app, user_name, email, job_title = row
+    return {
+        "id": app.id,
+        "name": user_name,
+        "email": email,
+        "job": job_title,
+        "job_id": app.job_id,
+        "status": app.status,
+        "score": None,
+        "appliedAt": app.created_at.strftime("%Y-%m-%d"),
+        "resume_path": app.resume_path,
+        "structured_resume": app.structured_resume,
+        "github_link": app.github_link,
+    }
+
+@router.get("/admin/applications/{app_id}/resume-url")
+async def get_resume_download_url(
+    app_id: int,
+    current_user: models.User = Depends(auth.get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Short-lived presigned link to the original PDF, so the browser downloads
+    it straight from the blob store instead of through this worker.
+    """
+    app = await db.scalar(select(models.Application).where(models.Application.id == app_id))
+    if not app or not app.resume_path:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    storage = get_storage()
+    key = _resume_key(app.resume_path)
+    if not await storage.exists(key):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return {"url": storage.presigned_url(key)}
+
+@router.post("/admin/applications/{app_id}/tts-warmup")
+async def warm_interview_audio(
+    app_id: int,
+    current_user: models.User = Depends(auth.get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Pre-render this application's screening questions into the TTS cache."""
+    app = await db.scalar(select(models.Application).where(models.Application.id == app_id))
+    if not app:
+        raise HTTPException(status_code=404, detail="Application not found")
+    questions = await screening_questions(db, app_id)
+    return await warm_prompts(questions, reason=f"application {app_id}")
 
 @router.put("/admin/applications/{app_id}/status")
-def update_application_status(
+async def update_application_status(
     app_id: int, 
     payload: ApplicationStatusUpdate,
+    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(auth.get_current_admin), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    app = db.query(models.Application).filter(models.Application.id == app_id).first()
+    app = await db.scalar(select(models.Application).where(models.Application.id == app_id))
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
     
     old_status = app.status
     app.status = payload.status
-    db.commit()
+    await db.commit()
 
     # Trigger Notification if status changed
     if old_status != payload.status:
-        job = db.query(models.Job).filter(models.Job.id == app.job_id).first()
-        job_title = job.title if job else "职位"
+        job_title = await db.scalar(select(models.Job.title).where(models.Job.id == app.job_id)) or "职位"
         
         title = "申请状态更新"
         message = f"您申请的【{job_title}】状态已更新为：{payload.status}"
@@ -213,6 +402,10 @@ def update_application_status(
             title = "面试邀请"
             message = f"恭喜！您申请的【{job_title}】已通过初筛，请前往控制台开始 AI 面试。"
             type = "success"
+            # Render the interview questions now so the candidate never waits on TTS for them
+            questions = await screening_questions(db, app.id)
+            if questions:
+                background_tasks.add_task(warm_prompts, questions, f"application {app.id}")
         elif payload.status == "rejected":
             title = "申请反馈"
             message = f"很遗憾，您申请的【{job_title}】未通过筛选。感谢您的关注。"
@@ -222,6 +415,6 @@ def update_application_status(
             message = f"恭喜！您已被【{job_title}】职位录用！请留意后续邮件通知。"
             type = "success"
 
-        create_notification(db, app.user_id, title, message, type)
+        await create_notification(db, app.user_id, title, message, type)
 
     return {"status": "success", "new_status": app.status}
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 import auth
 import models
-from dependencies import get_db
+from admission import AdmissionRejected, LoginRateLimiter, client_id
+from dependencies import get_async_db
+from password_hasher import PasswordHasherSaturated
+from principal_cache import principal_cache
 
 router = APIRouter(tags=["auth"])
 
+# Per address and per account, checked before any bcrypt work
+login_limiter = LoginRateLimiter.from_env("auth.login", "LOGIN")
+
 class UserCreate(BaseModel):
     email: str
     password: str
@@ -35,52 +42,79 @@ async def send_verification_code(req: EmailVerificationRequest):
     print(f"Sending verification code to {req.email}")
     return {"message": "Verification code sent"}
 
+def _too_many(retry_after: int = 1):
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many attempts, please retry shortly.",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+async def _authenticate(credentials: LoginRequest, http_request: Request, db: AsyncSession) -> models.User:
+    """Rate limits, then the bcrypt check; upgrades the stored hash if it is below the current cost."""
+    try:
+        login_limiter.check(client_id(http_request), credentials.email)
+    except AdmissionRejected as e:
+        raise _too_many(e.retry_after)
+    user = await db.scalar(select(models.User).where(models.User.email == credentials.email))
+    # Hand the connection back to the pool while the hash waits its turn
+    await db.commit()
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await auth.password_hasher.verify(credentials.password, user.hashed_password)
+        except PasswordHasherSaturated:
+            raise _too_many()
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        # Any write to the user row drops its cached principal
+        await principal_cache.invalidate(user.id)
+    return user
+
 @router.post("/auth/register", response_model=Token)
-def register(user: RegisterRequest, db: Session = Depends(get_db)):
+async def register(user: RegisterRequest, http_request: Request, db: AsyncSession = Depends(get_async_db)):
     if user.verification_code != "123456":
         raise HTTPException(status_code=400, detail="Invalid verification code")
 
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+    db_user = await db.scalar(select(models.User).where(models.User.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = auth.get_password_hash(user.password)
+    # Hashing is the expensive part, so it counts against the same per-address limit as logins
+    try:
+        login_limiter.check(client_id(http_request))
+        hashed_password = await auth.password_hasher.hash(user.password)
+    except AdmissionRejected as e:
+        raise _too_many(e.retry_after)
+    except PasswordHasherSaturated:
+        raise _too_many()
     new_user = models.User(email=user.email, hashed_password=hashed_password, full_name=user.full_name)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     
-    access_token = auth.create_access_token(data={"sub": new_user.email})
+    access_token = auth.create_access_token(data={"sub": new_user.email, "uid": new_user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/auth/login", response_model=Token)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == request.email).first()
-    if not user or not auth.verify_password(request.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    access_token = auth.create_access_token(data={"sub": user.email})
+async def login(request: LoginRequest, http_request: Request, db: AsyncSession = Depends(get_async_db)):
+    user = await _authenticate(request, http_request, db)
+    access_token = auth.create_access_token(data={"sub": user.email, "uid": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/admin/login", response_model=Token)
-def admin_login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == request.email).first()
-    if not user or not auth.verify_password(request.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
+async def admin_login(request: LoginRequest, http_request: Request, db: AsyncSession = Depends(get_async_db)):
+    user = await _authenticate(request, http_request, db)
     if user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not an admin account"
         )
     
-    access_token = auth.create_access_token(data={"sub": user.email})
+    access_token = auth.create_access_token(data={"sub": user.email, "uid": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,47 @@
+import re
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from storage import BlobNotFound, LocalBlobStorage, get_storage
+
+router = APIRouter(tags=["files"])
+
+RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+@router.get("/files/{key:path}")
+async def download_file(key: str, expires: int, signature: str, request: Request):
+    """
+    Serves presigned links for the local-disk storage backend, with
+    single-range support so PDF viewers can fetch pages lazily.
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalBlobStorage) or not storage.verify(key, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired link")
+
+    try:
+        size = await storage.size(key)
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    media_type = "application/pdf" if key.endswith(".pdf") else "application/octet-stream"
+    headers = {"Accept-Ranges": "bytes"}
+    range_header = request.headers.get("range")
+    if not range_header:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(storage.get(key), media_type=media_type, headers=headers)
+
+    m = RANGE_RE.match(range_header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        raise HTTPException(status_code=416, detail="Invalid range", headers={"Content-Range": f"bytes */{size}"})
+    if m.group(1):
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(m.group(2)), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, detail="Invalid range", headers={"Content-Range": f"bytes */{size}"})
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(storage.get(key, start, end), status_code=206, media_type=media_type, headers=headers)
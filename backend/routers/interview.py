@@ -43,7 +43,7 @@ async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = None):
             # Expecting JSON messages or Binary audio/video
             message = await websocket.receive()
             
-            if "text" in message:
+            if message.get("text") is not None:
                 try:
                     data = json.loads(message["text"])
                     if data.get("type") == "PING":
@@ -52,9 +52,9 @@ async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = None):
                         await controller.handle_event(session_id, data)
                 except:
                     pass
-            elif "bytes" in message:
-                # Assuming bytes are audio chunks for now
-                await controller.handle_audio_stream(session_id, message["bytes"])
+            elif message.get("bytes") is not None:
+                # Bare audio (JSON protocol) or typed frames (binary.v1, see ws_protocol)
+                await controller.handle_binary(session_id, message["bytes"])
                 
     except WebSocketDisconnect:
         controller.disconnect(session_id)
@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from typing import List, Optional
 import auth
 import models
-from dependencies import get_db
+from database import SessionLocal
+from dependencies import get_async_db, get_db
+from job_search import search_jobs
+from response_cache import ResponseCache
+from retrieval import knowledge_index
 
 router = APIRouter(tags=["jobs"])
 
+# Public list/detail responses; any job write invalidates all of them
+job_responses = ResponseCache("jobs")
+
 class JobCreate(BaseModel):
     title: str
     department: str
@@ -19,22 +28,127 @@ class JobCreate(BaseModel):
     knowledge_base: str
     public_knowledge: Optional[str] = None
 
-@router.get("/jobs")
-def get_jobs(db: Session = Depends(get_db)):
-    return db.query(models.Job).filter(models.Job.is_active == 1).all()
+# Response models per view. Each route only loads the columns of its model,
+# so knowledge_base (for the interviewer AI only) never leaves the admin API.
+class JobSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    department: Optional[str] = None
+    location: Optional[str] = None
+    type: Optional[str] = None
+    salary_range: Optional[str] = None
+
+class JobPublic(JobSummary):
+    description: Optional[str] = None
+    requirements: Optional[str] = None
+    public_knowledge: Optional[str] = None
+
+class JobAdminSummary(JobSummary):
+    is_active: int
+
+class JobAdmin(JobPublic):
+    knowledge_base: Optional[str] = None
+    is_active: int
+
+job_list_json = TypeAdapter(List[JobSummary])
+
+def _columns(schema):
+    return [getattr(models.Job, field) for field in schema.model_fields]
 
-@router.get("/jobs/{job_id}")
-def get_job(job_id: int, db: Session = Depends(get_db)):
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+def _load_jobs() -> bytes:
+    db = SessionLocal()
+    try:
+        # Plain rows instead of ORM instances: nothing to track, only list columns read
+        rows = (
+            db.query(models.Job)
+            .filter(models.Job.is_active == 1)
+            .with_entities(*_columns(JobSummary))
+            .all()
+        )
+        return job_list_json.dump_json(job_list_json.validate_python(rows, from_attributes=True))
+    finally:
+        db.close()
+
+def _load_job(job_id: int) -> bytes:
+    db = SessionLocal()
+    try:
+        job = (
+            db.query(models.Job)
+            .options(load_only(*_columns(JobPublic)))
+            .filter(models.Job.id == job_id)
+            .first()
+        )
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return JobPublic.model_validate(job).model_dump_json().encode()
+    finally:
+        db.close()
+
+# Both served from job_responses, so a cache hit opens no database session
+@router.get("/jobs", response_model=List[JobSummary])
+def get_jobs(request: Request):
+    return job_responses.respond(request, "list", _load_jobs)
+
+@router.get("/jobs/search")
+def search_job_list(
+    q: Optional[str] = None,
+    department: Optional[str] = None,
+    location: Optional[str] = None,
+    type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Full-text search over title/description/requirements with facet counts
+    and cursor pagination. Items only carry list fields; fetch /jobs/{id}
+    for the full posting.
+    """
+    try:
+        return search_jobs(
+            db, q=q, filters={"department": department, "location": location, "type": type}, cursor=cursor, limit=limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/jobs/{job_id}", response_model=JobPublic)
+def get_job(job_id: int, request: Request):
+    return job_responses.respond(request, f"job:{job_id}", lambda: _load_job(job_id))
+
+@router.get("/admin/jobs", response_model=List[JobAdminSummary])
+async def admin_get_jobs(current_user: models.User = Depends(auth.get_current_admin), db: AsyncSession = Depends(get_async_db)):
+    # Inactive jobs included, so they can be found and re-enabled
+    rows = await db.execute(select(*_columns(JobAdminSummary)).order_by(models.Job.id.desc()))
+    return rows.all()
+
+@router.get("/admin/jobs/{job_id}", response_model=JobAdmin)
+async def admin_get_job(job_id: int, current_user: models.User = Depends(auth.get_current_admin), db: AsyncSession = Depends(get_async_db)):
+    job = await db.get(models.Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
-@router.post("/jobs")
-def create_job(job: JobCreate, current_user: models.User = Depends(auth.get_current_admin), db: Session = Depends(get_db)):
+@router.post("/jobs", response_model=JobAdmin)
+async def create_job(job: JobCreate, current_user: models.User = Depends(auth.get_current_admin), db: AsyncSession = Depends(get_async_db)):
     # Now protected by get_current_admin
     new_job = models.Job(**job.dict())
     db.add(new_job)
-    db.commit()
-    db.refresh(new_job)
+    await db.commit()
+    await job_responses.invalidate_async()
+    await knowledge_index.reindex_job(new_job)
     return new_job
+
+@router.put("/jobs/{job_id}", response_model=JobAdmin)
+async def update_job(job_id: int, job: JobCreate, current_user: models.User = Depends(auth.get_current_admin), db: AsyncSession = Depends(get_async_db)):
+    db_job = await db.get(models.Job, job_id)
+    if not db_job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    for field, value in job.dict().items():
+        setattr(db_job, field, value)
+    await db.commit()
+    await job_responses.invalidate_async()
+    # Only this job's passages are replaced
+    await knowledge_index.reindex_job(db_job)
+    return db_job
@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Depends
+import auth
+import models
+from metrics import registry
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/admin/metrics")
+def get_metrics(current_user: models.User = Depends(auth.get_current_admin)):
+    return registry.snapshot()
@@ -1,25 +1,44 @@
+from datetime import datetime
+from typing import List, Optional
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import auth
 import models
-from dependencies import get_db
+from dependencies import get_async_db
 
 router = APIRouter(tags=["notifications"])
 
-@router.get("/notifications")
-def get_notifications(current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
-    return db.query(models.Notification)\
-        .filter(models.Notification.user_id == current_user.id)\
-        .order_by(models.Notification.created_at.desc())\
-        .all()
+class NotificationOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    title: Optional[str] = None
+    message: Optional[str] = None
+    type: Optional[str] = None
+    is_read: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+# Serialized by pydantic-core instead of jsonable_encoder walking ORM objects,
+# which for a long list would hold up the event loop
+@router.get("/notifications", response_model=List[NotificationOut])
+async def get_notifications(current_user: models.User = Depends(auth.get_current_user), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(*[getattr(models.Notification, field) for field in NotificationOut.model_fields])
+        .where(models.Notification.user_id == current_user.id)
+        .order_by(models.Notification.created_at.desc())
+    )
+    return result.all()
 
 @router.post("/notifications/{notif_id}/read")
-def mark_notification_read(notif_id: int, current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
-    notif = db.query(models.Notification).filter(
+async def mark_notification_read(notif_id: int, current_user: models.User = Depends(auth.get_current_user), db: AsyncSession = Depends(get_async_db)):
+    notif = await db.scalar(select(models.Notification).where(
         models.Notification.id == notif_id,
         models.Notification.user_id == current_user.id
-    ).first()
+    ))
     if notif:
         notif.is_read = 1
-        db.commit()
+        await db.commit()
     return {"status": "ok"}
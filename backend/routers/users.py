@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 import auth
 import models
-from dependencies import get_db
+from dependencies import get_async_db
+from principal_cache import principal_cache
 
 router = APIRouter(tags=["users"])
 
@@ -11,18 +13,17 @@ class ProfileUpdate(BaseModel):
     profile_data: dict
 
 @router.get("/users/me/profile")
-def get_my_profile(current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == current_user.id).first()
-    return {"profile_data": user.profile_data or {}}
+async def get_my_profile(current_user: models.User = Depends(auth.get_current_user)):
+    return {"profile_data": current_user.profile_data or {}}
 
 @router.put("/users/me/profile")
-def update_my_profile(payload: ProfileUpdate, current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == current_user.id).first()
-    user.profile_data = payload.profile_data
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return {"profile_data": user.profile_data}
+async def update_my_profile(payload: ProfileUpdate, current_user: models.User = Depends(auth.get_current_user), db: AsyncSession = Depends(get_async_db)):
+    await db.execute(
+        update(models.User).where(models.User.id == current_user.id).values(profile_data=payload.profile_data)
+    )
+    await db.commit()
+    await principal_cache.invalidate(current_user.id)
+    return {"profile_data": payload.profile_data}
 
 @router.get("/users/me")
 async def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import models
-from dependencies import get_db
+from dependencies import get_async_db
+from tts_warmup import warm_prompts
 import logging
 
 router = APIRouter(tags=["webhooks"])
@@ -30,8 +32,9 @@ class AnalysisResult(BaseModel):
 @router.post("/webhook/coze/screening_result")
 async def handle_screening_result(
     payload: ScreeningResult, 
+    background_tasks: BackgroundTasks,
     x_coze_signature: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Callback from Coze Pre-screening Agent
@@ -42,7 +45,7 @@ async def handle_screening_result(
 
     logger.info(f"Received Screening Result for App {payload.application_id}: {payload.passed}")
 
-    app = db.query(models.Application).filter(models.Application.id == payload.application_id).first()
+    app = await db.scalar(select(models.Application).where(models.Application.id == payload.application_id))
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
 
@@ -59,23 +62,25 @@ async def handle_screening_result(
             }
         )
         db.add(interview)
+        if payload.suggested_questions:
+            background_tasks.add_task(warm_prompts, payload.suggested_questions, f"application {app.id}")
     else:
         app.status = "rejected"
     
-    db.commit()
+    await db.commit()
     return {"status": "processed"}
 
 @router.post("/webhook/coze/analysis_result")
 async def handle_analysis_result(
     payload: AnalysisResult,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Callback from Coze Analyst Agent
     """
     logger.info(f"Received Analysis Result for Interview {payload.interview_id}")
 
-    interview = db.query(models.InterviewRecord).filter(models.InterviewRecord.id == payload.interview_id).first()
+    interview = await db.scalar(select(models.InterviewRecord).where(models.InterviewRecord.id == payload.interview_id))
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
 
@@ -85,5 +90,5 @@ async def handle_analysis_result(
     if payload.video_url:
         interview.video_url = payload.video_url
     
-    db.commit()
+    await db.commit()
     return {"status": "processed"}
@@ -0,0 +1,142 @@
+import os
+import re
+import time
+import unicodedata
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from metrics import registry
+
+# Hashed n-grams are purely lexical ("有后端岗位吗" vs "有前端岗位吗" scores ~0.56),
+# so the default only matches rewordings that share most of their characters
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+
+# Punctuation, symbols and whitespace carry no meaning for matching
+NOISE_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    """Full-width to half-width, lower case, punctuation and spaces removed."""
+    return NOISE_RE.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+class HashedNgramEmbedder:
+    """
+    Character 1-3 gram counts hashed into a fixed-size signed vector, then
+    L2-normalized. Works on Chinese without a tokenizer and needs no model.
+    """
+
+    def __init__(self, dim: int = 1024, ngrams=(1, 2, 3)):
+        self.dim = dim
+        self.ngrams = ngrams
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for n in self.ngrams:
+            for i in range(len(text) - n + 1):
+                h = zlib.crc32(text[i:i + n].encode("utf-8"))
+                # Longer n-grams are more specific, so they weigh more
+                vector[h % self.dim] += n if h & 0x80000000 else -n
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class CachedAnswer:
+    def __init__(self, question: str, answer: str, latency_ms: float):
+        self.question = question
+        self.answer = answer
+        self.latency_ms = latency_ms
+
+
+class SemanticCache:
+    """
+    Answers to previously asked questions, looked up by similarity.
+
+    Vectors live in one preallocated matrix so a lookup is a single
+    matrix-vector product. Slots are reused oldest-first once full. Entries
+    expire after `ttl`, and everything is dropped when the knowledge
+    `version` passed in changes (e.g. COMPANY_INFO was edited).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = SEMANTIC_CACHE_TTL,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        embedder: Optional[HashedNgramEmbedder] = None,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.vectors = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self.expires = np.zeros(max_entries)  # 0 = empty slot
+        self.entries: List[Optional[CachedAnswer]] = [None] * max_entries
+        self.slots: Dict[str, int] = {}  # normalized question -> slot
+        self.next_slot = 0
+        self.version: Optional[str] = None
+        self.hits = registry.counter(f"{name}.hits")
+        self.misses = registry.counter(f"{name}.misses")
+        self.invalidations = registry.counter(f"{name}.invalidations")
+        self.latency_saved = registry.counter(f"{name}.latency_saved_ms")
+        self.lookup_ms = registry.summary(f"{name}.lookup_ms")
+        registry.gauge(f"{name}.entries", lambda: len(self.slots))
+        registry.gauge(f"{name}.hit_rate", self.hit_rate)
+
+    def hit_rate(self) -> float:
+        total = self.hits.value + self.misses.value
+        return round(self.hits.value / total, 4) if total else 0.0
+
+    def clear(self):
+        self.expires[:] = 0
+        self.entries = [None] * self.max_entries
+        self.slots.clear()
+        self.next_slot = 0
+
+    def _check_version(self, version: str):
+        if version != self.version:
+            if self.version is not None:
+                self.invalidations.inc()
+            self.clear()
+            self.version = version
+
+    def lookup(self, question: str, version: str) -> Optional[CachedAnswer]:
+        started = time.perf_counter()
+        self._check_version(version)
+        text = normalize(question)
+        entry = None
+        if text and self.slots:
+            scores = self.vectors @ self.embedder.embed(text)
+            scores[self.expires <= time.time()] = -1
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                entry = self.entries[best]
+        self.lookup_ms.observe((time.perf_counter() - started) * 1000)
+        if entry is None:
+            self.misses.inc()
+            return None
+        self.hits.inc()
+        self.latency_saved.inc(int(entry.latency_ms))
+        return entry
+
+    def store(self, question: str, version: str, answer: str, latency_ms: float):
+        self._check_version(version)
+        text = normalize(question)
+        if not text:
+            return
+        slot = self.slots.get(text)
+        if slot is None:
+            slot = self.next_slot
+            self.next_slot = (slot + 1) % self.max_entries
+            evicted = self.entries[slot]
+            if evicted is not None:
+                self.slots.pop(normalize(evicted.question), None)
+            self.slots[text] = slot
+        self.vectors[slot] = self.embedder.embed(text)
+        self.expires[slot] = time.time() + self.ttl
+        self.entries[slot] = CachedAnswer(question, answer, latency_ms)
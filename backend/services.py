@@ -1,25 +1,120 @@
 import asyncio
+import hashlib
 import json
 import random
 import os
-from company_knowledge import COMPANY_INFO, SYSTEM_PERSONA
+import logging
+import time
+from typing import Dict, List, Optional
+import company_knowledge
+from admission import AdmissionController, SingleFlight
+from http_client import UpstreamError, get_http
+from reply_stream import split_sentences
+from retrieval import format_passages, knowledge_index
+from semantic_cache import SemanticCache
+from tts_cache import TTSCache
+
+logger = logging.getLogger("services")
+
+TTS_VOICE = os.getenv("TTS_VOICE", "zh-CN-YunxiNeural")
+# edge-tts always returns this encoding; it is part of the cache key
+TTS_FORMAT = "audio-24khz-48kbitrate-mono-mp3"
+
+INTERVIEW_GREETING = "你好，我是你的AI面试官。首先请做一个自我介绍。"
+MOCK_INTERVIEW_REPLIES = [
+    ("收到，关于你提到的项目难点，能具体说说是怎么解决并发问题的吗？", "FOLLOW_UP"),
+    ("好的，非常有意思。那么你对Python的GIL锁有什么理解？", "NEXT_QUESTION"),
+    ("明白了。最后，你有什么想问我的吗？", "NEXT_QUESTION"),
+]
 
 class DeepSeekService:
     def __init__(self):
         self.api_key = os.getenv("DEEPSEEK_API_KEY", "sk-placeholder")
-        self.api_url = "https://api.deepseek.com/v1/chat/completions" # Example URL
+        self.model = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+        self.admission = AdmissionController.from_env("llm.company_chat", "LLM")
+        self.inflight = SingleFlight("llm.company_chat")
+        self.answers = SemanticCache("semantic_cache.company_chat")
+        self._company_info: Optional[str] = None
+        self._refresh_knowledge()
+
+    def _refresh_knowledge(self) -> str:
+        """
+        Re-index company passages when company_knowledge.COMPANY_INFO is
+        replaced. Returns a fingerprint of the knowledge; cached answers from
+        another fingerprint are dropped.
+        """
+        info = company_knowledge.COMPANY_INFO
+        if info is not self._company_info:
+            self._company_info = info
+            knowledge_index.index_company(info)
+            fingerprint = f"{self.model}\n{company_knowledge.SYSTEM_PERSONA}\n{info}"
+            self.knowledge_version = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+        return self.knowledge_version
+
+    def _system_message(self, history: list) -> dict:
+        """Persona plus only the company passages relevant to the recent user turns."""
+        query = " ".join([m.get("content", "") for m in history if m.get("role") == "user"][-2:])
+        passages = knowledge_index.search(query) or knowledge_index.company_overview()
+        prompt = company_knowledge.SYSTEM_PERSONA.format(company_info=format_passages(passages))
+        return {"role": "system", "content": prompt}
+
+    def _live(self) -> bool:
+        return bool(self.api_key) and self.api_key != "sk-placeholder"
+
+    async def _post(self, messages: list) -> str:
+        # Through the shared connection pool
+        data = await get_http().provider("deepseek").post_json(
+            "/v1/chat/completions",
+            {"model": self.model, "messages": messages},
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        return data["choices"][0]["message"]["content"]
+
+    @staticmethod
+    def _cacheable_question(history: list) -> Optional[str]:
+        """
+        Only the opening question of a conversation is answered from the
+        semantic cache; later turns depend on what was said before.
+        """
+        user_turns = [m.get("content", "") for m in history if m.get("role") == "user"]
+        if len(user_turns) == 1 and history[-1].get("role") == "user":
+            return user_turns[0]
+        return None
 
-    async def chat(self, history: list) -> str:
+    async def chat(self, history: list, client_id: Optional[str] = None) -> str:
         """
         Call DeepSeek API with RAG context.
+
+        Opening questions close to one answered before are served from the
+        semantic cache. Otherwise raises AdmissionRejected when the caller or
+        the service is over its limit; identical conversations already in
+        flight share one call.
         """
-        # 1. Construct System Prompt with Knowledge Base
-        system_prompt = SYSTEM_PERSONA.format(company_info=COMPANY_INFO)
-        
-        # 2. Prepare Messages
-        messages = [{"role": "system", "content": system_prompt}] + history
+        version = self._refresh_knowledge()
+        question = self._cacheable_question(history)
+        if question:
+            cached = self.answers.lookup(question, version)
+            if cached is not None:
+                return cached.answer
+
+        self.admission.check_client(client_id)
+        key = hashlib.sha256(json.dumps(history, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+        return await self.inflight.do(key, lambda: self._admitted_chat(history, question, version))
 
-        # 3. Call API (Mock for now)
+    async def _admitted_chat(self, history: list, question: Optional[str], version: str) -> str:
+        async with self.admission.slot():
+            started = time.perf_counter()
+            answer = await self._complete(history)
+        if question:
+            self.answers.store(question, version, answer, (time.perf_counter() - started) * 1000)
+        return answer
+
+    async def _complete(self, history: list) -> str:
+        # Call API once a key is configured
+        if self._live():
+            return await self._post([self._system_message(history)] + history)
+
+        # Mock for now
         await asyncio.sleep(1.5) # Simulate thinking time
         
         last_user_msg = history[-1]['content'] if history else ""
@@ -36,51 +131,215 @@ class DeepSeekService:
         else:
             return "这是一个很好的问题。作为一家追求极客精神的公司，我们非常看重每一位候选人的潜力。\n\n你可以告诉我你擅长什么技能（比如 Python, 设计, 运营），我可以帮你推荐最适合的岗位哦！"
 
+    async def job_chat(self, job, message: str, client_id: Optional[str] = None) -> str:
+        """
+        Answer a candidate's question about one job from the passages of its
+        knowledge bases (and the company's) that match the question.
+        """
+        self.admission.check_client(client_id)
+        # Picks up jobs created or edited in another worker since this one indexed them
+        await knowledge_index.refresh_job(job)
+        passages = knowledge_index.search(message, job_id=job.id)
+        async with self.admission.slot():
+            if self._live():
+                prompt = company_knowledge.JOB_PERSONA.format(title=job.title, passages=format_passages(passages))
+                return await self._post([{"role": "system", "content": prompt}, {"role": "user", "content": message}])
+
+        # Mock: quote the best matching passage the candidate may see
+        public = [p for p in passages if not p.internal]
+        if not public:
+            return f"关于职位【{job.title}】的这个问题，资料里暂时没有，建议您在面试时直接咨询业务面试官。"
+        best = public[0].text.split("】", 1)[-1]
+        return f"基于职位【{job.title}】的知识库：{best}"
+
 class CozeService:
+    def __init__(self):
+        self.api_token = os.getenv("COZE_API_TOKEN")
+        self.bot_id = os.getenv("COZE_BOT_ID")
+
     async def chat(self, session_id: str, message: str, context: dict = None):
         """
-        Mock Coze API call.
-        In production, use requests.post to Coze API endpoint.
+        Coze chat, whole reply at once. Mocked unless COZE_API_TOKEN/COZE_BOT_ID are set.
         """
+        if self.api_token and self.bot_id:
+            return "".join([delta async for delta in self._coze_stream(session_id, message, context)])
         await asyncio.sleep(1) # Simulate network latency
-        
+        return self._mock_reply(message)
+
+    async def chat_stream(self, session_id: str, message: str, context: dict = None):
+        """
+        Streaming Coze chat: yields the reply in small deltas as tokens arrive.
+        Mocked unless COZE_API_TOKEN/COZE_BOT_ID are set.
+        """
+        if self.api_token and self.bot_id:
+            async for delta in self._coze_stream(session_id, message, context):
+                yield delta
+            return
+        await asyncio.sleep(0.3) # Simulate time to first token
+        reply = self._mock_reply(message)
+        for i in range(0, len(reply), 4):
+            yield reply[i:i + 4]
+            await asyncio.sleep(0.02)
+
+    async def _coze_stream(self, session_id: str, message: str, context: dict = None):
+        content = message
+        if context:
+            content = json.dumps({"message": message, "context": context}, ensure_ascii=False)
+        body = {
+            "bot_id": self.bot_id,
+            "user_id": session_id,
+            "stream": True,
+            "additional_messages": [{"role": "user", "content": content, "content_type": "text"}],
+        }
+        headers = {"Authorization": f"Bearer {self.api_token}"}
+        async with get_http().provider("coze").stream("POST", "/v3/chat", json=body, headers=headers) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                raise UpstreamError("coze", f"HTTP {response.status_code}: {response.text[:200]}")
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:") and event == "conversation.message.delta":
+                    data = json.loads(line[5:])
+                    if data.get("type") == "answer" and data.get("content"):
+                        yield data["content"]
+                elif line.startswith("data:") and event in ("conversation.chat.failed", "error"):
+                    raise UpstreamError("coze", line[5:].strip()[:200])
+
+    def _mock_reply(self, message: str) -> str:
         if message == "START_INTERVIEW":
-            return "你好，我是你的AI面试官。首先请做一个自我介绍。"
+            return INTERVIEW_GREETING
             
         # Mock logic
-        responses = [
-            '{"reply": "收到，关于你提到的项目难点，能具体说说是怎么解决并发问题的吗？", "action": "FOLLOW_UP"}',
-            '{"reply": "好的，非常有意思。那么你对Python的GIL锁有什么理解？", "action": "NEXT_QUESTION"}',
-            '{"reply": "明白了。最后，你有什么想问我的吗？", "action": "NEXT_QUESTION"}'
-        ]
-        return random.choice(responses)
+        reply, action = random.choice(MOCK_INTERVIEW_REPLIES)
+        return json.dumps({"reply": reply, "action": action}, ensure_ascii=False)
+
+    @staticmethod
+    def fixed_prompts() -> List[str]:
+        """Interviewer lines that are spoken verbatim, worth keeping pre-rendered."""
+        return [INTERVIEW_GREETING] + [reply for reply, _ in MOCK_INTERVIEW_REPLIES]
 
 class TTSService:
+    def __init__(self, voice: Optional[str] = None, cache: Optional[TTSCache] = None):
+        # An OpenAI-compatible speech API (via the shared HTTP pool) replaces edge-tts when configured
+        self.api_key = os.getenv("TTS_API_KEY")
+        self.model = os.getenv("TTS_API_MODEL", "tts-1")
+        self.voice = voice or (os.getenv("TTS_API_VOICE", "alloy") if self.api_key else TTS_VOICE)
+        self.cache = cache
+
     async def synthesize(self, text: str) -> bytes:
+        """Whole-text synthesis; see stream()."""
+        audio_data = bytearray()
+        async for chunk in self.stream(text):
+            audio_data.extend(chunk)
+        return bytes(audio_data)
+
+    async def stream(self, text: str):
+        """Yield MP3 chunks as they are produced (dummy bytes if no TTS is reachable)."""
+        if self.cache:
+            cached = await self.cache.get(text, self.voice, TTS_FORMAT)
+            if cached is not None:
+                yield cached
+                return
+
+        produced = bytearray()
+        completed = False
+        try:
+            async for chunk in self._render(text):
+                produced.extend(chunk)
+                yield chunk
+            completed = True
+        except Exception as e:
+            logger.warning(f"TTS render failed for {text[:40]!r} after {len(produced)} bytes: {e}")
+        if not produced:
+            yield b'\x00' * 1024
+            return
+        if self.cache and completed:
+            # A render cut short by an upstream error is never cached
+            await self.cache.put(text, self.voice, TTS_FORMAT, bytes(produced))
+
+    async def _render(self, text: str):
+        if self.api_key:
+            body = {"model": self.model, "voice": self.voice, "input": text, "response_format": "mp3"}
+            headers = {"Authorization": f"Bearer {self.api_key}"}
+            async with get_http().provider("tts").stream("POST", "/audio/speech", json=body, headers=headers) as response:
+                if response.status_code >= 400:
+                    raise UpstreamError("tts", f"HTTP {response.status_code}")
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+            return
+
+        import edge_tts
+        communicate = edge_tts.Communicate(text, self.voice)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+
+    async def warm(self, texts: List[str], concurrency: int = 4) -> Dict[str, int]:
         """
-        Mock TTS. Returns dummy bytes.
-        In production, use edge-tts or OpenAI API.
+        Pre-render texts into the cache, split into sentences exactly the way
+        the interview pipeline will request them.
         """
-        # await asyncio.sleep(0.5)
-        # return b'\x00' * 1024 # Dummy audio
-        
-        # If edge-tts is installed and we want to try real TTS:
-        try:
-            import edge_tts
-            communicate = edge_tts.Communicate(text, "zh-CN-YunxiNeural")
-            audio_data = bytearray()
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    audio_data.extend(chunk["data"])
-            return bytes(audio_data)
-        except Exception:
-            return b'\x00' * 1024
+        sentences = list(dict.fromkeys(s for text in texts for s in split_sentences(text)))
+        stats = {"sentences": len(sentences), "cached": 0, "rendered": 0, "failed": 0}
+        if not self.cache:
+            return stats
+        slots = asyncio.Semaphore(concurrency)
+
+        async def render(sentence: str):
+            if await self.cache.contains(sentence, self.voice, TTS_FORMAT):
+                stats["cached"] += 1
+                return
+            async with slots:
+                try:
+                    audio = b"".join([chunk async for chunk in self._render(sentence)])
+                except Exception as e:
+                    logger.warning(f"TTS warm-up failed for {sentence!r}: {e}")
+                    audio = b""
+            if not audio:
+                stats["failed"] += 1
+                return
+            await self.cache.put(sentence, self.voice, TTS_FORMAT, audio, persist=True)
+            stats["rendered"] += 1
+
+        await asyncio.gather(*(render(s) for s in sentences))
+        return stats
 
 class STTService:
+    def __init__(self):
+        self.api_key = os.getenv("STT_API_KEY")
+        self.model = os.getenv("STT_MODEL", "whisper-large-v3")
+
     async def transcribe(self, audio_bytes: bytes) -> str:
         """
-        Mock STT.
-        In production, send audio_bytes to Groq/Whisper API.
+        Whisper-compatible transcription (Groq by default, see STT_BASE_URL).
+        Mocked unless STT_API_KEY is set.
         """
+        if self.api_key:
+            # VAD segments are WAV; the legacy path sends MediaRecorder webm
+            filename = "audio.wav" if audio_bytes[:4] == b"RIFF" else "audio.webm"
+            response = await get_http().provider("stt").request(
+                "POST",
+                "/audio/transcriptions",
+                files={"file": (filename, bytes(audio_bytes))},
+                data={"model": self.model, "response_format": "json"},
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+            if response.status_code >= 400:
+                raise UpstreamError("stt", f"HTTP {response.status_code}: {response.text[:200]}")
+            return response.json().get("text", "")
+
         await asyncio.sleep(0.5)
         return "模拟的用户回答内容...我使用了Redis锁来解决这个问题。"
+
+
+_tts: Optional[TTSService] = None
+
+
+def get_tts() -> TTSService:
+    """Process-wide TTS service backed by the shared phrase cache."""
+    global _tts
+    if _tts is None:
+        _tts = TTSService(cache=TTSCache())
+    return _tts
@@ -0,0 +1,269 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Canonical skill -> aliases. The canonical name always matches itself.
+# Extend at deploy time with RESUME_SKILLS_FILE (a JSON object of the same shape).
+DEFAULT_SKILLS: Dict[str, List[str]] = {
+    # Languages
+    "Python": ["py3", "python3"],
+    "Java": [],
+    "JavaScript": ["JS", "ECMAScript", "ES6"],
+    "TypeScript": ["TS"],
+    "Go": ["Golang"],
+    "C++": ["CPP", "C/C++"],
+    "C#": ["CSharp"],
+    "Rust": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Objective-C": ["ObjC"],
+    "Scala": [],
+    "Ruby": [],
+    "PHP": [],
+    "Lua": [],
+    "Dart": [],
+    "Shell": ["Bash", "Shell脚本"],
+    "MATLAB": [],
+    "SQL": [],
+    "HTML": ["HTML5"],
+    "CSS": ["CSS3"],
+    "Sass": ["SCSS"],
+    # Frontend
+    "React": ["React.js", "ReactJS"],
+    "React Native": ["RN"],
+    "Vue": ["Vue.js", "VueJS", "Vue3"],
+    "Angular": ["AngularJS"],
+    "Svelte": [],
+    "Next.js": ["NextJS"],
+    "Nuxt": ["Nuxt.js"],
+    "Redux": [],
+    "jQuery": [],
+    "Tailwind CSS": ["Tailwind", "TailwindCSS"],
+    "Webpack": [],
+    "Vite": [],
+    "Three.js": ["ThreeJS"],
+    "WebGL": [],
+    "WebSocket": ["WebSockets"],
+    "Flutter": [],
+    "Electron": [],
+    "Mini Program": ["小程序", "微信小程序"],
+    # Backend
+    "Node.js": ["NodeJS"],
+    "Express.js": ["ExpressJS"],
+    "NestJS": [],
+    "FastAPI": [],
+    "Django": [],
+    "Flask": [],
+    "Tornado": [],
+    "Spring": [],
+    "Spring Boot": ["SpringBoot"],
+    "Spring Cloud": ["SpringCloud"],
+    "MyBatis": [],
+    "Hibernate": [],
+    ".NET": ["dotnet", "ASP.NET"],
+    "Gin": [],
+    "gRPC": [],
+    "GraphQL": [],
+    "RESTful API": ["RESTful"],
+    "Microservices": ["微服务"],
+    "Celery": [],
+    "Dubbo": [],
+    "Netty": [],
+    # Data stores
+    "MySQL": [],
+    "PostgreSQL": ["Postgres"],
+    "SQLite": [],
+    "Oracle": [],
+    "SQL Server": ["MSSQL"],
+    "MongoDB": ["Mongo"],
+    "Redis": [],
+    "Memcached": [],
+    "Elasticsearch": [],
+    "ClickHouse": [],
+    "Cassandra": [],
+    "HBase": [],
+    "TiDB": [],
+    "Neo4j": [],
+    "InfluxDB": [],
+    # Messaging / big data
+    "Kafka": [],
+    "RabbitMQ": [],
+    "RocketMQ": [],
+    "Hadoop": [],
+    "Hive": [],
+    "Spark": ["PySpark"],
+    "Flink": [],
+    "Airflow": [],
+    "ETL": [],
+    "Data Warehouse": ["数据仓库", "数仓"],
+    # Cloud / ops
+    "Docker": [],
+    "Kubernetes": ["K8s", "K8S"],
+    "Helm": [],
+    "Istio": [],
+    "Terraform": [],
+    "Ansible": [],
+    "Jenkins": [],
+    "GitLab CI": ["GitLab-CI"],
+    "GitHub Actions": [],
+    "CI/CD": ["CICD", "持续集成"],
+    "Linux": [],
+    "Nginx": [],
+    "Prometheus": [],
+    "Grafana": [],
+    "ELK": [],
+    "AWS": ["Amazon Web Services"],
+    "GCP": ["Google Cloud"],
+    "Azure": [],
+    "Alibaba Cloud": ["阿里云", "Aliyun"],
+    "Tencent Cloud": ["腾讯云"],
+    "Serverless": [],
+    "DevOps": [],
+    "Git": [],
+    # AI / ML
+    "Machine Learning": ["ML", "机器学习"],
+    "Deep Learning": ["DL", "深度学习"],
+    "NLP": ["自然语言处理"],
+    "Computer Vision": ["计算机视觉"],
+    "PyTorch": ["Torch"],
+    "TensorFlow": ["TF"],
+    "Keras": [],
+    "scikit-learn": ["sklearn"],
+    "XGBoost": [],
+    "LightGBM": [],
+    "Pandas": [],
+    "NumPy": [],
+    "OpenCV": [],
+    "MediaPipe": [],
+    "Transformer": ["Transformers"],
+    "BERT": [],
+    "LLM": ["大模型", "大语言模型", "Large Language Model"],
+    "RAG": ["检索增强生成"],
+    "LangChain": [],
+    "Fine-tuning": ["微调", "finetune"],
+    "Prompt Engineering": ["提示词工程"],
+    "Recommender Systems": ["推荐系统", "推荐算法"],
+    "Reinforcement Learning": ["强化学习"],
+    "CUDA": [],
+    # Testing
+    "Selenium": [],
+    "PyTest": [],
+    "JUnit": [],
+    "Jest": [],
+    "Cypress": [],
+    "Playwright": [],
+    "JMeter": [],
+    "Unit Testing": ["单元测试"],
+    "Automated Testing": ["自动化测试"],
+    # Product / design
+    "Figma": [],
+    "Sketch": [],
+    "Axure": [],
+    "Photoshop": ["PS"],
+    "Illustrator": [],
+    "UI Design": ["UI设计"],
+    "UX Design": ["UX", "用户体验设计"],
+    "Product Design": ["产品设计"],
+    "PRD": ["需求文档"],
+    "A/B Testing": ["AB测试", "A/B测试"],
+    "Data Analysis": ["数据分析"],
+    "Tableau": [],
+    "Power BI": ["PowerBI"],
+    "SaaS": [],
+    # Process
+    "Agile": ["敏捷开发"],
+    "Scrum": [],
+    "Jira": [],
+    "System Design": ["系统设计", "架构设计"],
+    "High Concurrency": ["高并发"],
+    "Distributed Systems": ["分布式", "分布式系统"],
+}
+
+
+def _load_skill_file(path: str) -> Dict[str, List[str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {str(k): [str(a) for a in v or []] for k, v in data.items()}
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex that matches any of `words`, factored into a prefix trie.
+    The regex engine then walks one branch per character instead of trying
+    every alternative, so match time stays flat as the dictionary grows.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: prefer the longer skill, fall back to the prefix
+            body = "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return render(trie)
+
+
+class SkillMatcher:
+    """
+    Finds dictionary skills in resume text with one precompiled regex.
+    Matching is case-insensitive, except for very short aliases ("Go", "JS"):
+    those match as written or in upper, lower or title case ("GO", "js"),
+    but not in odd mixes like "jS" that are usually fragments of other text.
+    """
+
+    EXACT_CASE_MAX_LEN = 2
+
+    def __init__(self, skills: Dict[str, List[str]]):
+        self.aliases: Dict[str, str] = {}
+        self.exact_case = set()
+        for canonical, aliases in skills.items():
+            for alias in [canonical] + list(aliases):
+                alias = alias.strip()
+                if not alias:
+                    continue
+                self.aliases.setdefault(alias.lower(), canonical)
+                if len(alias) <= self.EXACT_CASE_MAX_LEN:
+                    self.exact_case.update((alias, alias.upper(), alias.lower(), alias.title()))
+        # ASCII-only boundaries so "熟悉Python" still matches
+        self.pattern = re.compile(
+            r"(?<![A-Za-z0-9_])(" + _trie_pattern(self.aliases) + r")(?![A-Za-z0-9_])",
+            re.IGNORECASE,
+        )
+
+    def find(self, text: str) -> List[str]:
+        found: List[str] = []
+        seen = set()
+        for m in self.pattern.finditer(text):
+            alias = m.group(1)
+            if len(alias) <= self.EXACT_CASE_MAX_LEN and alias not in self.exact_case:
+                continue
+            canonical = self.aliases[alias.lower()]
+            if canonical not in seen:
+                seen.add(canonical)
+                found.append(canonical)
+        return found
+
+
+_default_matcher: Optional[SkillMatcher] = None
+
+
+def get_default_matcher() -> SkillMatcher:
+    global _default_matcher
+    if _default_matcher is None:
+        skills = dict(DEFAULT_SKILLS)
+        extra_path = os.getenv("RESUME_SKILLS_FILE")
+        if extra_path:
+            skills.update(_load_skill_file(extra_path))
+        _default_matcher = SkillMatcher(skills)
+    return _default_matcher
@@ -0,0 +1,225 @@
+import abc
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+import uuid
+from typing import AsyncIterator, Optional
+from urllib.parse import quote, urlencode
+
+import aiofiles
+import aiofiles.os
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+class BlobStorage(abc.ABC):
+    """
+    Async blob store for uploaded files. Keys are slash-separated relative
+    paths such as "resumes/ab/<sha256>.pdf".
+    """
+
+    @abc.abstractmethod
+    async def put(self, key: str, data: bytes, content_type: str = "application/octet-stream"):
+        ...
+
+    @abc.abstractmethod
+    def get(self, key: str, start: Optional[int] = None, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Stream the blob, or the inclusive byte range [start, end]."""
+
+    @abc.abstractmethod
+    async def size(self, key: str) -> int:
+        ...
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await self.size(key)
+            return True
+        except BlobNotFound:
+            return False
+
+    @abc.abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abc.abstractmethod
+    def presigned_url(self, key: str, expires_in: int = 900) -> str:
+        ...
+
+
+class LocalBlobStorage(BlobStorage):
+    """
+    Files on the local disk. Download URLs are HMAC-signed links to
+    GET /files/{key}, which checks the signature and serves byte ranges.
+    """
+
+    def __init__(self, root: str, secret: str, url_base: str = ""):
+        self.root = os.path.abspath(root)
+        self.secret = secret.encode()
+        self.url_base = url_base.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise BlobNotFound(key)
+        return path
+
+    async def put(self, key: str, data: bytes, content_type: str = "application/octet-stream"):
+        path = self._path(key)
+        await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = os.path.join(os.path.dirname(path), f".tmp-{uuid.uuid4().hex}")
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                view = memoryview(data)
+                for offset in range(0, len(view), CHUNK_SIZE):
+                    await f.write(view[offset:offset + CHUNK_SIZE])
+            # Atomic publish: readers never see a half-written file
+            await aiofiles.os.replace(tmp_path, path)
+        finally:
+            if await aiofiles.os.path.exists(tmp_path):
+                await aiofiles.os.remove(tmp_path)
+
+    async def get(self, key: str, start: Optional[int] = None, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        if not await aiofiles.os.path.isfile(path):
+            raise BlobNotFound(key)
+        remaining = None if end is None else end - (start or 0) + 1
+        async with aiofiles.open(path, "rb") as f:
+            if start:
+                await f.seek(start)
+            while remaining is None or remaining > 0:
+                chunk = await f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    async def size(self, key: str) -> int:
+        try:
+            stat = await aiofiles.os.stat(self._path(key))
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+        return stat.st_size
+
+    async def delete(self, key: str):
+        try:
+            await aiofiles.os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def sign(self, key: str, expires: int) -> str:
+        return hmac.new(self.secret, f"{key}:{expires}".encode(), hashlib.sha256).hexdigest()
+
+    def verify(self, key: str, expires: int, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self.sign(key, expires), signature)
+
+    def presigned_url(self, key: str, expires_in: int = 900) -> str:
+        expires = int(time.time()) + expires_in
+        query = urlencode({"expires": expires, "signature": self.sign(key, expires)})
+        return f"{self.url_base}/files/{quote(key)}?{query}"
+
+
+class S3BlobStorage(BlobStorage):
+    """
+    S3-compatible object storage (AWS S3, MinIO, R2...). Uses boto3, which is
+    imported lazily so local-disk deployments don't need it. Blocking SDK
+    calls run in worker threads.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+    ):
+        import boto3
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            # Path-style addressing works with MinIO and other stand-ins
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+
+    async def put(self, key: str, data: bytes, content_type: str = "application/octet-stream"):
+        await asyncio.to_thread(
+            self.client.put_object, Bucket=self.bucket, Key=key, Body=data, ContentType=content_type
+        )
+
+    async def get(self, key: str, start: Optional[int] = None, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        params = {"Bucket": self.bucket, "Key": key}
+        if start is not None or end is not None:
+            params["Range"] = f"bytes={start or 0}-{'' if end is None else end}"
+        try:
+            response = await asyncio.to_thread(self.client.get_object, **params)
+        except self.client.exceptions.NoSuchKey:
+            raise BlobNotFound(key)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def size(self, key: str) -> int:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+        except ClientError:
+            raise BlobNotFound(key)
+        return head["ContentLength"]
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    def presigned_url(self, key: str, expires_in: int = 900) -> str:
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in
+        )
+
+
+def create_storage() -> BlobStorage:
+    backend = (os.getenv("STORAGE_BACKEND") or "local").strip().lower()
+    if backend == "s3":
+        return S3BlobStorage(
+            bucket=os.getenv("S3_BUCKET", "resumes"),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            region=os.getenv("S3_REGION") or None,
+            access_key=os.getenv("S3_ACCESS_KEY") or None,
+            secret_key=os.getenv("S3_SECRET_KEY") or None,
+        )
+    return LocalBlobStorage(
+        root=os.getenv("UPLOAD_DIR", "uploads"),
+        secret=os.getenv("SECRET_KEY", "supersecretkey123"),
+        url_base=os.getenv("PUBLIC_API_URL", ""),
+    )
+
+
+_storage: Optional[BlobStorage] = None
+
+
+def get_storage() -> BlobStorage:
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
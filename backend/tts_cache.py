@@ -0,0 +1,77 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from metrics import registry
+from storage import BlobNotFound, LocalBlobStorage
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+
+
+class TTSCache:
+    """
+    Synthesized audio keyed by (text, voice, format).
+
+    A byte-bounded memory LRU sits in front of pre-encoded files on disk, so
+    the greeting, fixed questions and warmed-up screening questions survive
+    restarts and are shared by every worker on the host. Only warm() writes
+    to disk; live sentences stay in memory, so the disk tier is bounded by
+    the set of warmed prompts.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_memory_bytes: int = TTS_CACHE_MEMORY_BYTES):
+        self.disk = LocalBlobStorage(directory or TTS_CACHE_DIR, secret="")
+        self.max_memory_bytes = max_memory_bytes
+        self.memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self.memory_bytes = 0
+        self.memory_hits = registry.counter("tts_cache.memory_hits")
+        self.disk_hits = registry.counter("tts_cache.disk_hits")
+        self.misses = registry.counter("tts_cache.misses")
+        registry.gauge("tts_cache.memory_entries", lambda: len(self.memory))
+        registry.gauge("tts_cache.memory_bytes", lambda: self.memory_bytes)
+
+    @staticmethod
+    def key(text: str, voice: str, audio_format: str) -> str:
+        digest = hashlib.sha256(f"{voice}\n{audio_format}\n{text.strip()}".encode("utf-8")).hexdigest()
+        ext = "mp3" if "mp3" in audio_format else "bin"
+        return f"{digest[:2]}/{digest}.{ext}"
+
+    async def get(self, text: str, voice: str, audio_format: str) -> Optional[bytes]:
+        key = self.key(text, voice, audio_format)
+        audio = self.memory.get(key)
+        if audio is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits.inc()
+            return audio
+        try:
+            audio = b"".join([chunk async for chunk in self.disk.get(key)])
+        except BlobNotFound:
+            self.misses.inc()
+            return None
+        self.disk_hits.inc()
+        self._remember(key, audio)
+        return audio
+
+    async def put(self, text: str, voice: str, audio_format: str, audio: bytes, persist: bool = False):
+        key = self.key(text, voice, audio_format)
+        self._remember(key, audio)
+        if persist:
+            await self.disk.put(key, audio, content_type="audio/mpeg")
+
+    async def contains(self, text: str, voice: str, audio_format: str) -> bool:
+        key = self.key(text, voice, audio_format)
+        return key in self.memory or await self.disk.exists(key)
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self.memory.pop(key, None)
+        if previous is not None:
+            self.memory_bytes -= len(previous)
+        self.memory[key] = audio
+        self.memory_bytes += len(audio)
+        while self.memory_bytes > self.max_memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
@@ -0,0 +1,40 @@
+import logging
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+from services import CozeService, get_tts
+
+logger = logging.getLogger("tts_warmup")
+
+
+async def screening_questions(db: AsyncSession, app_id: int) -> List[str]:
+    """Questions the screening agent prepared for this application's interview."""
+    records = await db.scalars(
+        select(models.InterviewRecord)
+        .where(models.InterviewRecord.application_id == app_id)
+        .order_by(models.InterviewRecord.id.desc())
+    )
+    for record in records:
+        result = record.pre_screening_result or {}
+        questions = [q for q in result.get("questions") or [] if isinstance(q, str) and q.strip()]
+        if questions:
+            return questions
+    return []
+
+
+async def warm_prompts(texts: List[str], reason: str = "") -> Dict[str, int]:
+    """Render texts into the TTS cache; safe to run as a background task."""
+    try:
+        stats = await get_tts().warm(texts)
+    except Exception as e:
+        logger.error(f"TTS warm-up ({reason}) failed: {e}")
+        return {}
+    logger.info(f"TTS warm-up ({reason}): {stats}")
+    return stats
+
+
+async def warm_fixed_prompts() -> Dict[str, int]:
+    return await warm_prompts(CozeService.fixed_prompts(), reason="fixed prompts")
@@ -0,0 +1,51 @@
+import hashlib
+import os
+from typing import BinaryIO
+
+CHUNK_SIZE = 64 * 1024
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", str(10 * 1024 * 1024)))
+PDF_MAGIC = b"%PDF"
+
+
+class InvalidUpload(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class IngestedUpload:
+    def __init__(self, content_hash: str, data: bytes):
+        self.content_hash = content_hash
+        self.data = data
+        self.size = len(data)
+
+    def storage_key(self, prefix: str, ext: str = "pdf") -> str:
+        """Content-addressed key, so identical uploads share one blob."""
+        return f"{prefix}/{self.content_hash[:2]}/{self.content_hash}.{ext}"
+
+
+def ingest_pdf(src: BinaryIO, max_bytes: int = MAX_RESUME_BYTES) -> IngestedUpload:
+    """
+    Read an upload once, in chunks: check the PDF magic bytes on the first
+    chunk, hash and size-check as we go, and keep the bytes in memory for the
+    parser and the blob store.
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    header_checked = False
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(buffer) + len(chunk) > max_bytes:
+            raise InvalidUpload(413, f"File too large. The limit is {max_bytes // (1024 * 1024)} MB.")
+        digest.update(chunk)
+        buffer.extend(chunk)
+        if not header_checked and len(buffer) >= len(PDF_MAGIC):
+            if buffer[:len(PDF_MAGIC)] != PDF_MAGIC:
+                raise InvalidUpload(400, "Invalid file format. The file is not a valid PDF.")
+            header_checked = True
+    if not header_checked:
+        raise InvalidUpload(400, "Invalid file format. The file is not a valid PDF.")
+    return IngestedUpload(digest.hexdigest(), bytes(buffer))
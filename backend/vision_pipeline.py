@@ -0,0 +1,228 @@
+import asyncio
+import base64
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("vision")
+
+# FaceMesh works on ~256px crops internally; larger frames only cost decode time
+ANALYSIS_MAX_WIDTH = 320
+
+# Per-process FaceMesh instance, created by the pool initializer.
+_face_mesh = None
+
+
+def _worker_init():
+    global _face_mesh
+    try:
+        import mediapipe as mp
+        _face_mesh = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+    except Exception as e:
+        logging.getLogger("vision").error(f"FaceMesh unavailable in worker: {e}")
+
+
+def _decode_frame(frame: Any):
+    import cv2
+    import numpy as np
+
+    if isinstance(frame, tuple):
+        # (message bytes, payload offset) from the binary protocol: no copy
+        buffer, offset = frame
+        encoded = np.frombuffer(buffer, np.uint8, offset=offset)
+    else:
+        if isinstance(frame, str):
+            # Data URL from the JSON protocol
+            if "," in frame:
+                frame = frame.split(",", 1)[1]
+            frame = base64.b64decode(frame)
+        encoded = np.frombuffer(frame, np.uint8)
+    image = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+    if image is not None and image.shape[1] > ANALYSIS_MAX_WIDTH:
+        scale = ANALYSIS_MAX_WIDTH / image.shape[1]
+        image = cv2.resize(image, (ANALYSIS_MAX_WIDTH, int(image.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+    return image
+
+
+def analyze_frames(frames: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Run face detection over a batch of encoded frames: JPEG bytes, base64
+    data URLs, or (buffer, offset) pairs pointing at a JPEG inside a buffer.
+    """
+    import cv2
+
+    results: List[Dict[str, Any]] = []
+    for frame in frames:
+        try:
+            image = _decode_frame(frame)
+            if image is None:
+                results.append({"error": "decode_failed"})
+                continue
+            if _face_mesh is None:
+                results.append({"error": "model_unavailable"})
+                continue
+            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            output = _face_mesh.process(image_rgb)
+            results.append({"face": bool(output.multi_face_landmarks)})
+        except Exception as e:
+            results.append({"error": str(e)})
+    return results
+
+
+class VisionPipeline:
+    """
+    Moves frame analysis off the event loop.
+
+    Each session has a small bounded queue; when a session produces frames
+    faster than the workers consume them the oldest frame is dropped, since
+    only recent frames matter for proctoring. A dispatcher drains the queues
+    round-robin into batches for a pool of processes, each owning its own
+    FaceMesh, and hands results back through on_result(session_id, result).
+    """
+
+    def __init__(
+        self,
+        on_result: Callable[[str, Dict[str, Any]], None],
+        workers: Optional[int] = None,
+        queue_size: int = 2,
+        batch_size: int = 8,
+        analyzer: Callable[[List[Any]], List[Dict[str, Any]]] = analyze_frames,
+    ):
+        self.on_result = on_result
+        self.workers = workers or int(os.getenv("VISION_WORKERS", "2"))
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.analyzer = analyzer
+        self.queues: Dict[str, Deque[Any]] = {}
+        self.frames_in = 0
+        self.frames_dropped = 0
+        self.frames_done = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_worker_init,
+            )
+        return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken pool (once, however many batches report it); the next batch starts a fresh one."""
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _ensure_started(self):
+        if self._dispatcher is not None and not self._dispatcher.done():
+            return
+        self._wakeup = asyncio.Event()
+        # Two batches in flight per worker keeps them busy without hoarding frames
+        self._slots = asyncio.Semaphore(self.workers * 2)
+        self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    def submit(self, session_id: str, frame: Any):
+        """Queue a frame for analysis. Never blocks; drops the oldest frame when full."""
+        self._ensure_started()
+        queue = self.queues.get(session_id)
+        if queue is None:
+            queue = self.queues[session_id] = deque(maxlen=self.queue_size)
+        if len(queue) == queue.maxlen:
+            self.frames_dropped += 1
+        queue.append(frame)
+        self.frames_in += 1
+        self._wakeup.set()
+
+    def release(self, session_id: str):
+        self.queues.pop(session_id, None)
+
+    def pending(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    def _take_batch(self) -> List[Tuple[str, Any]]:
+        batch: List[Tuple[str, Any]] = []
+        while len(batch) < self.batch_size:
+            progressed = False
+            for session_id, queue in list(self.queues.items()):
+                if queue:
+                    batch.append((session_id, queue.popleft()))
+                    progressed = True
+                    if len(batch) >= self.batch_size:
+                        break
+            if not progressed:
+                break
+        return batch
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while True:
+                await self._slots.acquire()
+                batch = self._take_batch()
+                if not batch:
+                    self._slots.release()
+                    break
+                pool = self._get_pool()
+                try:
+                    future = loop.run_in_executor(pool, self.analyzer, [frame for _, frame in batch])
+                except RuntimeError as e:
+                    # Broken (BrokenProcessPool is a RuntimeError) or shut down; drop this batch and go on
+                    logger.error(f"Vision worker pool unusable, restarting it: {e}")
+                    self._slots.release()
+                    self._reset_pool(pool)
+                    continue
+                future.add_done_callback(lambda f, b=batch, p=pool: self._deliver(b, p, f))
+
+    def _deliver(self, batch: List[Tuple[str, Any]], pool: ProcessPoolExecutor, future: "asyncio.Future"):
+        self._slots.release()
+        try:
+            results = future.result()
+        except BrokenProcessPool:
+            # A worker died (e.g. native crash in FaceMesh); start a fresh pool
+            logger.error("Vision worker pool broke, restarting it")
+            self._reset_pool(pool)
+            return
+        except Exception as e:
+            logger.error(f"Vision batch failed: {e}")
+            return
+        for (session_id, _), result in zip(batch, results):
+            self.frames_done += 1
+            if session_id not in self.queues:
+                continue  # session ended while the batch was running
+            try:
+                self.on_result(session_id, result)
+            except Exception as e:
+                logger.error(f"Vision result handler failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "sessions": len(self.queues),
+            "pending": self.pending(),
+            "frames_in": self.frames_in,
+            "frames_dropped": self.frames_dropped,
+            "frames_done": self.frames_done,
+        }
+
+    def shutdown(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,202 @@
+import asyncio
+import io
+import logging
+import os
+import time
+import wave
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("voice_activity")
+
+# Longest single segment sent to STT; longer speech is cut into pieces
+MAX_SEGMENT_MS = int(os.getenv("VAD_MAX_SEGMENT_MS", "15000"))
+# Hard cap on one answer; the turn ends even if the candidate keeps talking
+MAX_TURN_MS = int(os.getenv("VAD_MAX_TURN_MS", "180000"))
+# Silence after speech that counts as "candidate finished answering"
+END_OF_TURN_MS = int(os.getenv("VAD_END_OF_TURN_MS", "900"))
+
+
+def pcm16_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap raw PCM16 mono in a WAV container, the format STT APIs accept."""
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return out.getvalue()
+
+
+class VoiceActivityDetector:
+    """
+    Energy-based VAD over 16-bit little-endian mono PCM.
+
+    Audio is cut into 20 ms frames; a frame is speech when its RMS is well
+    above an adaptive noise floor. Speech starts after a short run of voiced
+    frames (plus some pre-roll so the first syllable isn't clipped), a
+    segment closes after a short pause, and the turn ends after a longer
+    silence. feed() returns the segments that closed during this chunk and
+    whether the turn has ended.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        threshold_ratio: float = 3.0,
+        min_rms: float = 300.0,
+        speech_start_ms: int = 60,
+        segment_pause_ms: int = 300,
+        end_of_turn_ms: int = END_OF_TURN_MS,
+        max_segment_ms: int = MAX_SEGMENT_MS,
+        pre_roll_ms: int = 200,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.threshold_ratio = threshold_ratio
+        self.min_rms = min_rms
+        self.start_frames = max(1, speech_start_ms // frame_ms)
+        self.pause_frames = max(1, segment_pause_ms // frame_ms)
+        self.end_frames = max(self.pause_frames, end_of_turn_ms // frame_ms)
+        self.max_segment_bytes = max_segment_ms * sample_rate // 1000 * 2
+        self.noise_floor = min_rms / threshold_ratio
+        self._pre_roll: Deque[bytes] = deque(maxlen=(pre_roll_ms + speech_start_ms) // frame_ms)
+        self.reset()
+
+    def reset(self):
+        self._pending = bytearray()  # partial frame carried to the next chunk
+        self._segment = bytearray()
+        self._pre_roll.clear()
+        self.in_speech = False
+        self.heard_speech = False
+        self.voiced_run = 0
+        self.silence_run = 0
+        self.voiced_frames = 0
+        self.total_ms = 0
+
+    def _is_voiced(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype="<i2").astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples)))
+        voiced = rms > max(self.min_rms, self.noise_floor * self.threshold_ratio)
+        if voiced:
+            self.voiced_frames += 1
+        else:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return voiced
+
+    def feed(self, chunk: bytes) -> Tuple[List[bytes], bool]:
+        segments: List[bytes] = []
+        self._pending.extend(chunk)
+        usable = len(self._pending) - len(self._pending) % self.frame_bytes
+        view = memoryview(self._pending)
+        try:
+            for offset in range(0, usable, self.frame_bytes):
+                frame = bytes(view[offset:offset + self.frame_bytes])
+                self.total_ms += self.frame_ms
+                self._step(frame, segments)
+        finally:
+            view.release()
+        del self._pending[:usable]
+        ended = self.heard_speech and not self.in_speech and self.silence_run >= self.end_frames
+        return segments, ended
+
+    def _step(self, frame: bytes, segments: List[bytes]):
+        voiced = self._is_voiced(frame)
+        if self.in_speech:
+            self._segment.extend(frame)
+            if voiced:
+                self.silence_run = 0
+            else:
+                self.silence_run += 1
+                if self.silence_run >= self.pause_frames:
+                    segments.append(bytes(self._segment))
+                    self._segment = bytearray()
+                    self.in_speech = False
+                    return
+            if len(self._segment) >= self.max_segment_bytes:
+                segments.append(bytes(self._segment))
+                self._segment = bytearray()
+            return
+
+        self._pre_roll.append(frame)
+        if voiced:
+            self.voiced_run += 1
+            self.silence_run = 0
+            if self.voiced_run >= self.start_frames:
+                self.in_speech = True
+                self.heard_speech = True
+                self.voiced_run = 0
+                self._segment = bytearray(b"".join(self._pre_roll))
+                self._pre_roll.clear()
+        else:
+            self.voiced_run = 0
+            self.silence_run += 1
+
+    def flush(self) -> Optional[bytes]:
+        """Close the open segment, if any (e.g. the client ended the turn itself)."""
+        segment = bytes(self._segment) if self.in_speech and self._segment else None
+        self._segment = bytearray()
+        self.in_speech = False
+        return segment
+
+
+class StreamingTranscriber:
+    """
+    Per-session speech turn: runs the VAD on incoming PCM and sends each
+    finished segment to STT right away, so most of the answer is already
+    transcribed by the time the candidate stops talking. Only closed
+    segments are kept until their STT call starts, which bounds memory.
+    """
+
+    def __init__(self, stt, sample_rate: int = 16000, max_turn_ms: int = MAX_TURN_MS):
+        self.stt = stt
+        self.sample_rate = sample_rate
+        self.max_turn_ms = max_turn_ms
+        self.vad = VoiceActivityDetector(sample_rate=sample_rate)
+        self.tasks: List[asyncio.Task] = []
+        self.last_voice_at: Optional[float] = None
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume a PCM chunk; returns True once the turn should end."""
+        voiced_before = self.vad.voiced_frames
+        segments, ended = self.vad.feed(chunk)
+        if self.vad.heard_speech and self.vad.voiced_frames > voiced_before:
+            # Wall-clock time the last voiced frame ended, for turn latency
+            self.last_voice_at = time.monotonic() - self.vad.silence_run * self.vad.frame_ms / 1000
+        for segment in segments:
+            self._transcribe(segment)
+        if self.vad.total_ms >= self.max_turn_ms and self.vad.heard_speech:
+            logger.info("Answer hit the maximum turn length, ending turn")
+            return True
+        return ended
+
+    def _transcribe(self, segment: bytes):
+        wav = pcm16_to_wav(segment, self.sample_rate)
+        self.tasks.append(asyncio.get_running_loop().create_task(self.stt.transcribe(wav)))
+
+    async def finish(self) -> str:
+        """Transcribe whatever is left and return the text of the whole turn."""
+        tail = self.vad.flush()
+        if tail:
+            self._transcribe(tail)
+        tasks, self.tasks = self.tasks, []
+        self.vad.reset()
+        self.last_voice_at = None
+        texts = await asyncio.gather(*tasks, return_exceptions=True)
+        parts = []
+        for text in texts:
+            if isinstance(text, Exception):
+                logger.error(f"Segment transcription failed: {text}")
+            elif text:
+                parts.append(text.strip())
+        return " ".join(parts)
+
+    def cancel(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+        self.vad.reset()
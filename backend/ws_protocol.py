@@ -0,0 +1,68 @@
+"""
+Binary framing for /ws/interview.
+
+Every binary message starts with a fixed 14-byte big-endian header:
+
+    version (u8) | kind (u8) | sequence (u32) | timestamp ms (u64) | payload...
+
+kind is one of KIND_AUDIO (an audio chunk), KIND_VIDEO (one JPEG frame) or
+KIND_CONTROL (a UTF-8 JSON event, same shape as the text protocol). The
+client opts in by sending {"type": "HELLO", "protocols": ["binary.v1", ...]}
+as its first text message; without it the legacy JSON protocol is used,
+where binary messages are bare audio and frames arrive as base64 JSON.
+"""
+import json
+import struct
+import time
+from typing import Any, Dict, List, NamedTuple
+
+PROTOCOL_BINARY = "binary.v1"
+PROTOCOL_JSON = "json"
+
+VERSION = 1
+HEADER = struct.Struct("!BBIQ")
+
+KIND_AUDIO = 1
+KIND_VIDEO = 2
+KIND_CONTROL = 3
+KINDS = (KIND_AUDIO, KIND_VIDEO, KIND_CONTROL)
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class BinaryFrame(NamedTuple):
+    kind: int
+    seq: int
+    timestamp_ms: int
+    data: bytes  # The whole message; payload starts at HEADER.size
+
+    @property
+    def payload(self) -> memoryview:
+        return memoryview(self.data)[HEADER.size:]
+
+    def control(self) -> Dict[str, Any]:
+        return json.loads(bytes(self.payload).decode("utf-8"))
+
+
+def decode_frame(data: bytes) -> BinaryFrame:
+    """Parse the header only; the payload is left in place (no copy)."""
+    if len(data) < HEADER.size:
+        raise ProtocolError("Frame shorter than header")
+    version, kind, seq, timestamp_ms = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ProtocolError(f"Unsupported frame version {version}")
+    if kind not in KINDS:
+        raise ProtocolError(f"Unknown frame kind {kind}")
+    return BinaryFrame(kind, seq, timestamp_ms, data)
+
+
+def encode_frame(kind: int, seq: int, payload: bytes, timestamp_ms: int = None) -> bytes:
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    return HEADER.pack(VERSION, kind, seq & 0xFFFFFFFF, timestamp_ms) + payload
+
+
+def negotiate(offered: List[str]) -> str:
+    return PROTOCOL_BINARY if PROTOCOL_BINARY in (offered or []) else PROTOCOL_JSON
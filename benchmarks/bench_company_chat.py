@@ -0,0 +1,147 @@
+"""
+Marketing-spike benchmark for /ai/company-chat admission control.
+
+Fires a burst of company-chat questions at DeepSeekService. Most visitors
+ask one of a few popular questions, worded in slightly different ways. The
+LLM is mocked with a fixed latency, and the mock records how many calls were
+running at once.
+
+  unbounded   the old path: every request becomes its own upstream call
+  admission   per-client and global token buckets, a concurrency cap with a
+              bounded queue (fast 429s), and coalescing of identical
+              in-flight questions
+  cache       admission plus the semantic answer cache for opening questions
+
+    python benchmarks/bench_company_chat.py --requests 2000 --clients 400
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(backend_dir))
+
+import numpy as np  # noqa: E402
+
+from admission import AdmissionController, AdmissionRejected  # noqa: E402
+from semantic_cache import SemanticCache  # noqa: E402
+from services import DeepSeekService  # noqa: E402
+
+GREETING = {"role": "assistant", "content": "你好！我是 TechFuture 的 AI 招聘顾问 DeepHR。"}
+POPULAR = [
+    ["福利怎么样？", "福利怎么样", "公司福利怎么样？", "福利 怎么样!"],
+    ["面试流程是怎样的？", "面试流程是怎么样的", "面试流程是怎样的呢"],
+    ["接受远程办公吗？", "接受远程办公吗", "能接受远程办公吗？"],
+    ["有 Python 后端岗位吗？", "有python后端岗位吗", "有Python后端的岗位吗？"],
+    ["公司在哪里？", "公司在哪里", "你们公司在哪里？"],
+]
+
+
+class MockLLM:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, history):
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.latency)
+            return "ok"
+        finally:
+            self.running -= 1
+
+
+async def run(mode: str, args) -> dict:
+    rng = random.Random(0)
+    service = DeepSeekService()
+    llm = MockLLM(args.latency)
+    service._complete = llm
+    if mode != "cache":
+        service.answers = SemanticCache(f"bench.{mode}.semantic_cache", threshold=2.0)  # never hits
+    else:
+        service.answers = SemanticCache(f"bench.{mode}.semantic_cache")
+    if mode == "unbounded":
+        call = lambda history, client: llm(history)  # noqa: E731
+    else:
+        service.admission = AdmissionController(
+            f"bench.{mode}.llm",
+            rate=args.rate,
+            burst=args.rate * 2,
+            client_rate=0.5,
+            client_burst=3,
+            max_concurrency=args.max_concurrency,
+            max_queue=args.max_queue,
+            queue_timeout=args.queue_timeout,
+        )
+        call = lambda history, client: service.chat(history, client_id=client)  # noqa: E731
+
+    latencies, rejected_ms = [], []
+
+    async def visitor(i: int):
+        # Arrivals spread over --spread seconds
+        await asyncio.sleep(rng.uniform(0, args.spread))
+        question = rng.choice(rng.choice(POPULAR)) if rng.random() < args.popular else f"问题 {i}"
+        client = f"10.0.{i % args.clients // 256}.{i % args.clients % 256}"
+        start = time.perf_counter()
+        try:
+            await call([GREETING, {"role": "user", "content": question}], client)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except AdmissionRejected:
+            rejected_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(visitor(i) for i in range(args.requests)))
+    return {
+        "elapsed": time.perf_counter() - start,
+        "answered": len(latencies),
+        "rejected": len(rejected_ms),
+        "p50": np.percentile(latencies, 50),
+        "p99": np.percentile(latencies, 99),
+        "reject_p99": np.percentile(rejected_ms, 99) if rejected_ms else 0.0,
+        "upstream_calls": llm.calls,
+        "peak_concurrency": llm.peak,
+        "hit_rate": service.answers.hit_rate(),
+        "saved_s": service.answers.latency_saved.value / 1000,
+    }
+
+
+async def main_async(args):
+    print(
+        f"{args.requests} requests from {args.clients} clients over {args.spread:g}s, "
+        f"{args.popular:.0%} popular questions, LLM latency {args.latency:g}s"
+    )
+    for mode in ("unbounded", "admission", "cache"):
+        r = await run(mode, args)
+        print(
+            f"  {mode:<10} answered {r['answered']:5d}  429 {r['rejected']:5d} (p99 {r['reject_p99']:5.1f} ms)  "
+            f"p50 {r['p50']:7.0f} ms  p99 {r['p99']:7.0f} ms  "
+            f"upstream calls {r['upstream_calls']:5d}  peak concurrent {r['peak_concurrency']:5d}"
+        )
+        if mode == "cache":
+            print(f"             semantic cache hit rate {r['hit_rate']:.1%}, LLM time saved {r['saved_s']:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=400)
+    parser.add_argument("--spread", type=float, default=5.0)
+    parser.add_argument("--popular", type=float, default=0.7)
+    parser.add_argument("--latency", type=float, default=1.5)
+    parser.add_argument("--rate", type=float, default=10)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--queue-timeout", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Write load test: concurrent POST /applications against each database setup.
+
+Runs the backend under uvicorn in a subprocess (--workers processes, each
+with its own connection pool), signs in --users candidates, and has them
+submit applications concurrently. Every submission is two commits: the
+application row and its notification.
+
+  sqlite-default  SQLITE_TUNING=0: rollback journal, synchronous=FULL
+  sqlite-tuned    WAL, synchronous=NORMAL, busy timeout, mmap
+  postgres        only with --postgres-url (use a scratch database; the
+                  schema is created there and bench users are added)
+
+Requests beyond the pool size (DB_POOL_SIZE + DB_MAX_OVERFLOW per worker)
+wait up to DB_POOL_TIMEOUT for a connection.
+
+    python benchmarks/bench_db_writes.py --requests 2000 --concurrency 16 --workers 2
+    python benchmarks/bench_db_writes.py --postgres-url postgresql://hr:hr@localhost/hr_bench
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, backend_dir)
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+# Schema setup here must not switch the files to WAL (the journal mode is
+# persistent); the server under test applies its own settings
+os.environ["SQLITE_TUNING"] = "0"
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def prepare(url: str, users: int):
+    """Create the schema, one job and the candidates; returns (job_id, tokens)."""
+    import auth
+    import models
+    from database import create_db_engine
+    from migrate import run_migrations
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_db_engine(url)
+    run_migrations(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        job = db.query(models.Job).filter(models.Job.title == "Bench job").first()
+        if job is None:
+            job = models.Job(
+                title="Bench job", department="研发中心", location="上海", salary_range="20k-40k",
+                description="-", requirements="-", knowledge_base="-",
+            )
+            db.add(job)
+        emails = [f"bench-{i}@example.com" for i in range(users)]
+        existing = {e for (e,) in db.query(models.User.email).filter(models.User.email.in_(emails))}
+        db.add_all(models.User(email=e, hashed_password="-", full_name="bench") for e in emails if e not in existing)
+        db.commit()
+        job_id = job.id
+    finally:
+        db.close()
+        engine.dispose()
+    return job_id, [auth.create_access_token({"sub": e}) for e in emails]
+
+
+def start_server(url: str, sqlite_tuning: bool, workers: int, workdir: str):
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=url,
+        SQLITE_TUNING="1" if sqlite_tuning else "0",
+        PYTHONPATH=backend_dir,
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            if httpx.get(f"{base}/jobs", timeout=1).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("backend did not start")
+
+
+async def load(base: str, job_id: int, tokens, requests: int, concurrency: int):
+    latencies, errors = [], {}
+    queue = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+
+        async def worker():
+            for i in queue:
+                headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/applications", data={"job_id": str(job_id), "github_link": f"https://github.com/bench/{i}"},
+                        headers=headers,
+                    )
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                    continue
+                if response.status_code == 200:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--postgres-url")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_db_")
+    setups = [
+        ("sqlite-default", f"sqlite:///{workdir}/default.db", False),
+        ("sqlite-tuned", f"sqlite:///{workdir}/tuned.db", True),
+    ]
+    if args.postgres_url:
+        setups.append(("postgres", args.postgres_url, True))
+    print(f"{args.requests} POST /applications, {args.concurrency} concurrent, {args.workers} uvicorn workers")
+    try:
+        for label, url, tuning in setups:
+            job_id, tokens = prepare(url, args.users)
+            proc, base = start_server(url, tuning, args.workers, workdir)
+            try:
+                elapsed, latencies, errors = asyncio.run(load(base, job_id, tokens, args.requests, args.concurrency))
+            finally:
+                proc.terminate()
+                proc.wait()
+            p50, p99 = (np.percentile(latencies, 50), np.percentile(latencies, 99)) if latencies else (0, 0)
+            print(
+                f"  {label:<15} {len(latencies) / elapsed:7.1f} req/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  "
+                f"ok {len(latencies)}  errors {errors or 0}"
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Outbound HTTP benchmark for the shared client pool.
+
+Starts benchmarks/fake_upstream.py in a subprocess and fires chat completion
+calls at it with a fixed concurrency:
+
+  fresh   a new httpx.AsyncClient per call, i.e. a new connection every time
+          (what each placeholder service would have done on its own)
+  pooled  the shared ProviderClient from http_client.py (keep-alive pool,
+          concurrency cap, retries, circuit breaker)
+
+Then it injects failures: a 20% 503 rate (retries hide it from callers) and
+a dead upstream (the breaker opens and calls are rejected immediately
+instead of each waiting out its retries).
+
+Against a real HTTPS API the fresh-connection cost also includes the TLS
+handshake, so the gap is larger than on localhost.
+
+    python benchmarks/bench_http_client.py --calls 1000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(backend_dir))
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+from http_client import CircuitBreaker, HttpClientPool, UpstreamError  # noqa: E402
+
+FAKE_UPSTREAM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_upstream.py")
+PAYLOAD = {"model": "fake", "messages": [{"role": "user", "content": "你好"}]}
+
+
+async def run(call, calls: int, concurrency: int):
+    latencies, errors = [], 0
+    queue = iter(range(calls))
+
+    async def worker():
+        nonlocal errors
+        for _ in queue:
+            start = time.perf_counter()
+            try:
+                await call()
+                latencies.append((time.perf_counter() - start) * 1000)
+            except (UpstreamError, httpx.HTTPError):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def report(label: str, elapsed: float, latencies, errors: int, stats: dict):
+    p50, p99 = (np.percentile(latencies, [50, 99]) if latencies else (float("nan"),) * 2)
+    print(
+        f"  {label:<22} {len(latencies) / elapsed:8.0f} ok/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  "
+        f"errors {errors:4d}  upstream requests {stats['requests']:5d}  connections {stats['connections']:4d}"
+    )
+
+
+def start_upstream(latency: float):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, FAKE_UPSTREAM, "--port", str(port), "--latency", str(latency)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            httpx.get(base_url + "/_stats")
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("fake upstream did not start")
+
+
+async def main_async(args):
+    process, base_url = start_upstream(args.latency)
+    control = httpx.AsyncClient(base_url=base_url)
+    print(f"fake upstream at {base_url}, latency {args.latency * 1000:.0f} ms, {args.calls} calls x {args.concurrency} concurrent")
+
+    async def stats():
+        snapshot = (await control.get("/_stats")).json()
+        await control.post("/_reset")
+        return snapshot
+
+    async def set_error_rate(rate: float):
+        await control.post("/_control", json={"error_rate": rate})
+
+    async def fresh():
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            response = await client.post("/v1/chat/completions", json=PAYLOAD)
+            response.raise_for_status()
+            return response.json()
+
+    pool = HttpClientPool(max_keepalive=args.concurrency)
+    provider = pool.provider("bench", base_url=base_url, max_concurrency=args.concurrency, retries=3)
+    no_retry = pool.provider("bench_no_retry", base_url=base_url, max_concurrency=args.concurrency, retries=0)
+
+    print("healthy upstream")
+    report("fresh client per call", *await run(fresh, args.calls, args.concurrency), await stats())
+    report("shared pool", *await run(lambda: provider.post_json("/v1/chat/completions", PAYLOAD), args.calls, args.concurrency), await stats())
+
+    print("20% of calls fail with 503")
+    await set_error_rate(0.2)
+    no_retry.breaker = CircuitBreaker(threshold=10 ** 9)  # measure retries alone
+    provider.breaker = CircuitBreaker(threshold=10 ** 9)
+    report("pool, no retries", *await run(lambda: no_retry.post_json("/v1/chat/completions", PAYLOAD), args.calls, args.concurrency), await stats())
+    report("pool, 3 retries", *await run(lambda: provider.post_json("/v1/chat/completions", PAYLOAD), args.calls, args.concurrency), await stats())
+
+    print("upstream down (every call 503)")
+    await set_error_rate(1.0)
+    provider.breaker = CircuitBreaker(threshold=10 ** 9)
+    report("retries, no breaker", *await run(lambda: provider.post_json("/v1/chat/completions", PAYLOAD), args.calls, args.concurrency), await stats())
+    provider.breaker = CircuitBreaker(threshold=5, reset_after=30)
+    report("retries + breaker", *await run(lambda: provider.post_json("/v1/chat/completions", PAYLOAD), args.calls, args.concurrency), await stats())
+    print(f"  breaker state: {provider.breaker.state}, rejected {provider.rejected.value}")
+
+    await pool.aclose()
+    await control.aclose()
+    process.terminate()
+    process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Job response benchmark: full ORM serialization vs the per-view models.
+
+Seeds N synthetic jobs (multi-KB description and knowledge base, see
+bench_job_search.py) into a throwaway SQLite database, then measures p50/p99
+latency and bytes per response for:
+
+  before  the old handlers, mounted under /bench: every column of every
+          ORM object, knowledge_base included
+  after   GET /jobs (list columns only), GET /jobs/{id} (public detail),
+          GET /admin/jobs/{id} (everything, admin token)
+
+    python benchmarks/bench_job_responses.py --jobs 1000 10000
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, backend_dir)
+
+import numpy as np  # noqa: E402
+
+from bench_job_search import seed  # noqa: E402
+
+
+def measure(client, urls, headers=None):
+    latencies, sizes = [], []
+    for url in urls:
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, (url, response.status_code)
+        sizes.append(len(response.content))
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), np.mean(sizes), response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--list-requests", type=int, default=20)
+    parser.add_argument("--detail-requests", type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_jobs_")
+    os.chdir(workdir)  # the app's SQLite file and upload dir land here
+    try:
+        from fastapi import Depends
+        from fastapi.testclient import TestClient
+        from sqlalchemy.orm import Session
+
+        import auth
+        import database
+        from migrate import run_migrations
+
+        run_migrations(database.engine)
+        import main as app_main
+        import models
+        from database import SessionLocal
+        from dependencies import get_db
+
+        # The handlers as they were before the response models
+        @app_main.app.get("/bench/jobs")
+        def full_jobs(db: Session = Depends(get_db)):
+            return db.query(models.Job).filter(models.Job.is_active == 1).all()
+
+        @app_main.app.get("/bench/jobs/{job_id}")
+        def full_job(job_id: int, db: Session = Depends(get_db)):
+            return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+        db = SessionLocal()
+        admin = models.User(email="bench-admin@example.com", hashed_password="-", full_name="bench", role="admin")
+        db.add(admin)
+        db.commit()
+        admin_headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': admin.email})}"}
+        db.close()
+
+        logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+        client = TestClient(app_main.app)
+        rng = random.Random(0)
+        seeded = 0
+        for n_jobs in sorted(args.jobs):
+            db = SessionLocal()
+            seed(db, models, n_jobs - seeded, rng)
+            db.close()
+            seeded = n_jobs
+
+            ids = [rng.randint(1, n_jobs) for _ in range(args.detail_requests)]
+            lists = [None] * args.list_requests
+            print(f"{n_jobs} jobs")
+            rows = [
+                ("list    before  /bench/jobs", measure(client, ["/bench/jobs" for _ in lists])),
+                ("list    after   /jobs", measure(client, ["/jobs" for _ in lists])),
+                ("detail  before  /bench/jobs/{id}", measure(client, [f"/bench/jobs/{i}" for i in ids])),
+                ("detail  after   /jobs/{id}", measure(client, [f"/jobs/{i}" for i in ids])),
+                ("detail  admin   /admin/jobs/{id}", measure(client, [f"/admin/jobs/{i}" for i in ids], admin_headers)),
+            ]
+            for label, (p50, p99, size, data) in rows:
+                leaked = "knowledge_base" in (data[0] if isinstance(data, list) else data)
+                print(
+                    f"  {label:<34} p50 {p50:8.2f} ms  p99 {p99:8.2f} ms  "
+                    f"{size / 1024:9.1f} KB{'  (knowledge_base included)' if leaked else ''}"
+                )
+    finally:
+        os.chdir("/")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Job board benchmark: full GET /jobs vs GET /jobs/search.
+
+Seeds N synthetic jobs (with realistic multi-KB description and knowledge
+base text) into a throwaway SQLite database in a temp directory, then
+compares response size and latency of:
+
+  GET /jobs                      every active job, list columns
+  GET /jobs/search               first page of the slim projection + facets
+  GET /jobs/search?q=...         FTS5 trigram match (3+ chars) vs LIKE scan
+
+    python benchmarks/bench_job_search.py --jobs 1000 5000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, backend_dir)
+
+TITLES = ["Python 后端工程师", "React 前端工程师", "AI 算法工程师", "B端产品经理", "UI/UX 设计师", "内容运营", "数据分析师", "Golang 开发工程师"]
+DEPARTMENTS = ["研发中心", "产品中心", "设计中心", "市场与运营"]
+CITIES = ["上海", "北京", "深圳", "杭州", "新加坡"]
+TYPES = ["全职", "全职", "全职", "实习", "兼职", "外包"]
+SKILLS = ["FastAPI", "Kubernetes", "PostgreSQL", "Redis", "PyTorch", "TypeScript", "Figma", "数据埋点", "增长策略", "高并发"]
+
+
+def timed(client, url, params=None, repeat=5):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url, params=params)
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(response.content), response.json()
+
+
+def seed(db, models, n_jobs: int, rng: random.Random):
+    filler = "我们正在寻找有热情、有责任心的伙伴加入团队，一起打造行业领先的产品。" * 20
+    for i in range(n_jobs):
+        skills = rng.sample(SKILLS, 3)
+        db.add(models.Job(
+            title=f"{rng.choice(TITLES)} {i}",
+            department=rng.choice(DEPARTMENTS),
+            location=rng.choice(CITIES),
+            type=rng.choice(TYPES),
+            salary_range=f"{rng.randint(15, 40)}k-{rng.randint(41, 80)}k",
+            description=f"负责核心业务，使用 {'、'.join(skills)}。" + filler,
+            requirements="\n".join(f"熟悉 {s}" for s in skills),
+            knowledge_base=filler * 2,
+            public_knowledge=filler[:200],
+        ))
+        if i % 1000 == 999:
+            db.commit()
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 5000])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_jobs_")
+    os.chdir(workdir)  # the app's SQLite file and upload dir land here
+    try:
+        from fastapi.testclient import TestClient
+
+        import database
+        import job_search
+        from migrate import run_migrations
+
+        run_migrations(database.engine)
+        import main as app_main
+        import models
+        from database import SessionLocal
+
+        client = TestClient(app_main.app)
+        rng = random.Random(0)
+        seeded = 0
+        for n_jobs in sorted(args.jobs):
+            db = SessionLocal()
+            seed(db, models, n_jobs - seeded, rng)
+            db.close()
+            seeded = n_jobs
+
+            print(f"{n_jobs} jobs")
+            ms, size, _ = timed(client, "/jobs")
+            print(f"  GET /jobs                    {ms:8.1f} ms  {size / 1024:9.1f} KB")
+            ms, size, data = timed(client, "/jobs/search")
+            print(f"  GET /jobs/search             {ms:8.1f} ms  {size / 1024:9.1f} KB  ({len(data['items'])} items + facets)")
+            ms, size, data = timed(client, "/jobs/search", {"type": "实习", "location": "上海"})
+            print(f"  search type+location         {ms:8.1f} ms  {size / 1024:9.1f} KB  total {data['total']}")
+            for q in ("Kubernetes", "高并发 FastAPI"):
+                ms, _, data = timed(client, "/jobs/search", {"q": q})
+                job_search._fts_enabled = False
+                like_ms, _, like = timed(client, "/jobs/search", {"q": q})
+                job_search._fts_enabled = True
+                print(f"  q={q!r:<20}  fts {ms:7.1f} ms   like scan {like_ms:7.1f} ms   total {data['total']} / {like['total']}")
+    finally:
+        os.chdir("/")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Login storm benchmark: bcrypt load next to an unrelated sync endpoint.
+
+Starts the backend (this script with --serve) under uvicorn in a subprocess,
+on a throwaway SQLite database with --users accounts hashed at --rounds.
+--storm clients log in back to back while --probes clients poll GET /jobs
+(a plain def handler, so it needs a threadpool thread like every sync route):
+
+  legacy  the login handler as it was: def, bcrypt on the shared threadpool
+          (mounted under /bench)
+  pooled  POST /auth/login: bcrypt on the dedicated PASSWORD_HASH_WORKERS
+          pool, 429 once PASSWORD_HASH_MAX_PENDING hashes are queued
+
+Login rate limits are lifted for the run, so only hashing is measured.
+
+    python benchmarks/bench_login_storm.py --storm 64 --probes 4 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, backend_dir)
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("LOGIN_IP_RATE", "1000000")
+os.environ.setdefault("LOGIN_IP_BURST", "1000000")
+os.environ.setdefault("LOGIN_ACCOUNT_RATE", "1000000")
+os.environ.setdefault("LOGIN_ACCOUNT_BURST", "1000000")
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+PASSWORD = "bench-password"
+
+
+def serve(port: int):
+    """The app plus the legacy login handler."""
+    import uvicorn
+    from fastapi import Depends, HTTPException
+    from sqlalchemy.orm import Session
+
+    import auth
+    import main as app_main
+    import models
+    from dependencies import get_db
+    from routers.auth import LoginRequest
+
+    app = app_main.app
+
+    @app.post("/bench/login")
+    def legacy_login(request: LoginRequest, db: Session = Depends(get_db)):
+        user = db.query(models.User).filter(models.User.email == request.email).first()
+        if not user or not auth.verify_password(request.password, user.hashed_password):
+            raise HTTPException(status_code=401)
+        return {"access_token": auth.create_access_token(data={"sub": user.email}), "token_type": "bearer"}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def seed(url: str, users: int, rounds: int):
+    from passlib.context import CryptContext
+
+    import models
+    from database import create_db_engine
+    from migrate import run_migrations
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_db_engine(url)
+    run_migrations(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        hashed = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(PASSWORD)
+        emails = [f"bench-{i}@example.com" for i in range(users)]
+        db.add_all(models.User(email=e, hashed_password=hashed, full_name="bench") for e in emails)
+        db.add(models.Job(title="Bench job", department="研发中心", location="上海", description="-", requirements="-", knowledge_base="-"))
+        db.commit()
+    finally:
+        db.close()
+        engine.dispose()
+    return emails
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_phase(base: str, emails, path: str, args):
+    logins, rejected, errors, probe_ms = [], 0, 0, []
+    stop = time.perf_counter() + args.seconds
+
+    async def attacker(client: httpx.AsyncClient, i: int):
+        nonlocal rejected, errors
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            response = await client.post(path, json={"email": emails[i % len(emails)], "password": PASSWORD})
+            if response.status_code == 429:
+                rejected += 1
+                await asyncio.sleep(float(response.headers.get("retry-after", "1")))
+                continue
+            if response.status_code != 200:
+                errors += 1
+                continue
+            logins.append((time.perf_counter() - started) * 1000)
+            i += 1
+
+    async def probe(client: httpx.AsyncClient):
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            (await client.get("/jobs")).raise_for_status()
+            probe_ms.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.05)
+
+    limits = httpx.Limits(max_connections=args.storm + args.probes)
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        await asyncio.gather(
+            *(attacker(client, i) for i in range(args.storm)),
+            *(probe(client) for _ in range(args.probes)),
+        )
+    return logins, rejected, errors, probe_ms
+
+
+def settle(base: str):
+    """Wait out logins still running server-side (sync handlers outlive their clients)."""
+    quick = 0
+    deadline = time.perf_counter() + 120
+    while quick < 5 and time.perf_counter() < deadline:
+        started = time.perf_counter()
+        httpx.get(f"{base}/jobs", timeout=120)
+        quick = quick + 1 if time.perf_counter() - started < 0.05 else 0
+        time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--storm", type=int, default=64)
+    parser.add_argument("--probes", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="bench_login_")
+    url = f"sqlite:///{workdir}/bench.db"
+    os.environ["DATABASE_URL"] = url
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    emails = seed(url, args.users, args.rounds)
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", str(port)],
+        cwd=workdir, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(300):
+            try:
+                httpx.get(f"{base}/jobs", timeout=1)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        print(f"{args.storm} login clients, {args.probes} GET /jobs probes, bcrypt rounds {args.rounds}")
+        for label, path in (("legacy", "/bench/login"), ("pooled", "/auth/login")):
+            settle(base)
+            logins, rejected, errors, probe_ms = asyncio.run(run_phase(base, emails, path, args))
+            login_p99 = np.percentile(logins, 99) if logins else 0
+            print(
+                f"  {label:<6} logins {len(logins) / args.seconds:5.1f}/s  p99 {login_p99:7.0f} ms  429s {rejected:4d}  errors {errors:3d}   "
+                f"/jobs p50 {np.percentile(probe_ms, 50):7.1f} ms  p99 {np.percentile(probe_ms, 99):7.1f} ms  "
+                f"max {max(probe_ms):7.1f} ms"
+            )
+    finally:
+        proc.terminate()
+        proc.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Event-loop lag benchmark: interview WebSockets next to database-backed API load.
+
+Starts the backend (this script with --serve) under uvicorn in a subprocess,
+on a throwaway SQLite database with candidates who each have a few hundred
+notifications. Interview sockets send PING every --ping-ms and time the PONG,
+while API clients poll the notification list:
+
+  idle    sockets only
+  sync    the handlers as they were: async get_current_user running a
+          blocking Session query on the event loop (mounted under /bench)
+  async   GET /notifications on the AsyncSession layer
+
+The server also samples its own loop lag (how late a 5 ms sleep wakes up).
+
+    python benchmarks/bench_loop_lag.py --sockets 20 --api-concurrency 8 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, backend_dir)
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+
+def serve(port: int):
+    """The app plus the legacy handlers and a loop-lag probe."""
+    import logging
+
+    import uvicorn
+    from fastapi import Depends, HTTPException
+    from sqlalchemy.orm import Session
+
+    import auth
+    import main as app_main
+    import models
+    from dependencies import get_db
+
+    app = app_main.app
+    lags = []
+
+    async def probe():
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append((time.perf_counter() - started - 0.005) * 1000)
+
+    @app.on_event("startup")
+    async def start_probe():
+        asyncio.get_running_loop().create_task(probe())
+
+    @app.get("/bench/lag")
+    async def lag():
+        samples = list(lags)
+        lags.clear()
+        if not samples:
+            return {}
+        return {"p50": np.percentile(samples, 50), "p99": np.percentile(samples, 99), "max": max(samples)}
+
+    async def legacy_current_user(token: str = Depends(auth.oauth2_scheme), db: Session = Depends(get_db)):
+        email = auth.jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM]).get("sub")
+        user = db.query(models.User).filter(models.User.email == email).first()
+        if user is None:
+            raise HTTPException(status_code=401)
+        return user
+
+    @app.get("/bench/notifications")
+    def legacy_notifications(current_user: models.User = Depends(legacy_current_user), db: Session = Depends(get_db)):
+        return db.query(models.Notification)\
+            .filter(models.Notification.user_id == current_user.id)\
+            .order_by(models.Notification.created_at.desc())\
+            .all()
+
+    logging.getLogger("server").setLevel(logging.WARNING)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def seed(url: str, users: int, notifications: int):
+    from datetime import datetime
+
+    import auth
+    import models
+    from database import create_db_engine
+    from migrate import run_migrations
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_db_engine(url)
+    run_migrations(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        emails = [f"bench-{i}@example.com" for i in range(users)]
+        for email in emails:
+            user = models.User(email=email, hashed_password="-", full_name="bench")
+            db.add(user)
+            db.flush()
+            db.add_all(
+                models.Notification(user_id=user.id, title="申请状态更新", message="您申请的职位状态已更新。" * 4, created_at=datetime.utcnow())
+                for _ in range(notifications)
+            )
+        db.commit()
+    finally:
+        db.close()
+        engine.dispose()
+    return [auth.create_access_token({"sub": e}) for e in emails]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_phase(base: str, tokens, path, args):
+    import websockets
+
+    rtts = []
+    api_done = 0
+    stop = time.perf_counter() + args.seconds
+
+    async def interview_socket(token: str):
+        url = base.replace("http://", "ws://") + f"/ws/interview?token={token}"
+        async with websockets.connect(url, max_size=None) as ws:
+            while time.perf_counter() < stop:
+                started = time.perf_counter()
+                await ws.send(json.dumps({"type": "PING"}))
+                while json.loads(await ws.recv()).get("type") != "PONG":
+                    pass
+                rtts.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(args.ping_ms / 1000)
+
+    async def api_client(client: httpx.AsyncClient, i: int):
+        nonlocal api_done
+        while time.perf_counter() < stop:
+            response = await client.get(path, headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+            response.raise_for_status()
+            api_done += 1
+            i += 1
+
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        await client.get("/bench/lag")  # reset
+        tasks = [interview_socket(tokens[i % len(tokens)]) for i in range(args.sockets)]
+        if path:
+            tasks += [api_client(client, i) for i in range(args.api_concurrency)]
+        await asyncio.gather(*tasks)
+        lag = (await client.get("/bench/lag")).json()
+    return rtts, api_done / args.seconds, lag
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sockets", type=int, default=20)
+    parser.add_argument("--api-concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--ping-ms", type=float, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--notifications", type=int, default=300)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="bench_lag_")
+    url = f"sqlite:///{workdir}/bench.db"
+    os.environ["DATABASE_URL"] = url
+    tokens = seed(url, args.users, args.notifications)
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", str(port)],
+        cwd=workdir, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(300):
+            try:
+                httpx.get(f"{base}/bench/lag", timeout=1)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        print(
+            f"{args.sockets} interview sockets (PING every {args.ping_ms:g} ms), "
+            f"{args.api_concurrency} API clients, {args.notifications} notifications per user"
+        )
+        for label, path in (("idle", None), ("sync", "/bench/notifications"), ("async", "/notifications")):
+            rtts, api_rps, lag = asyncio.run(run_phase(base, tokens, path, args))
+            print(
+                f"  {label:<6} ws rtt p50 {np.percentile(rtts, 50):6.1f} ms  p99 {np.percentile(rtts, 99):6.1f} ms  "
+                f"max {max(rtts):6.1f} ms   loop lag p99 {lag.get('p99', 0):6.1f} ms  max {lag.get('max', 0):6.1f} ms   "
+                f"api {api_rps:6.1f} req/s"
+            )
+    finally:
+        proc.terminate()
+        proc.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Micro-benchmark for ResumeParser text extraction.
+
+Generates a corpus of synthetic resumes and reports per-resume parse time
+for the default skill dictionary and for dictionaries padded with thousands
+of synthetic skills, next to the old one-regex-per-keyword approach.
+
+    python benchmarks/bench_resume_parser.py [--resumes 300]
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(backend_dir))
+
+from resume_parser import ResumeParser  # noqa: E402
+from skill_matcher import DEFAULT_SKILLS, SkillMatcher  # noqa: E402
+
+SCHOOLS = ["北京大学", "清华大学", "浙江大学", "Stanford University", "复旦大学", "上海交通大学"]
+DEGREES = ["本科", "硕士", "博士", "Bachelor of Science", "Master"]
+COMPANIES = ["字节跳动", "阿里巴巴", "腾讯", "美团", "Google", "Microsoft", "TechFuture"]
+TITLES = ["后端工程师", "前端开发", "算法工程师", "产品经理", "SRE"]
+FILLER = [
+    "负责核心业务系统的设计与开发，支撑日均千万级请求。",
+    "Led the migration of legacy services to a new platform with zero downtime.",
+    "参与需求评审与技术方案设计，推动团队代码规范落地。",
+    "Built internal tooling that cut release time by 40 percent.",
+    "熟悉常用数据结构与算法，具备良好的沟通能力和团队合作精神。",
+]
+
+
+def synthetic_resume(rng: random.Random, skill_names) -> str:
+    lines = [f"候选人{rng.randint(1, 9999)}", f"user{rng.randint(1, 9999)}@example.com 138{rng.randint(10000000, 99999999)}"]
+    lines.append("教育背景")
+    for _ in range(rng.randint(1, 3)):
+        lines.append(f"{rng.choice(SCHOOLS)} {rng.choice(DEGREES)} 20{rng.randint(10, 20)}.09 - 20{rng.randint(14, 24)}.06")
+    lines.append("工作经历")
+    for _ in range(rng.randint(2, 5)):
+        start = rng.randint(15, 22)
+        lines.append(f"20{start}.0{rng.randint(1, 9)} - 20{start + rng.randint(1, 3)}.0{rng.randint(1, 9)} {rng.choice(COMPANIES)}")
+        lines.append(rng.choice(TITLES))
+        for _ in range(rng.randint(3, 8)):
+            lines.append(rng.choice(FILLER))
+    lines.append("专业技能")
+    picked = rng.sample(skill_names, k=min(12, len(skill_names)))
+    lines.append("熟悉 " + "、".join(picked) + "。")
+    return "\n".join(lines)
+
+
+def legacy_extract_skills(text, keywords):
+    found = []
+    for kw in keywords:
+        pattern = r"\b" + re.escape(kw).replace("\\.", r"\.") + r"\b"
+        if re.search(pattern, text, re.IGNORECASE):
+            found.append(kw)
+    return found
+
+
+def padded_dictionary(extra: int):
+    skills = dict(DEFAULT_SKILLS)
+    for i in range(extra):
+        skills[f"SynthSkill{i:05d}"] = [f"synth-alias-{i:05d}"]
+    return skills
+
+
+def time_per_resume(fn, corpus):
+    samples = []
+    for text in corpus:
+        t0 = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [synthetic_resume(rng, list(DEFAULT_SKILLS)) for _ in range(args.resumes)]
+    print(f"{args.resumes} synthetic resumes, avg {sum(map(len, corpus)) // len(corpus)} chars\n")
+    print(f"{'variant':<34}{'skills':>8}{'mean ms':>10}{'p99 ms':>10}")
+
+    for extra in (0, 1000, 5000):
+        skills = padded_dictionary(extra)
+        keywords = list(skills)
+        if extra <= 1000:
+            mean, p99 = time_per_resume(lambda t: legacy_extract_skills(t, keywords), corpus[:50])
+            print(f"{'legacy per-keyword skills':<34}{len(keywords):>8}{mean:>10.3f}{p99:>10.3f}")
+
+        t0 = time.perf_counter()
+        matcher = SkillMatcher(skills)
+        build_ms = (time.perf_counter() - t0) * 1000
+        mean, p99 = time_per_resume(matcher.find, corpus)
+        print(f"{'trie matcher skills':<34}{len(keywords):>8}{mean:>10.3f}{p99:>10.3f}   (build {build_ms:.0f} ms)")
+
+        resume_parser = ResumeParser(skill_matcher=matcher)
+        mean, p99 = time_per_resume(resume_parser._extract_structured_data, corpus)
+        print(f"{'full structured extraction':<34}{len(keywords):>8}{mean:>10.3f}{p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Retrieval benchmark for the knowledge index.
+
+Indexes COMPANY_INFO plus N synthetic jobs, then reports:
+  - full build time and the cost of re-indexing one edited job
+  - search latency (BM25, and BM25 + dense vectors)
+  - prompt size: whole COMPANY_INFO / whole job knowledge vs top-k passages
+    (characters; for Chinese text roughly one token each)
+
+    python benchmarks/bench_retrieval.py --jobs 100 500 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(backend_dir))
+
+import numpy as np  # noqa: E402
+
+from company_knowledge import COMPANY_INFO, JOB_PERSONA, SYSTEM_PERSONA  # noqa: E402
+from retrieval import KnowledgeIndex, format_passages  # noqa: E402
+
+TITLES = ["Python 后端工程师", "React 前端工程师", "AI 算法工程师", "B端产品经理", "UI/UX 设计师", "内容运营", "市场经理", "数据分析师"]
+CITIES = ["上海", "北京", "深圳", "杭州", "新加坡"]
+TOPICS = [
+    "技术栈：Python、FastAPI、PostgreSQL、Redis，服务部署在 Kubernetes 上。",
+    "团队每周三下午有技术分享，鼓励大家在内部博客写总结。",
+    "面试考察重点：系统设计能力、并发编程、线上问题排查经验。",
+    "弹性工作制，核心工作时间为 10:00-16:00，不提倡无意义加班。",
+    "试用期三个月，转正后享受全额五险一金和补充商业保险。",
+    "晋升每半年评估一次，技术和管理双通道。",
+    "入职提供 MacBook Pro 和 4K 显示器，可申请人体工学椅。",
+    "团队目前 12 人，直属负责人有十年分布式系统经验。",
+    "出差较少，每季度一次团建活动。",
+    "年终奖一般为 2-4 个月薪资，视绩效而定。",
+]
+QUESTIONS = ["薪资范围是多少？", "需要加班吗", "用什么技术栈", "晋升机制是怎样的", "试用期多久", "团队有多少人", "福利怎么样", "面试考察什么"]
+
+
+class FakeJob:
+    def __init__(self, job_id: int, rng: random.Random):
+        self.id = job_id
+        self.title = rng.choice(TITLES)
+        self.department = "研发中心"
+        self.location = rng.choice(CITIES)
+        self.type = "全职"
+        self.salary_range = f"{rng.randint(15, 40)}k-{rng.randint(41, 80)}k"
+        self.requirements = "\n".join(rng.sample(TOPICS, 3))
+        self.knowledge_base = "\n\n".join(rng.sample(TOPICS, 5))
+        self.public_knowledge = "\n".join(rng.sample(TOPICS, 3))
+        self.is_active = 1
+
+
+def percentiles(values):
+    return np.percentile(values, 50), np.percentile(values, 99)
+
+
+def run(n_jobs: int, dense: bool, rng: random.Random):
+    index = KnowledgeIndex(dense=dense)
+    jobs = [FakeJob(i, rng) for i in range(1, n_jobs + 1)]
+    started = time.perf_counter()
+    index.index_company(COMPANY_INFO)
+    index.index_jobs(jobs)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    edit_ms = []
+    for _ in range(20):
+        job = rng.choice(jobs)
+        job.public_knowledge = "\n".join(rng.sample(TOPICS, 3))
+        started = time.perf_counter()
+        index.index_job(job)
+        edit_ms.append((time.perf_counter() - started) * 1000)
+
+    search_ms, company_chars, job_chars = [], [], []
+    for _ in range(300):
+        question = rng.choice(QUESTIONS)
+        job = rng.choice(jobs)
+        started = time.perf_counter()
+        passages = index.search(question, job_id=job.id)
+        search_ms.append((time.perf_counter() - started) * 1000)
+        job_chars.append(len(JOB_PERSONA.format(title=job.title, passages=format_passages(passages))))
+        company_chars.append(len(SYSTEM_PERSONA.format(company_info=format_passages(index.search(question)))))
+    return len(index.passages), build_ms, np.median(edit_ms), percentiles(search_ms), np.mean(company_chars), np.mean(job_chars)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, nargs="+", default=[100, 500, 1000])
+    args = parser.parse_args()
+
+    full_company = len(SYSTEM_PERSONA.format(company_info=COMPANY_INFO))
+    rng = random.Random(0)
+    sample = FakeJob(0, rng)
+    full_job = len(JOB_PERSONA.format(
+        title=sample.title,
+        passages="\n".join([sample.requirements, sample.knowledge_base, sample.public_knowledge]),
+    ))
+    print(f"prompt chars, whole knowledge: company chat {full_company}, job chat {full_job}")
+    for n_jobs in args.jobs:
+        for dense in (False, True):
+            passages, build_ms, edit_ms, (p50, p99), company_chars, job_chars = run(n_jobs, dense, random.Random(n_jobs))
+            print(
+                f"  {n_jobs:5d} jobs {'bm25+dense' if dense else 'bm25':<10} {passages:6d} passages  "
+                f"build {build_ms:7.0f} ms  edit one job {edit_ms:5.2f} ms  "
+                f"search p50 {p50:5.2f} ms p99 {p99:5.2f} ms  "
+                f"prompt chars company {company_chars:5.0f} job {job_chars:5.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Turn latency benchmark for the interview controller.
+
+Streams a synthetic spoken answer (tone bursts separated by short pauses)
+into InterviewController at real-time pace and reports the time from the
+end of speech to the first AI audio byte sent on the socket.
+
+"batch" is the old path: bytes are buffered and the whole answer goes to
+STT once the client says it finished (sent the moment speech ends, i.e. an
+ideal client). "vad" streams PCM16, segments it server-side, transcribes
+segments while the candidate is still talking and detects the end of the
+turn from silence (so it includes the VAD_END_OF_TURN_MS wait).
+
+The mock STT costs base + per-second-of-audio, like hosted Whisper. Time is
+compressed by --speed; reported numbers are scaled back to real time.
+
+    python benchmarks/bench_turn_latency.py --answers 5 20 60 --speed 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(backend_dir))
+
+import numpy as np  # noqa: E402
+
+from controller import InterviewController  # noqa: E402
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 100
+
+
+class MockSTT:
+    def __init__(self, base: float, per_second: float, speed: float):
+        self.base = base
+        self.per_second = per_second
+        self.speed = speed
+
+    async def transcribe(self, audio: bytes) -> str:
+        seconds = max(0, len(audio) - 44) / 2 / SAMPLE_RATE
+        await asyncio.sleep((self.base + self.per_second * seconds) / self.speed)
+        return "answer"
+
+
+class MockCoze:
+    async def chat_stream(self, session_id, message, context=None):
+        yield '{"reply": "ok", "action": "NEXT_QUESTION"}'
+
+
+class MockTTS:
+    async def synthesize(self, text: str) -> bytes:
+        return b"\x00" * 1024
+
+    async def stream(self, text: str):
+        yield b"\x00" * 1024
+
+
+class FakeSocket:
+    def __init__(self):
+        self.first_audio_at = None
+
+    async def send_json(self, data):
+        pass
+
+    async def send_bytes(self, data):
+        if self.first_audio_at is None:
+            self.first_audio_at = asyncio.get_running_loop().time()
+
+
+def synthetic_answer(seconds: float) -> bytes:
+    """Speech-like PCM: ~2 s phrases at speech level, 400 ms pauses, light noise."""
+    rng = np.random.default_rng(0)
+    total = int(seconds * SAMPLE_RATE)
+    t = np.arange(total) / SAMPLE_RATE
+    signal = 8000 * np.sin(2 * np.pi * 220 * t)
+    # Counted from the end so the answer finishes mid-phrase, not in a pause
+    phrase = ((seconds - t) % 2.4) < 2.0
+    signal = np.where(phrase, signal, 0) + rng.normal(0, 50, total)
+    return signal.astype("<i2").tobytes()
+
+
+def silence(seconds: float) -> bytes:
+    rng = np.random.default_rng(1)
+    return rng.normal(0, 50, int(seconds * SAMPLE_RATE)).astype("<i2").tobytes()
+
+
+async def run_turn(mode: str, answer_s: float, speed: float, stt: MockSTT) -> float:
+    controller = InterviewController()
+    controller.stt, controller.coze, controller.tts = stt, MockCoze(), MockTTS()
+    session_id = f"{mode}-{answer_s}"
+    ws = FakeSocket()
+    await controller.connect(session_id, ws)
+    if mode == "vad":
+        await controller.handle_event(session_id, {"type": "AUDIO_FORMAT", "format": "pcm16", "sample_rate": SAMPLE_RATE})
+    controller.states[session_id] = "LISTENING"
+
+    chunk_bytes = SAMPLE_RATE * CHUNK_MS // 1000 * 2
+    audio = synthetic_answer(answer_s)
+    # The client keeps streaming (silence) after the candidate stops
+    trailing = silence(3.0) if mode == "vad" else b""
+    loop = asyncio.get_running_loop()
+    speech_ended_at = None
+    for offset in range(0, len(audio) + len(trailing), chunk_bytes):
+        if offset < len(audio):
+            chunk = audio[offset:offset + chunk_bytes]
+        else:
+            chunk = trailing[offset - len(audio):offset - len(audio) + chunk_bytes]
+        await controller.handle_audio_stream(session_id, chunk)
+        if speech_ended_at is None and offset + chunk_bytes >= len(audio):
+            # A chunk is sent as soon as it's recorded, so speech ends here
+            speech_ended_at = loop.time()
+            if mode == "batch":
+                await controller.handle_event(session_id, {"type": "USER_FINISHED_SPEAKING"})
+        await asyncio.sleep(CHUNK_MS / 1000 / speed)
+    while ws.first_audio_at is None:
+        await asyncio.sleep(0.005)
+    controller.disconnect(session_id)
+    controller.observer.shutdown()
+    return (ws.first_audio_at - speech_ended_at) * 1000 * speed
+
+
+async def main_async(args):
+    stt = MockSTT(args.stt_base, args.stt_per_second, args.speed)
+    print(f"mock STT: {args.stt_base:.2f}s + {args.stt_per_second:.2f}s per audio second; speed x{args.speed:g}")
+    for answer_s in args.answers:
+        results = {}
+        for mode in ("batch", "vad"):
+            results[mode] = await run_turn(mode, answer_s, args.speed, stt)
+        print(
+            f"  answer {answer_s:>5.0f}s: batch {results['batch']:7.0f} ms   "
+            f"vad {results['vad']:7.0f} ms (incl. end-of-turn detection)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=float, nargs="+", default=[5, 20, 60])
+    parser.add_argument("--speed", type=float, default=10)
+    parser.add_argument("--stt-base", type=float, default=0.3)
+    parser.add_argument("--stt-per-second", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
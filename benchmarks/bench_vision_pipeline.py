@@ -0,0 +1,114 @@
+"""
+Load benchmark for the interview vision pipeline.
+
+Simulates N interview sessions each pushing base64 JPEG frames (as the
+browser does) and measures analysed frames/sec, frames/sec per worker core
+and event-loop lag. "inline" reproduces the old behaviour of running decode
+and FaceMesh on the event loop; "pool" uses VisionPipeline.
+
+    python benchmarks/bench_vision_pipeline.py --sessions 20 --fps 5 --workers 2
+"""
+import argparse
+import asyncio
+import base64
+import os
+import statistics
+import sys
+import time
+
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(backend_dir))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+import vision_pipeline  # noqa: E402
+from vision_pipeline import VisionPipeline, analyze_frames  # noqa: E402
+
+
+def synthetic_frame(width: int = 640, height: int = 480) -> str:
+    image = np.zeros((height, width, 3), np.uint8)
+    image[:, :, 0] = np.linspace(0, 255, width, dtype=np.uint8)
+    image[:, :, 1] = np.linspace(0, 255, height, dtype=np.uint8)[:, None]
+    cv2.ellipse(image, (width // 2, height // 2), (90, 120), 0, 0, 360, (180, 200, 230), -1)
+    ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 50])
+    return "data:image/jpeg;base64," + base64.b64encode(jpeg.tobytes()).decode()
+
+
+async def monitor_lag(samples, stop: asyncio.Event, interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        samples.append((loop.time() - t0 - interval) * 1000)
+
+
+async def session(frame: str, fps: float, duration: float, submit):
+    period = 1.0 / fps
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        submit(frame)
+        await asyncio.sleep(period)
+
+
+async def run(mode: str, sessions: int, fps: float, duration: float, workers: int):
+    frame = synthetic_frame()
+    done = {"n": 0}
+    lag = []
+    stop = asyncio.Event()
+
+    if mode == "inline":
+        vision_pipeline._worker_init()
+
+        def make_submit(_sid):
+            def submit(f):
+                analyze_frames([f])
+                done["n"] += 1
+            return submit
+        pipeline = None
+    else:
+        pipeline = VisionPipeline(on_result=lambda s, r: done.__setitem__("n", done["n"] + 1), workers=workers)
+        # Warm the pool so process start-up is not measured
+        pipeline.submit("warmup", frame)
+        while done["n"] == 0:
+            await asyncio.sleep(0.05)
+        pipeline.release("warmup")
+        done["n"] = 0
+
+        def make_submit(sid):
+            return lambda f: pipeline.submit(sid, f)
+
+    monitor = asyncio.create_task(monitor_lag(lag, stop))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(session(frame, fps, duration, make_submit(f"s{i}")) for i in range(sessions)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await monitor
+
+    offered = sessions * fps * duration
+    rate = done["n"] / elapsed
+    cores = 1 if mode == "inline" else workers
+    lag.sort()
+    print(f"mode={mode} sessions={sessions} fps/session={fps} workers={cores}")
+    print(f"  offered {offered:.0f} frames, analysed {done['n']} ({rate:.1f} frames/s, {rate / cores:.1f} per core)")
+    if pipeline:
+        print(f"  dropped (drop-oldest) {pipeline.frames_dropped}")
+        pipeline.shutdown()
+    print(f"  event-loop lag ms: p50 {statistics.median(lag):.1f}  p99 {lag[int(len(lag) * 0.99) - 1]:.1f}  max {lag[-1]:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--fps", type=float, default=5)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--mode", choices=["inline", "pool", "both"], default="both")
+    args = parser.parse_args()
+    modes = ["inline", "pool"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        asyncio.run(run(mode, args.sessions, args.fps, args.duration, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Query-plan check: the hot queries in the routers must use indexes.
+
+Builds a throwaway SQLite database with `migrate.py`, seeds it, calls the
+hot routes through the app and captures every SELECT they send. Each one
+is then run through EXPLAIN QUERY PLAN; a full scan of a large table, or
+sorting its rows in a temp B-tree, fails the check (exit status 1).
+Relevance-ranked job search sorts its (small) match set and is exempt.
+
+    python benchmarks/check_query_plans.py          # failures only
+    python benchmarks/check_query_plans.py -v       # every plan
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+sys.path.insert(0, backend_dir)
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+# Tables that grow with usage; jobs is small and served from the response cache
+LARGE_TABLES = {"users", "applications", "notifications", "interviews", "parsed_resumes"}
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?! USING (COVERING )?INDEX)")
+TABLE = re.compile(r"^(?:SCAN|SEARCH) (\w+)")
+
+
+def plan_problems(plan):
+    tables = {m.group(1) for m in map(TABLE.match, plan) if m}
+    problems = [line for line in plan if FULL_SCAN.match(line) and FULL_SCAN.match(line).group(1) in LARGE_TABLES]
+    if tables & LARGE_TABLES:
+        problems += [line for line in plan if "USE TEMP B-TREE FOR ORDER BY" in line]
+    return problems
+
+
+def seed(db, models, n: int):
+    admin = models.User(email="admin@example.com", hashed_password="-", full_name="Admin", role="admin")
+    candidate = models.User(email="candidate@example.com", hashed_password="-", full_name="Candidate")
+    db.add_all([admin, candidate])
+    jobs = [models.Job(title=f"Job {i}", department="研发中心", location="上海", description="FastAPI 后端", requirements="-", knowledge_base="-") for i in range(5)]
+    db.add_all(jobs)
+    db.flush()
+    started = datetime(2026, 1, 1)
+    for i in range(n):
+        app = models.Application(
+            user_id=candidate.id if i % 10 == 0 else admin.id, job_id=jobs[i % 5].id,
+            status=("pending", "rejected", "offered")[i % 3], created_at=started + timedelta(minutes=i),
+        )
+        db.add(app)
+        db.add(models.Notification(user_id=candidate.id if i % 10 == 0 else admin.id, title="-", message="-", created_at=started + timedelta(minutes=i)))
+        if i % 4 == 0:
+            db.flush()
+            db.add(models.InterviewRecord(application_id=app.id, start_time=started))
+    db.commit()
+    return admin.id, candidate.id, jobs[0].id
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="query_plans_")
+    os.chdir(workdir)  # the app's upload dir lands here
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/plans.db"
+    try:
+        from fastapi.testclient import TestClient
+        from sqlalchemy import event
+
+        import auth
+        import database
+        import models
+        from migrate import run_migrations
+
+        run_migrations(database.engine)
+        db = database.SessionLocal()
+        admin_id, candidate_id, job_id = seed(db, models, args.rows)
+        db.close()
+
+        import main as app_main
+
+        captured = []
+        label = ["startup"]
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured.append((label[0], statement, parameters))
+
+        for engine in (database.engine, database.async_engine.sync_engine):
+            event.listen(engine, "before_cursor_execute", capture)
+
+        def bearer(user_id, email):
+            return {"Authorization": f"Bearer {auth.create_access_token({'sub': email, 'uid': user_id})}"}
+
+        admin = bearer(admin_id, "admin@example.com")
+        candidate = bearer(candidate_id, "candidate@example.com")
+        calls = [
+            ("GET /users/me", "/users/me", candidate),
+            ("GET /notifications", "/notifications", candidate),
+            ("GET /applications/me", "/applications/me", candidate),
+            ("GET /admin/applications", "/admin/applications", admin),
+            ("GET /admin/applications?status", "/admin/applications?status=pending", admin),
+            ("GET /admin/applications?job_id", f"/admin/applications?job_id={job_id}", admin),
+            ("GET /admin/applications?dates", "/admin/applications?created_from=2026-01-01&created_to=2026-01-01", admin),
+            ("GET /admin/applications?sort", "/admin/applications?sort=created_at&status=offered", admin),
+            ("GET /admin/applications/{id}", "/admin/applications/1", admin),
+            ("GET /jobs/search", "/jobs/search?q=FastAPI&location=上海", None),
+        ]
+        with TestClient(app_main.app) as client:
+            for name, url, headers in calls:
+                label[0] = name
+                response = client.get(url, headers=headers or {})
+                if response.status_code != 200:
+                    print(f"{name}: HTTP {response.status_code}")
+                    return 1
+            label[0] = "POST /notifications/{id}/read"
+            client.post("/notifications/1/read", headers=candidate)
+            label[0] = "screening questions"
+            client.post("/admin/applications/1/tts-warmup", headers=admin)
+
+        failures = 0
+        raw = database.engine.raw_connection()
+        try:
+            for name, statement, parameters in captured:
+                plan = [row[3] for row in raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+                problems = plan_problems(plan)
+                failures += bool(problems)
+                if problems or args.verbose:
+                    print(f"{'FAIL' if problems else 'ok  '} {name}: {' '.join(statement.split())[:160]}")
+                    for line in plan:
+                        print(f"       {line}")
+        finally:
+            raw.close()
+        print(f"{len(captured)} queries checked, {failures} without a usable index")
+        return 1 if failures else 0
+    finally:
+        os.chdir("/")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
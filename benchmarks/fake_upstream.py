@@ -0,0 +1,162 @@
+"""
+Fake upstream for the AI integrations, so the services can be load-tested
+offline.
+
+Mimics the endpoints the backend calls:
+
+    POST /v1/chat/completions, /chat/completions   DeepSeek / OpenAI style chat
+    POST /v1/messages                              Claude messages
+    POST /v3/chat                                  Coze streaming chat (SSE)
+    POST /audio/transcriptions                     Whisper-style STT
+    POST /audio/speech                             OpenAI-style TTS (chunked mp3)
+
+Every call waits --latency seconds (plus jitter) and fails with 503 at
+--error-rate. POST /_control {"latency": .., "error_rate": ..} changes both at
+runtime; GET /_stats returns request and connection counts.
+
+Run it and point the backend at it:
+
+    python benchmarks/fake_upstream.py --port 9100
+    DEEPSEEK_API_KEY=x DEEPSEEK_BASE_URL=http://127.0.0.1:9100 \\
+    COZE_API_TOKEN=x COZE_BOT_ID=x COZE_BASE_URL=http://127.0.0.1:9100 \\
+    STT_API_KEY=x STT_BASE_URL=http://127.0.0.1:9100 \\
+    TTS_API_KEY=x TTS_BASE_URL=http://127.0.0.1:9100 uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = '{"reply": "好的，谢谢你的回答。接下来请介绍一个你最有挑战的项目。", "action": "NEXT_QUESTION"}'
+
+
+class Upstream:
+    def __init__(self, latency: float = 0.05, jitter: float = 0.2, error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.connections = set()
+
+    async def delay(self, scale: float = 1.0):
+        await asyncio.sleep(self.latency * scale * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def fail(self):
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return JSONResponse({"error": "overloaded"}, status_code=503)
+        return None
+
+
+def create_app(upstream: Upstream) -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def count(request: Request, call_next):
+        if not request.url.path.startswith("/_"):
+            upstream.requests += 1
+            # A new client port means a new TCP (and, for real APIs, TLS) connection
+            upstream.connections.add(request.client.port if request.client else None)
+        return await call_next(request)
+
+    @app.post("/_control")
+    async def control(body: dict):
+        upstream.latency = float(body.get("latency", upstream.latency))
+        upstream.error_rate = float(body.get("error_rate", upstream.error_rate))
+        return {"latency": upstream.latency, "error_rate": upstream.error_rate}
+
+    @app.get("/_stats")
+    async def stats():
+        return {"requests": upstream.requests, "errors": upstream.errors, "connections": len(upstream.connections)}
+
+    @app.post("/_reset")
+    async def reset():
+        upstream.requests = upstream.errors = 0
+        upstream.connections.clear()
+        return {"ok": True}
+
+    @app.post("/v1/chat/completions")
+    @app.post("/chat/completions")
+    async def chat_completions(body: dict):
+        await upstream.delay()
+        error = upstream.fail()
+        if error:
+            return error
+        return {
+            "id": "fake",
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+        }
+
+    @app.post("/v1/messages")
+    async def messages(body: dict):
+        await upstream.delay()
+        error = upstream.fail()
+        if error:
+            return error
+        return {"id": "fake", "type": "message", "content": [{"type": "text", "text": REPLY}]}
+
+    @app.post("/v3/chat")
+    async def coze_chat(body: dict):
+        # Time to first token, then the reply a few characters at a time
+        await upstream.delay()
+        error = upstream.fail()
+        if error:
+            return error
+
+        async def events():
+            yield "event: conversation.chat.created\ndata: {}\n\n"
+            for i in range(0, len(REPLY), 4):
+                await asyncio.sleep(0.005)
+                data = json.dumps({"type": "answer", "content": REPLY[i:i + 4]}, ensure_ascii=False)
+                yield f"event: conversation.message.delta\ndata: {data}\n\n"
+            yield "event: conversation.chat.completed\ndata: {}\n\n"
+            yield "event: done\ndata: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/audio/transcriptions")
+    async def transcriptions(request: Request):
+        await request.body()
+        await upstream.delay()
+        error = upstream.fail()
+        if error:
+            return error
+        return {"text": "这是一个模拟的转写结果。"}
+
+    @app.post("/audio/speech")
+    async def speech(body: dict):
+        await upstream.delay(0.5)
+        error = upstream.fail()
+        if error:
+            return error
+        size = 2 * len(body.get("input", "")) * 400
+
+        async def audio():
+            for _ in range(0, size, 4096):
+                await asyncio.sleep(0.002)
+                yield b"\xff\xf3" + b"\x00" * 4094
+
+        return StreamingResponse(audio(), media_type="audio/mpeg")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 503")
+    args = parser.parse_args()
+    upstream = Upstream(latency=args.latency, error_rate=args.error_rate)
+    uvicorn.run(create_app(upstream), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
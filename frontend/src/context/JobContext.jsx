@@ -29,13 +29,12 @@ export const JobProvider = ({ children }) => {
         if (res.ok) {
           const data = await res.json();
           // Transform backend data to frontend format if needed
-          // Backend: salary_range, type
+          // Backend: salary_range, type (list fields only; details via /jobs/{id})
           // Frontend (legacy): salary, tags (can derive from type/dept)
           const formattedJobs = data.map(j => ({
             ...j,
             salary: j.salary_range,
-            tags: [j.department, j.type, j.location].filter(Boolean),
-            requirements: j.requirements ? j.requirements.split('\n') : [] // Assuming stored as text
+            tags: [j.department, j.type, j.location].filter(Boolean)
           }));
           setJobs(formattedJobs);
         }
@@ -9,7 +9,10 @@ import { AnimatePresence, motion } from 'framer-motion';
 export function AdminCandidates() {
   const [activeTab, setActiveTab] = useState('全部');
   const [candidates, setCandidates] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [details, setDetails] = useState({}); // full application by id, loaded on expand
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [updating, setUpdating] = useState(null); // id being updated
   const [expandedId, setExpandedId] = useState(null); // For detail view
   const { token } = useAuth();
@@ -17,25 +20,84 @@ export function AdminCandidates() {
 
   const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
-  const fetchCandidates = async () => {
+  const statusMap = {
+    'pending': { label: '待筛选', color: 'bg-yellow-100 text-yellow-700' },
+    'interview_ready': { label: '待面试', color: 'bg-green-100 text-green-700' },
+    'interviewing': { label: '面试中', color: 'bg-blue-100 text-blue-700' },
+    'review': { label: '待复核', color: 'bg-purple-100 text-purple-700' },
+    'rejected': { label: '已淘汰', color: 'bg-red-100 text-red-700' },
+    'offered': { label: '已录用', color: 'bg-green-100 text-green-700' },
+  };
+
+  // One page at a time, filtered by the active tab on the server
+  const fetchCandidates = async (cursor = null) => {
+    const params = new URLSearchParams();
+    const status = Object.keys(statusMap).find(key => statusMap[key].label === activeTab);
+    if (status) params.set('status', status);
+    if (cursor) params.set('cursor', cursor);
     try {
-      const res = await fetch(`${API_URL}/admin/applications`, {
+      const res = await fetch(`${API_URL}/admin/applications?${params}`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       if (res.ok) {
         const data = await res.json();
-        setCandidates(data);
+        setCandidates(prev => cursor ? [...prev, ...data.items] : data.items);
+        setNextCursor(data.next_cursor);
       }
     } catch (error) {
       console.error("Failed to fetch candidates:", error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
+    }
+  };
+
+  const fetchDetail = async (appId) => {
+    try {
+      const res = await fetch(`${API_URL}/admin/applications/${appId}`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      if (res.ok) {
+        const data = await res.json();
+        setDetails(prev => ({ ...prev, [appId]: data }));
+      }
+    } catch (error) {
+      console.error("Failed to fetch application:", error);
     }
   };
 
   useEffect(() => {
+    setLoading(true);
     fetchCandidates();
-  }, [token]);
+  }, [token, activeTab]);
+
+  const toggleExpanded = (appId) => {
+    if (expandedId === appId) {
+      setExpandedId(null);
+      return;
+    }
+    setExpandedId(appId);
+    if (!details[appId]) fetchDetail(appId);
+  };
+
+  const loadMore = () => {
+    setLoadingMore(true);
+    fetchCandidates(nextCursor);
+  };
+
+  const downloadResume = async (appId) => {
+    try {
+      const res = await fetch(`${API_URL}/admin/applications/${appId}/resume-url`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      if (!res.ok) throw new Error('未找到简历文件');
+      const { url } = await res.json();
+      // Presigned links from the local backend are relative to the API
+      window.open(url.startsWith('http') ? url : `${API_URL}${url}`, '_blank');
+    } catch (error) {
+      addToast(error.message, 'error');
+    }
+  };
 
   const updateStatus = async (appId, newStatus) => {
     setUpdating(appId);
@@ -54,6 +116,7 @@ export function AdminCandidates() {
       addToast('状态更新成功', 'success');
       // Refresh list
       fetchCandidates();
+      fetchDetail(appId);
     } catch (error) {
       addToast(error.message, 'error');
     } finally {
@@ -61,19 +124,6 @@ export function AdminCandidates() {
     }
   };
 
-  const statusMap = {
-    'pending': { label: '待筛选', color: 'bg-yellow-100 text-yellow-700' },
-    'interview_ready': { label: '待面试', color: 'bg-green-100 text-green-700' },
-    'interviewing': { label: '面试中', color: 'bg-blue-100 text-blue-700' },
-    'review': { label: '待复核', color: 'bg-purple-100 text-purple-700' },
-    'rejected': { label: '已淘汰', color: 'bg-red-100 text-red-700' },
-    'offered': { label: '已录用', color: 'bg-green-100 text-green-700' },
-  };
-
-  const filteredCandidates = activeTab === '全部' 
-    ? candidates 
-    : candidates.filter(c => (statusMap[c.status]?.label || c.status) === activeTab);
-
   return (
     <div className="space-y-6 animate-fade-in">
       <div className="flex justify-between items-center">
@@ -111,154 +161,172 @@ export function AdminCandidates() {
       </div>
 
       <div className="space-y-4">
-        {filteredCandidates.map((c) => (
-          <motion.div 
-            layout
-            key={c.id} 
-            className="bg-white rounded-xl border border-slate-100 shadow-sm overflow-hidden"
-          >
-            <div 
-              className="p-6 flex items-center justify-between cursor-pointer hover:bg-slate-50 transition-colors"
-              onClick={() => setExpandedId(expandedId === c.id ? null : c.id)}
+        {candidates.map((c) => {
+          const detail = details[c.id];
+          return (
+            <motion.div 
+              layout
+              key={c.id} 
+              className="bg-white rounded-xl border border-slate-100 shadow-sm overflow-hidden"
             >
-              <div className="flex items-center gap-4">
-                <div className="w-12 h-12 rounded-full bg-primary-100 text-primary-700 flex items-center justify-center font-bold text-lg">
-                  {c.name[0]}
-                </div>
-                <div>
-                  <h3 className="font-bold text-slate-900">{c.name}</h3>
-                  <p className="text-sm text-slate-500">{c.job}</p>
+              <div 
+                className="p-6 flex items-center justify-between cursor-pointer hover:bg-slate-50 transition-colors"
+                onClick={() => toggleExpanded(c.id)}
+              >
+                <div className="flex items-center gap-4">
+                  <div className="w-12 h-12 rounded-full bg-primary-100 text-primary-700 flex items-center justify-center font-bold text-lg">
+                    {c.name[0]}
+                  </div>
+                  <div>
+                    <h3 className="font-bold text-slate-900">{c.name}</h3>
+                    <p className="text-sm text-slate-500">{c.job}</p>
+                  </div>
                 </div>
-              </div>
 
-              <div className="flex items-center gap-6">
-                {/* AI Tags Preview */}
-                {c.structured_resume && (
-                  <div className="hidden md:flex gap-2">
-                    {c.structured_resume.skills?.slice(0, 3).map((skill, i) => (
-                      <span key={i} className="px-2 py-1 bg-slate-100 text-slate-600 text-xs rounded-md">
-                        {skill}
-                      </span>
-                    ))}
-                    {c.structured_resume.education?.[0] && (
-                      <span className="px-2 py-1 bg-indigo-50 text-indigo-600 text-xs rounded-md flex items-center gap-1">
-                        <Brain className="w-3 h-3" />
-                        {c.structured_resume.education[0].school}
-                      </span>
-                    )}
-                  </div>
-                )}
+                <div className="flex items-center gap-6">
+                  {/* AI Tags Preview */}
+                  {(c.skills.length > 0 || c.school) && (
+                    <div className="hidden md:flex gap-2">
+                      {c.skills.map((skill, i) => (
+                        <span key={i} className="px-2 py-1 bg-slate-100 text-slate-600 text-xs rounded-md">
+                          {skill}
+                        </span>
+                      ))}
+                      {c.school && (
+                        <span className="px-2 py-1 bg-indigo-50 text-indigo-600 text-xs rounded-md flex items-center gap-1">
+                          <Brain className="w-3 h-3" />
+                          {c.school}
+                        </span>
+                      )}
+                    </div>
+                  )}
 
-                <div className="flex items-center gap-4">
-                  <span className={`px-3 py-1 rounded-full text-xs font-medium ${statusMap[c.status]?.color || 'bg-gray-100'}`}>
-                    {statusMap[c.status]?.label || c.status}
-                  </span>
-                  <span className="text-sm text-slate-400">{c.appliedAt}</span>
+                  <div className="flex items-center gap-4">
+                    <span className={`px-3 py-1 rounded-full text-xs font-medium ${statusMap[c.status]?.color || 'bg-gray-100'}`}>
+                      {statusMap[c.status]?.label || c.status}
+                    </span>
+                    <span className="text-sm text-slate-400">{c.appliedAt}</span>
+                  </div>
                 </div>
               </div>
-            </div>
 
-            {/* Expanded Details */}
-            <AnimatePresence>
-              {expandedId === c.id && (
-                <motion.div
-                  initial={{ height: 0, opacity: 0 }}
-                  animate={{ height: 'auto', opacity: 1 }}
-                  exit={{ height: 0, opacity: 0 }}
-                  className="border-t border-slate-100 bg-slate-50/50"
-                >
-                  <div className="p-6 grid grid-cols-1 md:grid-cols-3 gap-6">
-                    {/* Left: Resume Info */}
-                    <div className="md:col-span-2 space-y-4">
-                      <h4 className="font-bold text-slate-900 flex items-center gap-2">
-                        <FileText className="w-4 h-4" /> 简历详情
-                      </h4>
-                      
-                      {c.structured_resume ? (
-                        <div className="bg-white p-4 rounded-lg border border-slate-200 space-y-4">
-                          <div>
-                            <span className="text-xs font-bold text-slate-400 uppercase tracking-wider">技能栈</span>
-                            <div className="flex flex-wrap gap-2 mt-2">
-                              {c.structured_resume.skills?.map((s, i) => (
-                                <span key={i} className="px-2 py-1 bg-blue-50 text-blue-700 text-xs rounded border border-blue-100">
-                                  {s}
-                                </span>
-                              ))}
-                            </div>
+              {/* Expanded Details */}
+              <AnimatePresence>
+                {expandedId === c.id && (
+                  <motion.div
+                    initial={{ height: 0, opacity: 0 }}
+                    animate={{ height: 'auto', opacity: 1 }}
+                    exit={{ height: 0, opacity: 0 }}
+                    className="border-t border-slate-100 bg-slate-50/50"
+                  >
+                    <div className="p-6 grid grid-cols-1 md:grid-cols-3 gap-6">
+                      {/* Left: Resume Info */}
+                      <div className="md:col-span-2 space-y-4">
+                        <h4 className="font-bold text-slate-900 flex items-center gap-2">
+                          <FileText className="w-4 h-4" /> 简历详情
+                        </h4>
+                        
+                        {!detail ? (
+                          <div className="flex items-center gap-2 text-sm text-slate-500">
+                            <Loader className="w-4 h-4 animate-spin" /> 加载中...
                           </div>
-                          
-                          <div>
-                            <span className="text-xs font-bold text-slate-400 uppercase tracking-wider">教育经历</span>
-                            <ul className="mt-2 space-y-2">
-                              {c.structured_resume.education?.map((edu, i) => (
-                                <li key={i} className="text-sm text-slate-700 flex justify-between">
-                                  <span className="font-medium">{edu.school}</span>
-                                  <span className="text-slate-500">{edu.degree}</span>
-                                </li>
-                              ))}
-                            </ul>
+                        ) : detail.structured_resume ? (
+                          <div className="bg-white p-4 rounded-lg border border-slate-200 space-y-4">
+                            <div>
+                              <span className="text-xs font-bold text-slate-400 uppercase tracking-wider">技能栈</span>
+                              <div className="flex flex-wrap gap-2 mt-2">
+                                {detail.structured_resume.skills?.map((s, i) => (
+                                  <span key={i} className="px-2 py-1 bg-blue-50 text-blue-700 text-xs rounded border border-blue-100">
+                                    {s}
+                                  </span>
+                                ))}
+                              </div>
+                            </div>
+                            
+                            <div>
+                              <span className="text-xs font-bold text-slate-400 uppercase tracking-wider">教育经历</span>
+                              <ul className="mt-2 space-y-2">
+                                {detail.structured_resume.education?.map((edu, i) => (
+                                  <li key={i} className="text-sm text-slate-700 flex justify-between">
+                                    <span className="font-medium">{edu.school}</span>
+                                    <span className="text-slate-500">{edu.degree}</span>
+                                  </li>
+                                ))}
+                              </ul>
+                            </div>
                           </div>
-                        </div>
-                      ) : (
-                        <div className="text-sm text-slate-500 italic">未提供结构化简历数据</div>
-                      )}
+                        ) : (
+                          <div className="text-sm text-slate-500 italic">未提供结构化简历数据</div>
+                        )}
 
-                      <div className="flex gap-3">
-                        {c.github_link && (
-                          <a href={c.github_link} target="_blank" rel="noreferrer">
-                            <Button variant="outline" size="sm">
-                              <Github className="w-4 h-4 mr-2" /> 查看 GitHub
+                        <div className="flex gap-3">
+                          {detail?.github_link && (
+                            <a href={detail.github_link} target="_blank" rel="noreferrer">
+                              <Button variant="outline" size="sm">
+                                <Github className="w-4 h-4 mr-2" /> 查看 GitHub
+                              </Button>
+                            </a>
+                          )}
+                          {detail?.resume_path && (
+                            <Button variant="outline" size="sm" onClick={() => downloadResume(c.id)}>
+                              <Download className="w-4 h-4 mr-2" /> 下载原始 PDF
                             </Button>
-                          </a>
-                        )}
-                        <Button variant="outline" size="sm">
-                          <Download className="w-4 h-4 mr-2" /> 下载原始 PDF
-                        </Button>
+                          )}
+                        </div>
                       </div>
-                    </div>
 
-                    {/* Right: Actions */}
-                    <div className="space-y-4 border-l border-slate-200 pl-6">
-                      <h4 className="font-bold text-slate-900">操作</h4>
-                      <div className="space-y-2">
-                        <Button 
-                          className="w-full justify-start"
-                          onClick={() => updateStatus(c.id, 'interview_ready')}
-                          disabled={updating === c.id || c.status === 'interview_ready'}
-                        >
-                          {updating === c.id ? <Loader className="w-4 h-4 animate-spin mr-2"/> : <Video className="w-4 h-4 mr-2" />}
-                          邀请 AI 面试
-                        </Button>
-                        <Button variant="secondary" className="w-full justify-start">
-                          <MessageSquare className="w-4 h-4 mr-2" /> 发送消息
-                        </Button>
-                        <div className="pt-4 flex gap-2">
+                      {/* Right: Actions */}
+                      <div className="space-y-4 border-l border-slate-200 pl-6">
+                        <h4 className="font-bold text-slate-900">操作</h4>
+                        <div className="space-y-2">
                           <Button 
-                            variant="ghost" 
-                            className="flex-1 text-green-600 hover:bg-green-50 hover:text-green-700"
-                            onClick={() => updateStatus(c.id, 'offered')}
-                            disabled={updating === c.id || c.status === 'offered'}
+                            className="w-full justify-start"
+                            onClick={() => updateStatus(c.id, 'interview_ready')}
+                            disabled={updating === c.id || c.status === 'interview_ready'}
                           >
-                            <CheckCircle className="w-4 h-4 mr-2" /> 录用
+                            {updating === c.id ? <Loader className="w-4 h-4 animate-spin mr-2"/> : <Video className="w-4 h-4 mr-2" />}
+                            邀请 AI 面试
                           </Button>
-                          <Button 
-                            variant="ghost" 
-                            className="flex-1 text-red-600 hover:bg-red-50 hover:text-red-700"
-                            onClick={() => updateStatus(c.id, 'rejected')}
-                            disabled={updating === c.id || c.status === 'rejected'}
-                          >
-                            <XCircle className="w-4 h-4 mr-2" /> 淘汰
+                          <Button variant="secondary" className="w-full justify-start">
+                            <MessageSquare className="w-4 h-4 mr-2" /> 发送消息
                           </Button>
+                          <div className="pt-4 flex gap-2">
+                            <Button 
+                              variant="ghost" 
+                              className="flex-1 text-green-600 hover:bg-green-50 hover:text-green-700"
+                              onClick={() => updateStatus(c.id, 'offered')}
+                              disabled={updating === c.id || c.status === 'offered'}
+                            >
+                              <CheckCircle className="w-4 h-4 mr-2" /> 录用
+                            </Button>
+                            <Button 
+                              variant="ghost" 
+                              className="flex-1 text-red-600 hover:bg-red-50 hover:text-red-700"
+                              onClick={() => updateStatus(c.id, 'rejected')}
+                              disabled={updating === c.id || c.status === 'rejected'}
+                            >
+                              <XCircle className="w-4 h-4 mr-2" /> 淘汰
+                            </Button>
+                          </div>
                         </div>
                       </div>
                     </div>
-                  </div>
-                </motion.div>
-              )}
-            </AnimatePresence>
-          </motion.div>
-        ))}
+                  </motion.div>
+                )}
+              </AnimatePresence>
+            </motion.div>
+          );
+        })}
       </div>
+
+      {nextCursor && (
+        <div className="flex justify-center">
+          <Button variant="secondary" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore && <Loader className="w-4 h-4 animate-spin mr-2" />}
+            加载更多
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
@@ -4,6 +4,9 @@ import { useAuth } from '../../context/AuthContext';
 import { Mic, MicOff, Video, VideoOff, PhoneOff, MessageSquare, Settings, CheckCircle, AlertCircle, Loader } from 'lucide-react';
 import { Button } from '../../components/ui/Button';
 import { Card } from '../../components/ui/Card';
+import { PROTOCOL_BINARY, KIND_AUDIO, KIND_VIDEO, encodeFrame, decodeFrame } from '../../utils/wsProtocol';
+import { PCM_SAMPLE_RATE, pcmSupported, startPcmCapture } from '../../utils/pcmCapture';
+import { ReplyAudioPlayer, streamingSupported } from '../../utils/replyAudioPlayer';
 
 export function InterviewRoom() {
   const [step, setStep] = useState('CHECK'); // CHECK | ROOM
@@ -21,8 +24,23 @@ export function InterviewRoom() {
   const previewVideoRef = useRef(null); // For pre-flight check
   const mediaRecorderRef = useRef(null);
   const canvasRef = useRef(null);
+  const frameTimerRef = useRef(null);
   const pingIntervalRef = useRef(null);
   const streamRef = useRef(null);
+  const statusRef = useRef(status);
+  // Frame rate / size requested by the server (CAPTURE_CONFIG)
+  const captureRef = useRef({ fps: 1, maxWidth: 480 });
+  // Set once the server acknowledges HELLO with binary.v1; JSON/base64 until then
+  const binaryRef = useRef(false);
+  const seqRef = useRef({ audio: 0, video: 0 });
+  // How the mic is captured; PCM lets the server detect the end of an answer
+  const audioFormatRef = useRef(null);
+  const stopPcmRef = useRef(null);
+  const playerRef = useRef(null);
+
+  useEffect(() => {
+    statusRef.current = status;
+  }, [status]);
 
   // Pre-flight check effect
   useEffect(() => {
@@ -67,13 +85,32 @@ export function InterviewRoom() {
     }
 
     const connectWebSocket = () => {
-        const wsBaseUrl = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
+        const wsBase = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
+        // A path (e.g. "/" behind nginx) is relative to the page's own host
+        const wsBaseUrl = wsBase.startsWith('/')
+          ? `${window.location.protocol === 'https:' ? 'wss' : 'ws'}://${window.location.host}${wsBase.replace(/\/$/, '')}`
+          : wsBase;
         const wsUrl = `${wsBaseUrl}/ws/interview?token=${token}`;
         wsRef.current = new WebSocket(wsUrl);
+        wsRef.current.binaryType = 'arraybuffer';
+        binaryRef.current = false;
+        playerRef.current?.cancel();
+        playerRef.current = new ReplyAudioPlayer({
+            streaming: false,
+            onStart: () => setStatus('SPEAKING'),
+            onIdle: () => setStatus('LISTENING')
+        });
 
         wsRef.current.onopen = () => {
             console.log('WS Connected');
             setStatus('READY');
+
+            wsRef.current.send(JSON.stringify({
+                type: 'HELLO',
+                protocols: [PROTOCOL_BINARY],
+                stream_audio: streamingSupported(),
+                audio: audioFormatRef.current
+            }));
             
             pingIntervalRef.current = setInterval(() => {
                 if (wsRef.current?.readyState === WebSocket.OPEN) {
@@ -88,19 +125,32 @@ export function InterviewRoom() {
         };
 
         wsRef.current.onmessage = async (event) => {
-            if (event.data instanceof Blob) {
-                const audioUrl = URL.createObjectURL(event.data);
-                const audio = new Audio(audioUrl);
-                setStatus('SPEAKING');
-                audio.play();
-                audio.onended = () => setStatus('LISTENING');
+            if (event.data instanceof ArrayBuffer) {
+                let audioData = event.data;
+                if (binaryRef.current) {
+                    const frame = decodeFrame(event.data);
+                    if (!frame || frame.kind !== KIND_AUDIO) return;
+                    audioData = frame.payload;
+                }
+                playerRef.current.push(audioData);
             } else {
                 try {
                     const data = JSON.parse(event.data);
                     if (data.type === 'PONG') return;
                     
-                    if (data.type === 'AI_RESPONSE') {
+                    if (data.type === 'HELLO_ACK') {
+                        binaryRef.current = data.protocol === PROTOCOL_BINARY;
+                        // The server streams raw MP3 chunks only over binary.v1
+                        playerRef.current.streaming = binaryRef.current && streamingSupported();
+                    } else if (data.type === 'AUDIO_END') {
+                        playerRef.current.end();
+                    } else if (data.type === 'AUDIO_CANCEL') {
+                        // We talked over the interviewer; the server already stopped
+                        playerRef.current.cancel();
+                    } else if (data.type === 'AI_RESPONSE') {
                         addMessage('AI', data.text);
+                    } else if (data.type === 'CAPTURE_CONFIG') {
+                        captureRef.current = { fps: data.fps, maxWidth: data.max_width };
                     } else if (data.type === 'STATE_CHANGE') {
                         if (data.state === 'THINKING') setStatus('THINKING');
                     } else if (data.type === 'INTERVIEW_END') {
@@ -127,28 +177,75 @@ export function InterviewRoom() {
         if (videoRef.current) videoRef.current.srcObject = stream;
         streamRef.current = stream; // Keep ref to stop later
         
-        const mediaRecorder = new MediaRecorder(stream, { mimeType: 'audio/webm' });
-        mediaRecorderRef.current = mediaRecorder;
-        
-        mediaRecorder.ondataavailable = (e) => {
-          if (e.data.size > 0 && wsRef.current?.readyState === WebSocket.OPEN && status === 'LISTENING') {
-            wsRef.current.send(e.data);
+        const sendAudio = (chunk) => {
+          if (wsRef.current?.readyState !== WebSocket.OPEN) return;
+          // With PCM the server hears us while it speaks, so we can interrupt it
+          const canBargeIn = audioFormatRef.current?.format === 'pcm16' && statusRef.current === 'SPEAKING';
+          if (statusRef.current !== 'LISTENING' && !canBargeIn) return;
+          if (binaryRef.current) {
+            wsRef.current.send(encodeFrame(KIND_AUDIO, seqRef.current.audio++, chunk));
+          } else {
+            wsRef.current.send(chunk);
           }
         };
-        mediaRecorder.start(1000);
+
+        const announceAudioFormat = (format) => {
+          audioFormatRef.current = format;
+          if (wsRef.current?.readyState === WebSocket.OPEN) {
+            wsRef.current.send(JSON.stringify({ type: 'AUDIO_FORMAT', ...format }));
+          }
+        };
+
+        const startRecorder = () => {
+          const mediaRecorder = new MediaRecorder(stream, { mimeType: 'audio/webm' });
+          mediaRecorderRef.current = mediaRecorder;
+          mediaRecorder.ondataavailable = async (e) => {
+            if (e.data.size > 0) sendAudio(await e.data.arrayBuffer());
+          };
+          mediaRecorder.start(1000);
+          announceAudioFormat({ format: 'webm' });
+        };
+
+        if (pcmSupported()) {
+          startPcmCapture(stream, sendAudio)
+            .then(stop => {
+              stopPcmRef.current = stop;
+              announceAudioFormat({ format: 'pcm16', sample_rate: PCM_SAMPLE_RATE });
+            })
+            .catch(err => {
+              console.warn('PCM capture unavailable, using MediaRecorder', err);
+              startRecorder();
+            });
+        } else {
+          startRecorder();
+        }
 
         const videoTrack = stream.getVideoTracks()[0];
         
-        const frameInterval = setInterval(async () => {
-            if (status === 'LISTENING' || status === 'SPEAKING' || status === 'THINKING') {
+        const captureFrame = () => {
+            const currentStatus = statusRef.current;
+            if (currentStatus === 'LISTENING' || currentStatus === 'SPEAKING' || currentStatus === 'THINKING') {
                 try {
-                    if (!canvasRef.current || !videoRef.current) return;
+                    if (!canvasRef.current || !videoRef.current || !videoRef.current.videoWidth) return;
                     
+                    // Downscale on the client to the width the server asked for
+                    const { videoWidth, videoHeight } = videoRef.current;
+                    const scale = Math.min(1, captureRef.current.maxWidth / videoWidth);
                     const ctx = canvasRef.current.getContext('2d');
-                    canvasRef.current.width = videoRef.current.videoWidth;
-                    canvasRef.current.height = videoRef.current.videoHeight;
-                    ctx.drawImage(videoRef.current, 0, 0);
+                    canvasRef.current.width = Math.round(videoWidth * scale);
+                    canvasRef.current.height = Math.round(videoHeight * scale);
+                    ctx.drawImage(videoRef.current, 0, 0, canvasRef.current.width, canvasRef.current.height);
                     
+                    if (binaryRef.current) {
+                        // Raw JPEG bytes behind a 14-byte header: no base64 or JSON on either side
+                        canvasRef.current.toBlob(async (blob) => {
+                            if (!blob || wsRef.current?.readyState !== WebSocket.OPEN) return;
+                            const jpeg = await blob.arrayBuffer();
+                            wsRef.current.send(encodeFrame(KIND_VIDEO, seqRef.current.video++, jpeg));
+                        }, 'image/jpeg', 0.5);
+                        return;
+                    }
+
                     const base64Frame = canvasRef.current.toDataURL('image/jpeg', 0.5);
                     
                     if (wsRef.current?.readyState === WebSocket.OPEN) {
@@ -161,9 +258,16 @@ export function InterviewRoom() {
                     console.error("Frame capture error", e);
                 }
             }
-        }, 1000);
+        };
 
-        return () => clearInterval(frameInterval);
+        // Re-read the requested rate every tick so CAPTURE_CONFIG applies immediately
+        const scheduleFrame = () => {
+            frameTimerRef.current = setTimeout(() => {
+                captureFrame();
+                scheduleFrame();
+            }, 1000 / captureRef.current.fps);
+        };
+        scheduleFrame();
       })
       .catch(err => {
         console.error("Room Media Error:", err);
@@ -171,8 +275,11 @@ export function InterviewRoom() {
       });
 
     return () => {
+      clearTimeout(frameTimerRef.current);
       wsRef.current?.close();
       mediaRecorderRef.current?.stop();
+      stopPcmRef.current?.();
+      playerRef.current?.cancel();
       if (streamRef.current) {
         streamRef.current.getTracks().forEach(track => track.stop());
       }
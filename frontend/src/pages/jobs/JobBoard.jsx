@@ -1,20 +1,85 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { useJobs } from '../../context/JobContext';
 import { Card } from '../../components/ui/Card';
 import { Button } from '../../components/ui/Button';
-import { MapPin, Briefcase, ChevronRight, X, Sparkles, Clock, CheckCircle } from 'lucide-react';
+import { MapPin, Briefcase, ChevronRight, X, Sparkles, Clock, CheckCircle, Search } from 'lucide-react';
 import { Link } from 'react-router-dom';
 import { AnimatePresence, motion } from 'framer-motion';
 import { JobDetail } from './JobDetail'; // We'll reuse logic or components from here later, but for now we build a custom modal view
 
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+const PAGE_SIZE = 24;
+
 export function JobBoard() {
-  const { jobs, companyInfo } = useJobs();
+  const { companyInfo } = useJobs();
   const [filterType, setFilterType] = useState('全部');
+  const [query, setQuery] = useState('');
+  const [jobs, setJobs] = useState([]);
+  const [typeCounts, setTypeCounts] = useState({});
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedJob, setSelectedJob] = useState(null);
 
-  const filteredJobs = filterType === '全部' 
-    ? jobs 
-    : jobs.filter(job => job.type === filterType);
+  // Search and filter on the server; the list only carries card fields
+  const fetchPage = async (cursor) => {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (query.trim()) params.set('q', query.trim());
+    if (filterType !== '全部') params.set('type', filterType);
+    if (cursor) params.set('cursor', cursor);
+    const res = await fetch(`${API_URL}/jobs/search?${params}`);
+    if (!res.ok) throw new Error(`Job search failed: ${res.status}`);
+    return res.json();
+  };
+
+  useEffect(() => {
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const data = await fetchPage(null);
+        if (cancelled) return;
+        setJobs(data.items);
+        setNextCursor(data.next_cursor);
+        const counts = Object.fromEntries(data.facets.type.map(f => [f.value, f.count]));
+        counts['全部'] = data.facets.type.reduce((sum, f) => sum + f.count, 0);
+        setTypeCounts(counts);
+      } catch (error) {
+        console.error(error);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [filterType, query]);
+
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await fetchPage(nextCursor);
+      setJobs(prev => [...prev, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error(error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Full posting only when a card is opened
+  const openJob = async (job) => {
+    try {
+      const res = await fetch(`${API_URL}/jobs/${job.id}`);
+      if (!res.ok) return;
+      const detail = await res.json();
+      setSelectedJob({
+        ...detail,
+        salary: detail.salary_range,
+        requirements: detail.requirements ? detail.requirements.split('\n') : []
+      });
+    } catch (error) {
+      console.error(error);
+    }
+  };
 
   return (
     <div className="space-y-12 animate-fade-in pb-20">
@@ -29,6 +94,19 @@ export function JobBoard() {
         </p>
       </div>
 
+      {/* Search */}
+      <div className="flex justify-center px-4">
+        <div className="relative w-full max-w-xl">
+          <Search className="absolute left-4 top-1/2 -translate-y-1/2 w-4 h-4 text-slate-400" />
+          <input
+            value={query}
+            onChange={e => setQuery(e.target.value)}
+            placeholder="搜索职位、技能或关键词..."
+            className="w-full pl-11 pr-4 py-3 rounded-full border border-slate-200 bg-white/70 focus:ring-2 focus:ring-primary-500/20 focus:border-primary-500 transition-colors"
+          />
+        </div>
+      </div>
+
       {/* Filter Tabs */}
       <div className="flex justify-center">
         <div className="bg-white/50 backdrop-blur-sm p-1.5 rounded-full shadow-sm border border-white/50 flex gap-1">
@@ -43,6 +121,9 @@ export function JobBoard() {
               }`}
             >
               {type}
+              {typeCounts[type] !== undefined && (
+                <span className="ml-1 text-xs text-slate-400">{typeCounts[type]}</span>
+              )}
             </button>
           ))}
         </div>
@@ -50,7 +131,7 @@ export function JobBoard() {
 
       {/* Job Grid */}
       <div className="grid gap-6 md:grid-cols-2 lg:grid-cols-3 max-w-7xl mx-auto px-4">
-        {filteredJobs.map((job) => (
+        {jobs.map((job) => (
           <motion.div
             layout
             initial={{ opacity: 0, y: 20 }}
@@ -60,7 +141,7 @@ export function JobBoard() {
           >
             <Card 
               className="group h-full flex flex-col hover:shadow-2xl hover:shadow-primary-900/5 transition-all duration-300 border-t-4 border-t-transparent hover:border-t-primary-500 cursor-pointer relative overflow-hidden"
-              onClick={() => setSelectedJob(job)}
+              onClick={() => openJob(job)}
             >
               {/* Card Decoration */}
               <div className="absolute top-0 right-0 w-24 h-24 bg-primary-50 rounded-bl-full -mr-4 -mt-4 transition-transform group-hover:scale-150 group-hover:bg-primary-100/50" />
@@ -90,7 +171,7 @@ export function JobBoard() {
                     {job.type}
                   </span>
                   <span className="px-2.5 py-1 bg-green-50 text-green-700 border border-green-100 rounded-md text-xs font-medium">
-                    {job.salary}
+                    {job.salary_range}
                   </span>
                   <span className="px-2.5 py-1 bg-slate-50 text-slate-600 border border-slate-100 rounded-md text-xs font-medium flex items-center gap-1">
                     <MapPin className="w-3 h-3" />
@@ -99,7 +180,7 @@ export function JobBoard() {
                 </div>
 
                 <p className="text-sm text-slate-500 line-clamp-3 leading-relaxed">
-                  {job.description}
+                  {job.summary}
                 </p>
               </div>
 
@@ -116,6 +197,14 @@ export function JobBoard() {
         ))}
       </div>
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <Button variant="ghost" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? '加载中...' : '加载更多职位'}
+          </Button>
+        </div>
+      )}
+
       {/* Quick View Modal */}
       <AnimatePresence>
         {selectedJob && (
@@ -1,6 +1,5 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { useParams, Link } from 'react-router-dom';
-import { useJobs } from '../../context/JobContext';
 import { Card } from '../../components/ui/Card';
 import { Button } from '../../components/ui/Button';
 import { MapPin, Briefcase, ArrowLeft, BookOpen } from 'lucide-react';
@@ -8,9 +7,38 @@ import { JobChat } from '../../components/JobChat';
 
 export function JobDetail() {
   const { id } = useParams();
-  const { jobs } = useJobs();
-  const job = jobs.find(j => j.id == id); // Use loose equality for string/number id match
+  const [job, setJob] = useState(null);
+  const [loading, setLoading] = useState(true);
 
+  const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+
+  // The /jobs list only carries card fields; the posting comes from /jobs/{id}
+  useEffect(() => {
+    const fetchJob = async () => {
+      setLoading(true);
+      try {
+        const res = await fetch(`${API_URL}/jobs/${id}`);
+        if (res.ok) {
+          const data = await res.json();
+          setJob({
+            ...data,
+            salary: data.salary_range,
+            requirements: data.requirements ? data.requirements.split('\n') : []
+          });
+        } else {
+          setJob(null);
+        }
+      } catch (error) {
+        console.error("Failed to fetch job:", error);
+      } finally {
+        setLoading(false);
+      }
+    };
+
+    fetchJob();
+  }, [id]);
+
+  if (loading) return <div>Loading...</div>;
   if (!job) return <div>Job not found</div>;
 
   return (
@@ -56,13 +84,13 @@ export function JobDetail() {
             </div>
           </Card>
 
-          {job.knowledgeBase && (
+          {job.public_knowledge && (
             <Card className="bg-blue-50/50 border-blue-100">
               <div className="flex items-start gap-3">
                 <BookOpen className="w-5 h-5 text-primary-600 mt-1" />
                 <div>
                   <h3 className="font-semibold text-primary-900">公开知识库</h3>
-                  <p className="text-sm text-primary-700 mt-1">{job.knowledgeBase}</p>
+                  <p className="text-sm text-primary-700 mt-1">{job.public_knowledge}</p>
                 </div>
               </div>
             </Card>
@@ -0,0 +1,52 @@
+// Microphone capture as 16-bit mono PCM, so the server can run VAD on it.
+// Falls back to MediaRecorder (webm) where AudioWorklet isn't available.
+
+export const PCM_SAMPLE_RATE = 16000;
+
+export const pcmSupported = () =>
+  typeof window !== 'undefined' && 'AudioWorkletNode' in window;
+
+// Posts Int16 buffers of ~100 ms to the main thread
+const WORKLET_SOURCE = `
+class PcmCapture extends AudioWorkletProcessor {
+  constructor() {
+    super();
+    this.buffer = new Int16Array(${PCM_SAMPLE_RATE / 10});
+    this.length = 0;
+  }
+  process(inputs) {
+    const channel = inputs[0] && inputs[0][0];
+    if (channel) {
+      for (let i = 0; i < channel.length; i++) {
+        const s = Math.max(-1, Math.min(1, channel[i]));
+        this.buffer[this.length++] = s < 0 ? s * 0x8000 : s * 0x7fff;
+        if (this.length === this.buffer.length) {
+          this.port.postMessage(this.buffer.slice().buffer, []);
+          this.length = 0;
+        }
+      }
+    }
+    return true;
+  }
+}
+registerProcessor('pcm-capture', PcmCapture);
+`;
+
+export async function startPcmCapture(stream, onChunk) {
+  const context = new AudioContext({ sampleRate: PCM_SAMPLE_RATE });
+  const url = URL.createObjectURL(new Blob([WORKLET_SOURCE], { type: 'application/javascript' }));
+  try {
+    await context.audioWorklet.addModule(url);
+  } finally {
+    URL.revokeObjectURL(url);
+  }
+  const source = context.createMediaStreamSource(stream);
+  const node = new AudioWorkletNode(context, 'pcm-capture');
+  node.port.onmessage = (e) => onChunk(e.data);
+  source.connect(node);
+  return () => {
+    node.port.onmessage = null;
+    source.disconnect();
+    context.close();
+  };
+}
@@ -0,0 +1,111 @@
+// Plays the interviewer's reply while it is still arriving.
+// streaming: MP3 chunks are appended to one MediaSource as they come in.
+// otherwise: every message is a complete clip (one per sentence), played in order.
+
+export const streamingSupported = () =>
+  typeof MediaSource !== 'undefined' && MediaSource.isTypeSupported('audio/mpeg');
+
+export class ReplyAudioPlayer {
+  constructor({ streaming, onStart, onIdle }) {
+    this.streaming = streaming;
+    this.onStart = onStart;
+    this.onIdle = onIdle;
+    this._reset();
+  }
+
+  _reset() {
+    this.active = false;
+    this.ended = false;
+    this.audio = null;
+    this.url = null;
+    this.clips = [];
+    this.pending = [];
+    this.mediaSource = null;
+    this.sourceBuffer = null;
+  }
+
+  push(chunk) {
+    if (!this.active) {
+      this.active = true;
+      this.onStart?.();
+      if (this.streaming) this._openStream();
+    }
+    if (this.streaming) {
+      this.pending.push(chunk);
+      this._flush();
+    } else {
+      this.clips.push(chunk);
+      this._playNext();
+    }
+  }
+
+  // AUDIO_END: no more audio for this reply
+  end() {
+    if (!this.active) {
+      this.onIdle?.();
+      return;
+    }
+    this.ended = true;
+    if (this.streaming) this._flush();
+    else this._playNext();
+  }
+
+  // AUDIO_CANCEL (barge-in): drop everything right away
+  cancel() {
+    if (this.audio) {
+      this.audio.onended = null;
+      this.audio.pause();
+    }
+    if (this.url) URL.revokeObjectURL(this.url);
+    const wasActive = this.active;
+    this._reset();
+    if (wasActive) this.onIdle?.();
+  }
+
+  _finish() {
+    if (this.url) URL.revokeObjectURL(this.url);
+    this._reset();
+    this.onIdle?.();
+  }
+
+  _openStream() {
+    this.mediaSource = new MediaSource();
+    this.url = URL.createObjectURL(this.mediaSource);
+    this.audio = new Audio(this.url);
+    this.audio.onended = () => this._finish();
+    this.mediaSource.addEventListener('sourceopen', () => {
+      this.sourceBuffer = this.mediaSource.addSourceBuffer('audio/mpeg');
+      this.sourceBuffer.addEventListener('updateend', () => this._flush());
+      this._flush();
+    }, { once: true });
+    this.audio.play().catch(err => console.warn('Audio playback blocked', err));
+  }
+
+  _flush() {
+    const sourceBuffer = this.sourceBuffer;
+    if (!sourceBuffer || sourceBuffer.updating) return;
+    if (this.pending.length) {
+      sourceBuffer.appendBuffer(this.pending.shift());
+    } else if (this.ended && this.mediaSource.readyState === 'open') {
+      this.mediaSource.endOfStream();
+    }
+  }
+
+  _playNext() {
+    if (this.audio) return;
+    if (!this.clips.length) {
+      if (this.ended) this._finish();
+      return;
+    }
+    this.url = URL.createObjectURL(new Blob([this.clips.shift()], { type: 'audio/mpeg' }));
+    this.audio = new Audio(this.url);
+    const next = () => {
+      URL.revokeObjectURL(this.url);
+      this.url = null;
+      this.audio = null;
+      this._playNext();
+    };
+    this.audio.onended = next;
+    this.audio.play().catch(next);
+  }
+}
@@ -0,0 +1,34 @@
+// Binary framing for /ws/interview (mirrors backend/ws_protocol.py).
+// Header: version u8 | kind u8 | seq u32 | timestamp ms u64, big-endian.
+
+export const PROTOCOL_BINARY = 'binary.v1';
+export const VERSION = 1;
+export const HEADER_SIZE = 14;
+
+export const KIND_AUDIO = 1;
+export const KIND_VIDEO = 2;
+export const KIND_CONTROL = 3;
+
+export function encodeFrame(kind, seq, payload) {
+  const body = new Uint8Array(payload);
+  const frame = new Uint8Array(HEADER_SIZE + body.byteLength);
+  const view = new DataView(frame.buffer);
+  view.setUint8(0, VERSION);
+  view.setUint8(1, kind);
+  view.setUint32(2, seq >>> 0);
+  view.setBigUint64(6, BigInt(Date.now()));
+  frame.set(body, HEADER_SIZE);
+  return frame.buffer;
+}
+
+export function decodeFrame(buffer) {
+  if (buffer.byteLength < HEADER_SIZE) return null;
+  const view = new DataView(buffer);
+  if (view.getUint8(0) !== VERSION) return null;
+  return {
+    kind: view.getUint8(1),
+    seq: view.getUint32(2),
+    timestamp: Number(view.getBigUint64(6)),
+    payload: buffer.slice(HEADER_SIZE),
+  };
+}